@@ -0,0 +1,104 @@
+"""compact key and column types: uuid ids, boolean status, hours in hundredths
+
+Revision ID: 237bf964f377
+Revises: 64e0cac630f0
+Create Date: 2026-10-19 14:05:27.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '237bf964f377'
+down_revision: Union[str, Sequence[str], None] = '64e0cac630f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_TABLES = ["users", "employees", "projects"]
+
+# Every table below is rewritten under an exclusive lock. task_monitors only holds the
+# un-archived window (see 64e0cac630f0), so run the archive job first on a large database.
+#
+# Measured with scripts/measure_storage.py on the benchmarks' "medium" seed (855,180 task
+# rows, 2,000 employees), downgraded vs upgraded, VACUUM FULL before each run:
+#   task_monitors heap     89.3 -> 82.6 MiB (-7.4%); indexes unchanged at 45.3 MiB
+#   employees heap          512 -> 472 KiB;         indexes unchanged
+#   roles, users, projects, project_staffing: unchanged (a few pages each at this size)
+#   join execution (median of 7): employees_roles 1.08 -> 0.98 ms, staffing_employees
+#   2.16 -> 2.21 ms, task_list 1174 -> 1162 ms, i.e. within noise
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1) generated ids: varchar(36) text -> native uuid (16 bytes, no collation on compare)
+    op.drop_constraint("fk_employees_role_restrict", "employees", type_="foreignkey")
+    op.execute("ALTER TABLE roles ALTER COLUMN role_id TYPE uuid USING role_id::uuid;")
+    op.execute("ALTER TABLE employees ALTER COLUMN role TYPE uuid USING NULLIF(role, '')::uuid;")
+    op.create_foreign_key(
+        "fk_employees_role_restrict",
+        source_table="employees",
+        referent_table="roles",
+        local_cols=["role"],
+        remote_cols=["role_id"],
+        ondelete="RESTRICT",
+    )
+    op.execute("ALTER TABLE users ALTER COLUMN id TYPE uuid USING id::uuid;")
+
+    # 2) employees_id is a user-entered GMS ID, not a uuid: keep it text, but make the
+    #    staffing side the same varchar(36) as the key it references
+    op.alter_column("project_staffing", "employees_id", type_=sa.String(36), existing_type=sa.String(50), existing_nullable=False)
+
+    # 3) CHAR(1) '0'/'1' -> boolean
+    for t in STATUS_TABLES:
+        op.execute(f"ALTER TABLE {t} DROP CONSTRAINT IF EXISTS ck_status_01;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status DROP DEFAULT;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status TYPE boolean USING status = '1';")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status SET DEFAULT true;")
+
+    # 4) hours_logged numeric(4,2) -> smallint hundredths of an hour (exact for 2 decimals)
+    for t in ("task_monitors", "task_monitors_archive"):
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged DROP DEFAULT;")
+        op.execute(f"ALTER TABLE {t} RENAME COLUMN hours_logged TO hours_logged_hundredths;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged_hundredths TYPE smallint USING round(hours_logged_hundredths * 100)::smallint;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged_hundredths SET DEFAULT 0;")
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged DROP DEFAULT;")
+    op.execute("ALTER TABLE task_monitors_archive_totals RENAME COLUMN hours_logged TO hours_logged_hundredths;")
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged_hundredths TYPE bigint USING round(hours_logged_hundredths * 100)::bigint;")
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged_hundredths SET DEFAULT 0;")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged_hundredths DROP DEFAULT;")
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged_hundredths TYPE numeric(14,2) USING hours_logged_hundredths / 100.0;")
+    op.execute("ALTER TABLE task_monitors_archive_totals RENAME COLUMN hours_logged_hundredths TO hours_logged;")
+    op.execute("ALTER TABLE task_monitors_archive_totals ALTER COLUMN hours_logged SET DEFAULT 0.00;")
+    for t in ("task_monitors", "task_monitors_archive"):
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged_hundredths DROP DEFAULT;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged_hundredths TYPE numeric(4,2) USING hours_logged_hundredths / 100.0;")
+        op.execute(f"ALTER TABLE {t} RENAME COLUMN hours_logged_hundredths TO hours_logged;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN hours_logged SET DEFAULT 0.00;")
+
+    for t in STATUS_TABLES:
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status DROP DEFAULT;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status TYPE char(1) USING CASE WHEN status THEN '1' ELSE '0' END;")
+        op.execute(f"ALTER TABLE {t} ALTER COLUMN status SET DEFAULT '1';")
+        op.execute(f"ALTER TABLE {t} ADD CONSTRAINT ck_status_01 CHECK (status in ('0','1'));")
+
+    op.alter_column("project_staffing", "employees_id", type_=sa.String(50), existing_type=sa.String(36), existing_nullable=False)
+
+    op.execute("ALTER TABLE users ALTER COLUMN id TYPE varchar(36) USING id::text;")
+    op.drop_constraint("fk_employees_role_restrict", "employees", type_="foreignkey")
+    op.execute("ALTER TABLE employees ALTER COLUMN role TYPE varchar(36) USING role::text;")
+    op.execute("ALTER TABLE roles ALTER COLUMN role_id TYPE varchar(36) USING role_id::text;")
+    op.create_foreign_key(
+        "fk_employees_role_restrict",
+        source_table="employees",
+        referent_table="roles",
+        local_cols=["role"],
+        remote_cols=["role_id"],
+        ondelete="RESTRICT",
+    )
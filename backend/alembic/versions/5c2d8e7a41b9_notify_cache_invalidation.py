@@ -0,0 +1,50 @@
+"""notify cache invalidation channel on writes to cached tables
+
+Revision ID: 5c2d8e7a41b9
+Revises: 237bf964f377
+Create Date: 2026-10-19 16:20:11.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e7a41b9'
+down_revision: Union[str, Sequence[str], None] = '237bf964f377'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANNEL = "gms_cache_invalidation"
+TABLES = [
+    "roles", "employees", "projects", "project_staffing",
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY is delivered at commit and de-duplicated per transaction, so listeners hear
+    # about a change only once it is visible, and once per table however many rows moved.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+    BEGIN
+      PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    for t in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {t}_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {t} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for t in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {t}_notify_change ON {t};")
+    op.execute("DROP FUNCTION IF EXISTS notify_table_change();")
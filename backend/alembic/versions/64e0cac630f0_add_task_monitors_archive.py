@@ -0,0 +1,100 @@
+"""add task_monitors archive, archive totals and archive state
+
+Revision ID: 64e0cac630f0
+Revises: f27f6b585bb3
+Create Date: 2026-10-19 11:40:03.552817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '64e0cac630f0'
+down_revision: Union[str, Sequence[str], None] = 'f27f6b585bb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE TABLE task_monitors_archive (
+      task_id             integer     NOT NULL,
+      project_staffing_id bigint      NOT NULL,
+      task_date           date        NOT NULL,
+      task_completed      integer     NOT NULL DEFAULT 0,
+      task_inprogress     integer     NOT NULL DEFAULT 0,
+      task_reworked       integer     NOT NULL DEFAULT 0,
+      task_approved       integer     NOT NULL DEFAULT 0,
+      task_rejected       integer     NOT NULL DEFAULT 0,
+      task_reviewed       integer     NOT NULL DEFAULT 0,
+      hours_logged        numeric(4,2) NOT NULL DEFAULT 0.00,
+      billable            boolean     NOT NULL DEFAULT false,
+      description         text,
+      created_at          timestamptz NOT NULL,
+      updated_at          timestamptz NOT NULL,
+      CONSTRAINT task_monitors_archive_pkey PRIMARY KEY (task_id, task_date),
+      CONSTRAINT fk_task_monitors_archive_project_staffing_restrict
+        FOREIGN KEY (project_staffing_id) REFERENCES project_staffing (id) ON DELETE RESTRICT
+    ) WITH (fillfactor = 100, toast_tuple_target = 128);
+    """)
+    # lz4 is cheaper to decompress than the default pglz; skip quietly where the server lacks it
+    op.execute("""
+    DO $$
+    BEGIN
+      ALTER TABLE task_monitors_archive ALTER COLUMN description SET COMPRESSION lz4;
+    EXCEPTION WHEN others THEN
+      RAISE NOTICE 'lz4 compression unavailable, keeping default: %', SQLERRM;
+    END $$;
+    """)
+    op.create_index("ix_task_monitors_archive_date_id", "task_monitors_archive", ["task_date", "task_id"], unique=False)
+    op.create_index("ix_task_monitors_archive_psid_date", "task_monitors_archive", ["project_staffing_id", "task_date"], unique=False)
+
+    op.create_table(
+        "task_monitors_archive_totals",
+        sa.Column("project_staffing_id", sa.BigInteger(), nullable=False),
+        sa.Column("task_completed", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("task_inprogress", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("task_reworked", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("task_approved", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("task_rejected", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("task_reviewed", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("hours_logged", sa.Numeric(14, 2), server_default="0.00", nullable=False),
+        sa.Column("rows_archived", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("first_task_date", sa.Date(), nullable=True),
+        sa.Column("last_task_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["project_staffing_id"], ["project_staffing.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("project_staffing_id"),
+    )
+
+    op.create_table(
+        "task_monitors_archive_state",
+        sa.Column("id", sa.SmallInteger(), server_default=sa.text("1"), autoincrement=False, nullable=False),
+        sa.Column("archived_before", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("id = 1", name="ck_archive_state_single_row"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Put archived rows back before dropping the archive
+    op.execute("""
+    INSERT INTO task_monitors (
+      task_id, project_staffing_id, task_date, task_completed, task_inprogress, task_reworked,
+      task_approved, task_rejected, task_reviewed, hours_logged, billable, description, created_at, updated_at
+    )
+    SELECT task_id, project_staffing_id, task_date, task_completed, task_inprogress, task_reworked,
+           task_approved, task_rejected, task_reviewed, hours_logged, billable, description, created_at, updated_at
+    FROM task_monitors_archive;
+    """)
+    op.drop_table("task_monitors_archive_state")
+    op.drop_table("task_monitors_archive_totals")
+    op.drop_index("ix_task_monitors_archive_psid_date", table_name="task_monitors_archive")
+    op.drop_index("ix_task_monitors_archive_date_id", table_name="task_monitors_archive")
+    op.drop_table("task_monitors_archive")
@@ -0,0 +1,66 @@
+"""add table_versions change markers, bumped by the cache invalidation trigger
+
+Revision ID: a81f3c9d2e64
+Revises: 5c2d8e7a41b9
+Create Date: 2026-10-19 17:02:45.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81f3c9d2e64'
+down_revision: Union[str, Sequence[str], None] = '5c2d8e7a41b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANNEL = "gms_cache_invalidation"
+TABLES = [
+    "roles", "employees", "projects", "project_staffing",
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(63), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO table_versions (table_name) VALUES "
+        + ", ".join(f"('{t}')" for t in TABLES)
+        + ";"
+    )
+    # A plain row update: the new version becomes visible in the same commit as the data.
+    # Writers to one table queue on its version row until they commit; our writes are
+    # single statements or short transactions, so that wait is a few milliseconds.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO table_versions AS v (table_name, version, changed_at)
+      VALUES (TG_TABLE_NAME, 1, now())
+      ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1, changed_at = now();
+      PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+    BEGIN
+      PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.drop_table("table_versions")
@@ -0,0 +1,92 @@
+"""add change_log fed by row triggers, with tombstones for deletes
+
+Revision ID: c4e7b19f08d3
+Revises: a81f3c9d2e64
+Create Date: 2026-10-19 17:48:31.660094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e7b19f08d3'
+down_revision: Union[str, Sequence[str], None] = 'a81f3c9d2e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    "roles": "role_id",
+    "employees": "employees_id",
+    "projects": "project_id",
+    "project_staffing": "id",
+    "task_monitors": "task_id",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "change_log",
+        sa.Column("id", sa.BigInteger, sa.Identity(always=True), primary_key=True),
+        sa.Column("txid", sa.BigInteger, nullable=False, server_default=sa.text("txid_current()")),
+        sa.Column("table_name", sa.String(63), nullable=False),
+        sa.Column("op", sa.CHAR(1), nullable=False),
+        sa.Column("row_key", sa.Text, nullable=False),
+        sa.Column("row_data", postgresql.JSONB, nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("op in ('U','D')", name="ck_change_log_op"),
+    )
+    op.create_index("ix_change_log_txid", "change_log", ["txid", "id"])
+    op.create_index("ix_change_log_changed_at", "change_log", ["changed_at"])
+    op.create_table(
+        "change_log_state",
+        sa.Column("id", sa.SmallInteger, primary_key=True, server_default=sa.text("1"), autoincrement=False),
+        sa.Column("pruned_through", sa.BigInteger, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("id = 1", name="ck_change_log_state_single_row"),
+    )
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION log_row_change() RETURNS trigger AS $$
+    DECLARE
+      tbl text := TG_ARGV[0];   -- partitions fire this too; TG_TABLE_NAME would be the partition
+      key_col text := TG_ARGV[1];
+      rec jsonb;
+    BEGIN
+      -- set by jobs/archive.py: moving a task to the archive is not a delete for clients
+      IF current_setting('gms.skip_change_log', true) = 'on' THEN
+        RETURN NULL;
+      END IF;
+      IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (table_name, op, row_key) VALUES (tbl, 'D', to_jsonb(OLD) ->> key_col);
+        RETURN NULL;
+      END IF;
+      rec := to_jsonb(NEW);
+      IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) ->> key_col) IS DISTINCT FROM (rec ->> key_col) THEN
+        INSERT INTO change_log (table_name, op, row_key) VALUES (tbl, 'D', to_jsonb(OLD) ->> key_col);
+      END IF;
+      INSERT INTO change_log (table_name, op, row_key, row_data) VALUES (tbl, 'U', rec ->> key_col, rec);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    for t, key in TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER {t}_log_change AFTER INSERT OR UPDATE OR DELETE ON {t} "
+            f"FOR EACH ROW EXECUTE FUNCTION log_row_change('{t}', '{key}');"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for t in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {t}_log_change ON {t};")
+    op.execute("DROP FUNCTION IF EXISTS log_row_change();")
+    op.drop_table("change_log_state")
+    op.drop_index("ix_change_log_changed_at", table_name="change_log")
+    op.drop_index("ix_change_log_txid", table_name="change_log")
+    op.drop_table("change_log")
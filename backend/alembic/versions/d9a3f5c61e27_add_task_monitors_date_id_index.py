@@ -0,0 +1,36 @@
+"""covering (task_date, task_id) index on task_monitors for sparse task lists
+
+Revision ID: d9a3f5c61e27
+Revises: c4e7b19f08d3
+Create Date: 2026-10-19 19:12:05.418377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3f5c61e27'
+down_revision: Union[str, Sequence[str], None] = 'c4e7b19f08d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # created on the partitioned parent: Postgres builds it on every partition,
+    # and partitions attached later get it too
+    op.create_index(
+        "ix_task_monitors_date_id", "task_monitors", ["task_date", "task_id"],
+        postgresql_include=[
+            "project_staffing_id", "task_completed", "task_inprogress", "task_reworked",
+            "task_approved", "task_rejected", "task_reviewed", "hours_logged_hundredths",
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_task_monitors_date_id", table_name="task_monitors")
@@ -0,0 +1,76 @@
+"""table change markers as per-table sequences instead of table_versions rows
+
+Revision ID: e5b8c2d47a10
+Revises: d9a3f5c61e27
+Create Date: 2026-10-19 21:40:12.551903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c2d47a10'
+down_revision: Union[str, Sequence[str], None] = 'd9a3f5c61e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANNEL = "gms_cache_invalidation"
+TABLES = [
+    "roles", "employees", "projects", "project_staffing",
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every write statement used to upsert its table's table_versions row, so writers to a
+    # table queued on that row lock until commit, and two transactions writing two tables
+    # in opposite orders could deadlock. nextval() takes no lock that outlives the call.
+    for t in TABLES:
+        op.execute(f"CREATE SEQUENCE table_version_{t};")
+        # continue past the stored version, so no ETag handed out earlier can match again
+        op.execute(
+            f"SELECT setval('table_version_{t}', "
+            f"COALESCE((SELECT version FROM table_versions WHERE table_name = '{t}'), 0) + 1);"
+        )
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+    BEGIN
+      PERFORM nextval(('table_version_' || TG_TABLE_NAME)::regclass);
+      PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.drop_table("table_versions")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(63), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    for t in TABLES:
+        op.execute(
+            f"INSERT INTO table_versions (table_name, version) "
+            f"SELECT '{t}', last_value + 1 FROM table_version_{t};"
+        )
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO table_versions AS v (table_name, version, changed_at)
+      VALUES (TG_TABLE_NAME, 1, now())
+      ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1, changed_at = now();
+      PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME);
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    for t in TABLES:
+        op.execute(f"DROP SEQUENCE table_version_{t};")
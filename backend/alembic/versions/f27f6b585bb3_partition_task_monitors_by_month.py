@@ -0,0 +1,252 @@
+"""partition task_monitors by task_date month
+
+Revision ID: f27f6b585bb3
+Revises: f4e266f4dca7
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27f6b585bb3'
+down_revision: Union[str, Sequence[str], None] = 'f4e266f4dca7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of empty partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+# Explicit column list: the physical order of the old table differs from the
+# model after the project_staffing_id / billable migrations.
+COLUMNS = (
+    "task_id, project_staffing_id, task_date, task_completed, task_inprogress, "
+    "task_reworked, task_approved, task_rejected, task_reviewed, hours_logged, "
+    "billable, description, created_at, updated_at"
+)
+
+ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION task_monitors_ensure_partitions(
+    p_from date, p_to date, p_parent text DEFAULT 'task_monitors'
+) RETURNS integer AS $$
+DECLARE
+  m       date := date_trunc('month', p_from)::date;
+  m_next  date;
+  part    text;
+  created integer := 0;
+BEGIN
+  -- several workers may call this at startup
+  PERFORM pg_advisory_xact_lock(hashtext('task_monitors_ensure_partitions'));
+  WHILE m < p_to LOOP
+    m_next := (m + interval '1 month')::date;
+    part := format('task_monitors_p%s', to_char(m, 'YYYY_MM'));
+    IF to_regclass(part) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, p_parent);
+      -- rows that fell into the default partition for this month move into the new one
+      IF to_regclass('task_monitors_default') IS NOT NULL THEN
+        EXECUTE format(
+          'WITH moved AS (DELETE FROM task_monitors_default WHERE task_date >= $1 AND task_date < $2 RETURNING *) '
+          'INSERT INTO %I SELECT * FROM moved', part
+        ) USING m, m_next;
+      END IF;
+      -- a valid CHECK lets ATTACH skip its validation scan
+      EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (task_date >= %L AND task_date < %L)',
+                     part, part || '_range', m, m_next);
+      EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                     p_parent, part, m, m_next);
+      EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', part, part || '_range');
+      created := created + 1;
+    END IF;
+    m := m_next;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+MIRROR_FN = f"""
+CREATE OR REPLACE FUNCTION task_monitors_mirror_to_part()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- tombstones stop the batch copy from resurrecting a row it read before the change
+  IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.task_date <> NEW.task_date) THEN
+    DELETE FROM task_monitors_part WHERE task_id = OLD.task_id AND task_date = OLD.task_date;
+    INSERT INTO task_monitors_part_deletes (task_id, task_date) VALUES (OLD.task_id, OLD.task_date);
+    IF TG_OP = 'DELETE' THEN
+      RETURN OLD;
+    END IF;
+  END IF;
+  -- the key is live again (a date changed back), so the swap must not delete it
+  DELETE FROM task_monitors_part_deletes WHERE task_id = NEW.task_id AND task_date = NEW.task_date;
+  INSERT INTO task_monitors_part ({COLUMNS})
+  VALUES (NEW.task_id, NEW.project_staffing_id, NEW.task_date, NEW.task_completed, NEW.task_inprogress,
+          NEW.task_reworked, NEW.task_approved, NEW.task_rejected, NEW.task_reviewed, NEW.hours_logged,
+          NEW.billable, NEW.description, NEW.created_at, NEW.updated_at)
+  ON CONFLICT (task_id, task_date) DO UPDATE SET
+    project_staffing_id = EXCLUDED.project_staffing_id, task_completed = EXCLUDED.task_completed,
+    task_inprogress = EXCLUDED.task_inprogress, task_reworked = EXCLUDED.task_reworked,
+    task_approved = EXCLUDED.task_approved, task_rejected = EXCLUDED.task_rejected,
+    task_reviewed = EXCLUDED.task_reviewed, hours_logged = EXCLUDED.hours_logged,
+    billable = EXCLUDED.billable, description = EXCLUDED.description,
+    created_at = EXCLUDED.created_at, updated_at = EXCLUDED.updated_at;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _month_bounds(bind):
+    lo, hi = bind.execute(sa.text("SELECT min(task_date), max(task_date) FROM task_monitors")).one()
+    today = date.today().replace(day=1)
+    lo = (lo or today).replace(day=1)
+    hi = max((hi or today).replace(day=1), today)
+    return lo, hi
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # 1) partitioned shadow table + default partition + monthly partitions
+    op.execute("""
+    CREATE TABLE task_monitors_part (
+      task_id             integer     NOT NULL,
+      project_staffing_id bigint      NOT NULL,
+      task_date           date        NOT NULL,
+      task_completed      integer     NOT NULL DEFAULT 0,
+      task_inprogress     integer     NOT NULL DEFAULT 0,
+      task_reworked       integer     NOT NULL DEFAULT 0,
+      task_approved       integer     NOT NULL DEFAULT 0,
+      task_rejected       integer     NOT NULL DEFAULT 0,
+      task_reviewed       integer     NOT NULL DEFAULT 0,
+      hours_logged        numeric(4,2) NOT NULL DEFAULT 0.00,
+      billable            boolean     NOT NULL DEFAULT false,
+      description         text,
+      created_at          timestamptz NOT NULL DEFAULT now(),
+      updated_at          timestamptz NOT NULL DEFAULT now(),
+      CONSTRAINT task_monitors_part_pkey PRIMARY KEY (task_id, task_date),
+      CONSTRAINT fk_task_monitors_part_project_staffing_restrict
+        FOREIGN KEY (project_staffing_id) REFERENCES project_staffing (id) ON DELETE RESTRICT
+    ) PARTITION BY RANGE (task_date);
+    """)
+    op.execute("CREATE INDEX ix_task_monitors_part_psid_date ON task_monitors_part (project_staffing_id, task_date);")
+    op.execute("CREATE TABLE task_monitors_default PARTITION OF task_monitors_part DEFAULT;")
+    op.execute(ENSURE_PARTITIONS_FN)
+
+    lo, hi = _month_bounds(bind)
+    bind.execute(
+        sa.text("SELECT task_monitors_ensure_partitions(:lo, :hi, 'task_monitors_part')"),
+        {"lo": lo, "hi": _add_months(hi, MONTHS_AHEAD + 1)},
+    )
+    op.execute("""
+    CREATE TRIGGER trg_task_monitors_part_set_timestamps
+    BEFORE INSERT OR UPDATE ON task_monitors_part
+    FOR EACH ROW EXECUTE FUNCTION set_row_timestamps();
+    """)
+
+    # 2) mirror live writes into the shadow table while we copy
+    op.execute("CREATE TABLE task_monitors_part_deletes (task_id integer NOT NULL, task_date date NOT NULL, PRIMARY KEY (task_id, task_date));")
+    op.execute(MIRROR_FN)
+    op.execute("""
+    CREATE TRIGGER trg_task_monitors_mirror
+    AFTER INSERT OR UPDATE OR DELETE ON task_monitors
+    FOR EACH ROW EXECUTE FUNCTION task_monitors_mirror_to_part();
+    """)
+
+    # 3) copy month by month, each batch in its own short transaction, so the
+    #    old table only ever holds row-level locks and keeps taking writes
+    with op.get_context().autocommit_block():
+        m = lo
+        while m <= hi:
+            m_next = _add_months(m, 1)
+            bind.execute(
+                sa.text(
+                    f"INSERT INTO task_monitors_part ({COLUMNS}) "
+                    f"SELECT {COLUMNS} FROM task_monitors "
+                    "WHERE task_date >= :lo AND task_date < :hi "
+                    "ON CONFLICT (task_id, task_date) DO NOTHING"
+                ),
+                {"lo": m, "hi": m_next},
+            )
+            m = m_next
+
+    # 4) swap: the only step that takes an exclusive lock, and it does no bulk work
+    op.execute("LOCK TABLE task_monitors IN ACCESS EXCLUSIVE MODE;")
+    # rows the copy read before a concurrent delete committed
+    op.execute("""
+    DELETE FROM task_monitors_part p USING task_monitors_part_deletes d
+    WHERE p.task_id = d.task_id AND p.task_date = d.task_date;
+    """)
+    op.execute("DROP TRIGGER trg_task_monitors_mirror ON task_monitors;")
+    op.execute("DROP FUNCTION task_monitors_mirror_to_part();")
+    op.execute("DROP TABLE task_monitors_part_deletes;")
+
+    op.execute("ALTER TABLE task_monitors RENAME TO task_monitors_legacy;")
+    op.execute("ALTER TABLE task_monitors_part RENAME TO task_monitors;")
+    op.execute("ALTER TRIGGER trg_task_monitors_part_set_timestamps ON task_monitors RENAME TO trg_task_monitors_set_timestamps;")
+    op.execute("DROP TABLE task_monitors_legacy;")
+
+    # names are free again once the legacy table is gone
+    op.execute("ALTER INDEX ix_task_monitors_part_psid_date RENAME TO ix_task_monitors_psid_date;")
+    op.execute("ALTER TABLE task_monitors RENAME CONSTRAINT task_monitors_part_pkey TO task_monitors_pkey;")
+    op.execute("""
+    ALTER TABLE task_monitors RENAME CONSTRAINT fk_task_monitors_part_project_staffing_restrict
+      TO fk_task_monitors_project_staffing_restrict;
+    """)
+
+    # task_id keeps counting from where the identity column left off
+    op.execute("CREATE SEQUENCE task_monitors_task_id_seq AS integer CYCLE OWNED BY task_monitors.task_id;")
+    op.execute("SELECT setval('task_monitors_task_id_seq', COALESCE((SELECT max(task_id) FROM task_monitors), 0) + 1, false);")
+    op.execute("ALTER TABLE task_monitors ALTER COLUMN task_id SET DEFAULT nextval('task_monitors_task_id_seq');")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Blocking copy back into a plain table; only meant for rolling back a bad deploy.
+    op.execute("""
+    CREATE TABLE task_monitors_plain (
+      task_id             integer     GENERATED BY DEFAULT AS IDENTITY (START WITH 1 CYCLE) PRIMARY KEY,
+      project_staffing_id bigint      NOT NULL,
+      task_date           date        NOT NULL,
+      task_completed      integer     NOT NULL DEFAULT 0,
+      task_inprogress     integer     NOT NULL DEFAULT 0,
+      task_reworked       integer     NOT NULL DEFAULT 0,
+      task_approved       integer     NOT NULL DEFAULT 0,
+      task_rejected       integer     NOT NULL DEFAULT 0,
+      task_reviewed       integer     NOT NULL DEFAULT 0,
+      hours_logged        numeric(4,2) NOT NULL DEFAULT 0.00,
+      billable            boolean     NOT NULL DEFAULT false,
+      description         text,
+      created_at          timestamptz NOT NULL DEFAULT now(),
+      updated_at          timestamptz NOT NULL DEFAULT now()
+    );
+    """)
+    op.execute(f"INSERT INTO task_monitors_plain ({COLUMNS}) SELECT {COLUMNS} FROM task_monitors;")
+    op.execute("SELECT setval(pg_get_serial_sequence('task_monitors_plain', 'task_id'), "
+               "COALESCE((SELECT max(task_id) FROM task_monitors_plain), 0) + 1, false);")
+    op.execute("DROP TABLE task_monitors CASCADE;")
+    op.execute("DROP FUNCTION IF EXISTS task_monitors_ensure_partitions(date, date, text);")
+    op.execute("ALTER TABLE task_monitors_plain RENAME TO task_monitors;")
+    op.create_foreign_key(
+        "fk_task_monitors_project_staffing_restrict",
+        source_table="task_monitors",
+        referent_table="project_staffing",
+        local_cols=["project_staffing_id"],
+        remote_cols=["id"],
+        ondelete="RESTRICT",
+    )
+    op.create_index("ix_task_monitors_psid_date", "task_monitors", ["project_staffing_id", "task_date"], unique=False)
+    op.execute("""
+    CREATE TRIGGER trg_task_monitors_set_timestamps
+    BEFORE INSERT OR UPDATE ON task_monitors
+    FOR EACH ROW EXECUTE FUNCTION set_row_timestamps();
+    """)
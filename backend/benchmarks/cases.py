@@ -0,0 +1,328 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import sqlalchemy as sa
+from pg_db import database
+from curd.tasks_monitor import TaskMonitorsCurd
+from curd.employees import EmployeesCurdOperation
+from curd.projects import ProjectsCurdOperation
+from curd.roles import RolesCurdOperation
+from curd.users import UserCurdOperation
+from curd.dashboard import DashboardCurdOperation
+from schema.tasks_monitor import TaskMonitorCreate, TaskMonitorUpdate
+from schema.employees import EmployeesEntry, EmployeesUpdate
+from schema.projects import ProjectsAdd, ProjectStaffingAdd, ProjectWithStaffingAdd, TrainerProjectUpdate
+from schema.roles import RolesEntry, RolesUpdate
+from schema.users import UserEntry, UserUpdate, UserLogin
+
+
+## One benchmark case per public CRUD method (plus a few filtered variants, `name[variant]`)
+#
+#  `call` is timed; `setup` runs first, untimed, and its result is passed to `call` (e.g.
+#  a freshly created row for a delete). Write cases run inside a transaction that is
+#  rolled back, so every iteration sees the same data. Ids come from Fixtures, read from
+#  the seeded database (seeder/seed_dummy_data.py) before timing starts.
+
+BENCHMARKED_CLASSES = (
+    TaskMonitorsCurd, EmployeesCurdOperation, ProjectsCurdOperation,
+    RolesCurdOperation, UserCurdOperation, DashboardCurdOperation,
+)
+
+
+@dataclass
+class Fixtures:
+    task_id: int
+    task_ids: List[int]
+    employee_id: str
+    employee_ids: List[str]
+    project_id: int
+    project_ids: List[int]
+    trainer_id: str           # staffed on project_id
+    role_id: str
+    user_id: str
+    username: str
+    last_day: date            # newest task_date
+    free_day: date            # a Saturday before last_day: the seeder leaves weekends empty
+
+
+async def load_fixtures() -> Fixtures:
+    newest = await database.fetch_one(sa.text(
+        "SELECT tm.task_id, tm.task_date, ps.project_id, ps.employees_id "
+        "FROM task_monitors tm JOIN project_staffing ps ON ps.id = tm.project_staffing_id "
+        "ORDER BY tm.task_date DESC, tm.task_id DESC LIMIT 1"
+    ))
+    if newest is None:
+        raise RuntimeError("no task_monitors rows; load a dataset first (python -m scripts.seed)")
+    user = await database.fetch_one(sa.text("SELECT id::text AS id, username FROM users ORDER BY username LIMIT 1"))
+    if user is None:
+        raise RuntimeError("no users; load a dataset with --users > 0")
+    last_day = newest["task_date"]
+    return Fixtures(
+        task_id=newest["task_id"],
+        task_ids=[r[0] for r in await database.fetch_all(sa.text(
+            "SELECT task_id FROM task_monitors ORDER BY task_date DESC, task_id DESC LIMIT 100"))],
+        employee_id=newest["employees_id"],
+        employee_ids=[r[0] for r in await database.fetch_all(sa.text(
+            "SELECT employees_id FROM employees ORDER BY employees_id LIMIT 100"))],
+        project_id=newest["project_id"],
+        project_ids=[r[0] for r in await database.fetch_all(sa.text(
+            "SELECT project_id FROM projects ORDER BY project_id LIMIT 100"))],
+        trainer_id=newest["employees_id"],
+        role_id=await database.fetch_val(sa.text("SELECT role_id::text FROM roles ORDER BY role_name LIMIT 1")),
+        user_id=user["id"],
+        username=user["username"],
+        last_day=last_day,
+        free_day=last_day - timedelta(days=(last_day.weekday() - 5) % 7 or 7),
+    )
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[Fixtures, Any], Awaitable[Any]]
+    setup: Optional[Callable[[Fixtures], Awaitable[Any]]] = None
+    writes: bool = False
+
+    @property
+    def method(self) -> str:
+        return self.name.split("[")[0]
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, writes: bool = False, setup: Optional[Callable[[Fixtures], Awaitable[Any]]] = None):
+    def register(call):
+        CASES.append(Case(name, call, setup, writes))
+        return call
+    return register
+
+
+def uncovered() -> List[str]:
+    """Public CRUD methods without a case, so a new method doesn't go unmeasured."""
+    covered = {c.method for c in CASES}
+    return [
+        f"{cls.__name__}.{name}"
+        for cls in BENCHMARKED_CLASSES
+        for name, attr in vars(cls).items()
+        if isinstance(attr, staticmethod) and not name.startswith("_") and f"{cls.__name__}.{name}" not in covered
+    ]
+
+
+# ── setups (untimed) ──
+
+async def _new_employee(fx: Fixtures) -> str:
+    await EmployeesCurdOperation.register_employee(EmployeesEntry(
+        employees_id="BENCH-DEL", first_name="Bench", last_name="Delete", email="bench.delete@gms.example.com",
+    ))
+    return "BENCH-DEL"
+
+
+async def _new_project(fx: Fixtures) -> int:
+    project = await ProjectsCurdOperation.add_project(ProjectsAdd(project_name="Bench Setup", active_at=fx.last_day, status="1"))
+    return project["project_id"]
+
+
+async def _new_staffing(fx: Fixtures) -> int:
+    project_id = await _new_project(fx)
+    await ProjectsCurdOperation.add_project_staffing(ProjectStaffingAdd(project_id=project_id, employees_id=fx.employee_id))
+    return project_id
+
+
+async def _new_role(fx: Fixtures) -> str:
+    return (await RolesCurdOperation.register_role(RolesEntry(role_name="Bench Delete")))["role_id"]
+
+
+async def _new_user(fx: Fixtures) -> str:
+    return (await UserCurdOperation.register_user(UserEntry(
+        username="bench-delete", password="password", first_name="Bench", last_name="Delete", gender="M",
+    )))["id"]
+
+
+# ── TaskMonitorsCurd ──
+
+@case("TaskMonitorsCurd.find_all_task")
+async def _(fx, _):
+    return await TaskMonitorsCurd.find_all_task(limit=100)
+
+@case("TaskMonitorsCurd.find_all_task[employee,30d]")
+async def _(fx, _):
+    return await TaskMonitorsCurd.find_all_task(
+        limit=100, employees_id=fx.employee_id, date_from=fx.last_day - timedelta(days=30), date_to=fx.last_day,
+    )
+
+@case("TaskMonitorsCurd.find_task_by_id")
+async def _(fx, _):
+    return await TaskMonitorsCurd.find_task_by_id(fx.task_id)
+
+@case("TaskMonitorsCurd.find_tasks_by_ids")
+async def _(fx, _):
+    return await TaskMonitorsCurd.find_tasks_by_ids(fx.task_ids)
+
+@case("TaskMonitorsCurd.register_task", writes=True)
+async def _(fx, _):
+    return await TaskMonitorsCurd.register_task(TaskMonitorCreate(
+        employees_id=fx.employee_id, project_id=fx.project_id, task_date=fx.free_day,
+        task_completed=8, task_approved=7, task_rejected=1, task_reviewed=8, hours_logged=8,
+    ))
+
+@case("TaskMonitorsCurd.update_task", writes=True)
+async def _(fx, _):
+    return await TaskMonitorsCurd.update_task(fx.task_id, TaskMonitorUpdate(task_completed=9, hours_logged=7.5))
+
+@case("TaskMonitorsCurd.delete_task", writes=True)
+async def _(fx, _):
+    return await TaskMonitorsCurd.delete_task(fx.task_id)
+
+
+# ── EmployeesCurdOperation ──
+
+@case("EmployeesCurdOperation.find_all_employees")
+async def _(fx, _):
+    return await EmployeesCurdOperation.find_all_employees(limit=50)
+
+@case("EmployeesCurdOperation.find_all_employees[search]")
+async def _(fx, _):
+    return await EmployeesCurdOperation.find_all_employees(q="sha", limit=50)
+
+@case("EmployeesCurdOperation.find_all_employees_name")
+async def _(fx, _):
+    return await EmployeesCurdOperation.find_all_employees_name()
+
+@case("EmployeesCurdOperation.find_employees_by_id")
+async def _(fx, _):
+    return await EmployeesCurdOperation.find_employees_by_id(fx.employee_id)
+
+@case("EmployeesCurdOperation.find_employees_by_ids")
+async def _(fx, _):
+    return await EmployeesCurdOperation.find_employees_by_ids(fx.employee_ids)
+
+@case("EmployeesCurdOperation.register_employee", writes=True)
+async def _(fx, _):
+    return await EmployeesCurdOperation.register_employee(EmployeesEntry(
+        employees_id="BENCH-NEW", first_name="Bench", last_name="New", email="bench.new@gms.example.com",
+    ))
+
+@case("EmployeesCurdOperation.update_employees", writes=True)
+async def _(fx, _):
+    return await EmployeesCurdOperation.update_employees(fx.employee_id, EmployeesUpdate(
+        first_name="Bench", last_name="Updated", email="bench.updated@gms.example.com",
+    ))
+
+@case("EmployeesCurdOperation.delete_employee", writes=True, setup=_new_employee)
+async def _(fx, employees_id):
+    return await EmployeesCurdOperation.delete_employee(employees_id)
+
+
+# ── ProjectsCurdOperation ──
+
+@case("ProjectsCurdOperation.find_all_projects")
+async def _(fx, _):
+    return await ProjectsCurdOperation.find_all_projects()
+
+@case("ProjectsCurdOperation.find_all_projects_with_trainer")
+async def _(fx, _):
+    return await ProjectsCurdOperation.find_all_projects_with_trainer()
+
+@case("ProjectsCurdOperation.find_project_by_id")
+async def _(fx, _):
+    return await ProjectsCurdOperation.find_project_by_id(fx.project_id, fx.trainer_id)
+
+@case("ProjectsCurdOperation.find_projects_by_ids")
+async def _(fx, _):
+    return await ProjectsCurdOperation.find_projects_by_ids(fx.project_ids)
+
+@case("ProjectsCurdOperation.get_projects_for_trainer")
+async def _(fx, _):
+    return await ProjectsCurdOperation.get_projects_for_trainer(fx.trainer_id)
+
+@case("ProjectsCurdOperation.add_project", writes=True)
+async def _(fx, _):
+    return await ProjectsCurdOperation.add_project(ProjectsAdd(project_name="Bench Project", active_at=fx.last_day, status="1"))
+
+@case("ProjectsCurdOperation.add_project_staffing", writes=True, setup=_new_project)
+async def _(fx, project_id):
+    return await ProjectsCurdOperation.add_project_staffing(ProjectStaffingAdd(project_id=project_id, employees_id=fx.employee_id))
+
+@case("ProjectsCurdOperation.add_project_with_staff", writes=True)
+async def _(fx, _):
+    return await ProjectsCurdOperation.add_project_with_staff(ProjectWithStaffingAdd(
+        project_name="Bench Staffed Project", active_at=fx.last_day, status="1", employees_id=fx.employee_id,
+    ))
+
+@case("ProjectsCurdOperation.update_project", writes=True)
+async def _(fx, _):
+    return await ProjectsCurdOperation.update_project(
+        fx.project_id, fx.trainer_id, TrainerProjectUpdate(project_name="Bench Renamed", pod_lead="Bench Lead"),
+    )
+
+@case("ProjectsCurdOperation.delete_project", writes=True, setup=_new_staffing)
+async def _(fx, project_id):
+    return await ProjectsCurdOperation.delete_project(project_id, fx.employee_id)
+
+
+# ── RolesCurdOperation ──
+
+@case("RolesCurdOperation.find_all_roles")
+async def _(fx, _):
+    return await RolesCurdOperation.find_all_roles()
+
+@case("RolesCurdOperation.register_role", writes=True)
+async def _(fx, _):
+    return await RolesCurdOperation.register_role(RolesEntry(role_name="Bench Role"))
+
+@case("RolesCurdOperation.update_role", writes=True)
+async def _(fx, _):
+    return await RolesCurdOperation.update_role(fx.role_id, RolesUpdate(role_name="Bench Renamed Role"))
+
+@case("RolesCurdOperation.delete_role", writes=True, setup=_new_role)
+async def _(fx, role_id):
+    return await RolesCurdOperation.delete_role(role_id)
+
+
+# ── UserCurdOperation ──
+
+@case("UserCurdOperation.find_all_users")
+async def _(fx, _):
+    return await UserCurdOperation.find_all_users()
+
+@case("UserCurdOperation.find_user_by_id")
+async def _(fx, _):
+    return await UserCurdOperation.find_user_by_id(fx.user_id)
+
+@case("UserCurdOperation.login")
+async def _(fx, _):
+    return await UserCurdOperation.login(UserLogin(username=fx.username, password="password"))
+
+@case("UserCurdOperation.register_user", writes=True)
+async def _(fx, _):
+    return await UserCurdOperation.register_user(UserEntry(
+        username="bench-new", password="password", first_name="Bench", last_name="New", gender="M",
+    ))
+
+@case("UserCurdOperation.update_user", writes=True)
+async def _(fx, _):
+    return await UserCurdOperation.update_user(fx.user_id, UserUpdate(
+        id=fx.user_id, first_name="Bench", last_name="Updated", gender="M", status="1",
+    ))
+
+@case("UserCurdOperation.delete_user", writes=True, setup=_new_user)
+async def _(fx, user_id):
+    return await UserCurdOperation.delete_user(user_id)
+
+
+# ── DashboardCurdOperation ──
+
+@case("DashboardCurdOperation.get_dashboard_summary")
+async def _(fx, _):
+    return await DashboardCurdOperation.get_dashboard_summary()
+
+@case("DashboardCurdOperation.get_dashboard_summary[30d]")
+async def _(fx, _):
+    return await DashboardCurdOperation.get_dashboard_summary(date_from=fx.last_day - timedelta(days=30), date_to=fx.last_day)
+
+
+def by_name() -> Dict[str, Case]:
+    return {c.name: c for c in CASES}
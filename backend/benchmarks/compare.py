@@ -0,0 +1,71 @@
+# benchmarks/compare.py
+# Flags regressions between two benchmark runs (benchmarks/run.py output):
+#   python -m benchmarks.compare benchmarks/results/main.json benchmarks/results/branch.json
+# A case regresses when its median is more than --threshold slower AND more than --min-ms
+# slower, so sub-millisecond noise doesn't fail the comparison. Exits 1 on any regression.
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, new: dict, threshold: float, min_ms: float):
+    """[(scale, case, base_ms, new_ms, change, verdict)] for cases present in both runs."""
+    rows = []
+    for scale, new_scale in new["scales"].items():
+        base_scale = base["scales"].get(scale)
+        if base_scale is None:
+            continue
+        for name, stats in new_scale["cases"].items():
+            before = base_scale["cases"].get(name)
+            if before is None:
+                rows.append((scale, name, None, stats["median_ms"], None, "new"))
+                continue
+            b, n = before["median_ms"], stats["median_ms"]
+            change = (n - b) / b if b else 0.0
+            if change > threshold and n - b > min_ms:
+                verdict = "REGRESSION"
+            elif change < -threshold and b - n > min_ms:
+                verdict = "faster"
+            else:
+                verdict = ""
+            rows.append((scale, name, b, n, change, verdict))
+        for name in new_scale.get("errors", {}):
+            rows.append((scale, name, None, None, None, "ERROR"))
+    return rows
+
+
+def _ms(value) -> str:
+    return f"{value:10.2f}" if value is not None else f"{'-':>10}"
+
+
+def main(args) -> int:
+    base, new = load(args.base), load(args.new)
+    rows = compare(base, new, args.threshold, args.min_ms)
+    print(f"base {base.get('git_commit')} ({base.get('created_at')})  vs  new {new.get('git_commit')} ({new.get('created_at')})")
+    print(f"{'scale':<8} {'case':<60} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    for scale, name, b, n, change, verdict in rows:
+        pct = f"{change:+8.1%}" if change is not None else f"{'':>8}"
+        print(f"{scale:<8} {name:<60} {_ms(b)} {_ms(n)} {pct}  {verdict}")
+    skipped = sorted(set(base["scales"]) - set(new["scales"]))
+    if skipped:
+        print("Scales only in base:", ", ".join(skipped))
+    failed = [r for r in rows if r[5] in ("REGRESSION", "ERROR")]
+    if failed:
+        print(f"❌ {len(failed)} regression(s)/error(s) over {args.threshold:.0%} and {args.min_ms} ms")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts, default 15%%")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="absolute slowdown that counts, default 0.5 ms")
+    sys.exit(main(parser.parse_args()))
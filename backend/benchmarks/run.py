@@ -0,0 +1,147 @@
+# benchmarks/run.py
+# Times every case in benchmarks/cases.py against the database in DATABASE_URL:
+#   python -m benchmarks.run --scale small --scale medium --load --out benchmarks/results/main.json
+#   python -m benchmarks.run --only TaskMonitorsCurd           (whatever is loaded, labelled "current")
+# --load reseeds (truncating!) with each scale's preset before timing it; use a local database.
+# Compare two runs with `python -m benchmarks.compare`.
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+from pg_db import database
+from cache.dimensions import dimensions
+from cache.invalidation import flush_all
+from curd.loaders import loader_scope
+from seeder.seed_dummy_data import seed_dummy_data
+from benchmarks.cases import CASES, Case, Fixtures, load_fixtures, uncovered
+
+# seed_dummy_data arguments per scale; task rows are roughly 40% of staffing * years * 235
+SCALES = {
+    "small": dict(employees=200, projects=40, staffing=300, years=1),
+    "medium": dict(employees=2000, projects=200, staffing=3000, years=3),
+    "large": dict(employees=10000, projects=800, staffing=10000, years=10),
+}
+COUNTED_TABLES = ["roles", "employees", "projects", "project_staffing", "task_monitors", "users"]
+
+
+async def time_case(case: Case, fx: Fixtures, iterations: int, warmup: int) -> list:
+    samples = []
+    for i in range(warmup + iterations):
+        await dimensions.warm()
+        if case.writes:
+            # rolled back, so every iteration starts from the seeded data
+            # one loader scope, so what setup primed is still there for the call
+            async with database.transaction(force_rollback=True):
+                with loader_scope():
+                    prepared = await case.setup(fx) if case.setup else None
+                    started = time.perf_counter()
+                    await case.call(fx, prepared)
+                    elapsed = time.perf_counter() - started
+            # caches may have been filled from inside the rolled-back transaction
+            flush_all()
+        else:
+            with loader_scope():
+                started = time.perf_counter()
+                await case.call(fx, None)
+                elapsed = time.perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed * 1000)
+    if not samples:
+        raise RuntimeError("no samples (--iterations 0?)")
+    return samples
+
+
+def summarise(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "min_ms": round(ordered[0], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "stdev_ms": round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+    }
+
+
+async def run_scale(cases, iterations: int, warmup: int) -> dict:
+    dataset = {t: await database.fetch_val(sa.text(f"SELECT count(*) FROM {t}")) for t in COUNTED_TABLES}
+    fx = await load_fixtures()
+    results, errors = {}, {}
+    # reads first: write cases flush the in-process caches after each iteration
+    for case in sorted(cases, key=lambda c: c.writes):
+        try:
+            results[case.name] = summarise(await time_case(case, fx, iterations, warmup))
+        except Exception as exc:
+            errors[case.name] = f"{type(exc).__name__}: {getattr(exc, 'detail', exc)}"
+        status = "error" if case.name in errors else f"{results[case.name]['median_ms']:.2f} ms"
+        print(f"  {case.name:<60} {status}")
+    return {"dataset": dataset, "cases": results, "errors": errors}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def main(args):
+    logging.basicConfig(level=logging.WARNING)
+    cases = [c for c in CASES if not args.only or any(o in c.name for o in args.only)]
+    missing = uncovered()
+    if missing:
+        print("⚠️  No benchmark case for:", ", ".join(missing))
+    scales = args.scale or ["current"]
+    if args.load and "current" in scales:
+        raise SystemExit("--load needs --scale (one of: %s)" % ", ".join(SCALES))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "scales": {},
+    }
+    await database.connect()
+    try:
+        for scale in scales:
+            if args.load:
+                print(f"Loading '{scale}' ...")
+                print("  ", await seed_dummy_data(seed=args.seed, truncate=True, end_date=args.end_date, **SCALES[scale]))
+            flush_all()
+            print(f"Timing '{scale}' ({args.iterations} runs per case):")
+            report["scales"][scale] = await run_scale(cases, args.iterations, args.warmup)
+    finally:
+        await database.disconnect()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    failed = sorted({name for r in report["scales"].values() for name in r["errors"]})
+    if failed:
+        # a case that can't run has no timings to compare; don't let the run pass for it
+        raise SystemExit(f"❌ Results written to {args.out}, but {len(failed)} case(s) failed: {', '.join(failed)}")
+    print("✅ Results written to", args.out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the public CRUD methods against a seeded database")
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="repeatable; default: the loaded data as 'current'")
+    parser.add_argument("--load", action="store_true", help="truncate and seed each scale before timing it")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None,
+                        help="YYYY-MM-DD, fixes the dataset across days (default: today)")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", action="append", help="substring of case names to run; repeatable")
+    parser.add_argument("--out", default=f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}.json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional
+
+import sqlalchemy as sa
+from pg_db import database, roles, employees, projects
+from cache.invalidation import subscribe
+
+logger = logging.getLogger(__name__)
+
+
+## Small, rarely changing lookup tables kept in memory
+#
+#  roles      role_id (str)     -> roles row, ordered by role_name
+#  employees  employees_id      -> display fields (names, role, status)
+#  projects   project_id        -> project_name
+#
+#  Loaded at startup and dropped on writes (cache.invalidation); the next read reloads.
+#  A key that isn't in memory (a row another worker just inserted) forces one reload.
+#  Returned dicts are shared: callers copy before changing anything.
+
+
+async def _load_roles() -> Dict[str, Dict[str, Any]]:
+    rows = await database.fetch_all(sa.select(roles).order_by(roles.c.role_name.asc()))
+    return {str(r["role_id"]): dict(r) for r in rows}
+
+
+async def _load_employees() -> Dict[str, Dict[str, Any]]:
+    e = employees
+    rows = await database.fetch_all(
+        sa.select(e.c.employees_id, e.c.first_name, e.c.last_name, e.c.role, e.c.status)
+    )
+    return {r["employees_id"]: dict(r) for r in rows}
+
+
+async def _load_projects() -> Dict[int, str]:
+    rows = await database.fetch_all(sa.select(projects.c.project_id, projects.c.project_name))
+    return {r["project_id"]: r["project_name"] for r in rows}
+
+
+class DimensionCache:
+
+    LOADERS: Dict[str, Callable[[], Awaitable[Dict[Any, Any]]]] = {
+        "roles": _load_roles,
+        "employees": _load_employees,
+        "projects": _load_projects,
+    }
+
+    def __init__(self):
+        self._data: Dict[str, Dict[Any, Any]] = {}
+        self._version: Dict[str, int] = {name: 0 for name in self.LOADERS}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _get(self, name: str, require: Iterable[Any] = ()) -> Dict[Any, Any]:
+        data = self._data.get(name)
+        if data is not None and all(k in data for k in require):
+            return data
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            fresh = self._data.get(name)
+            if fresh is not None and fresh is not data:
+                return fresh  # someone reloaded while we waited
+            version = self._version[name]
+            data = await self.LOADERS[name]()
+            # a write that landed during the load may not be in `data`; keep it out of memory
+            if self._version[name] == version:
+                self._data[name] = data
+            return data
+
+    def invalidate(self, tables: Optional[FrozenSet[str]]) -> None:
+        for name in self.LOADERS:
+            if tables is None or name in tables:
+                self._data.pop(name, None)
+                self._version[name] += 1
+
+    async def warm(self) -> None:
+        for name in self.LOADERS:
+            await self._get(name)
+
+    async def roles(self) -> Dict[str, Dict[str, Any]]:
+        return await self._get("roles")
+
+    async def employees(self, require: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        return await self._get("employees", require)
+
+    async def projects(self, require: Iterable[int] = ()) -> Dict[int, str]:
+        return await self._get("projects", require)
+
+    async def role_name(self, role_id: Any) -> Optional[str]:
+        if role_id is None:
+            return None
+        role = (await self._get("roles", [str(role_id)])).get(str(role_id))
+        return role["role_name"] if role else None
+
+
+dimensions = DimensionCache()
+subscribe(dimensions.invalidate)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import hashlib
+import logging
+from typing import Dict, FrozenSet, Iterable, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+from pg_db import database, table_version_seq
+from config import settings
+from cache.invalidation import subscribe
+from cache.notify import listening
+
+logger = logging.getLogger(__name__)
+
+
+## ETag from per-table change markers
+#
+#  Every cached table has a version sequence (pg_db.py), bumped by the statement trigger
+#  that also sends the cache NOTIFY, and bumped again by each worker's listener when that
+#  NOTIFY arrives, i.e. after the write committed. A response's ETag is derived from the
+#  versions of the tables it reads plus the request key, so checking If-None-Match never
+#  runs the endpoint's own query.
+#  The trigger's bump is visible before its transaction commits, so a response read in
+#  that window can pair the new version with the old rows; the post-commit bump moves the
+#  version past it. That needs the listener, so ETags are only handed out while it is
+#  connected (cache/notify.py). Versions are memoised and dropped on every invalidation,
+#  a lost listener included, so a 304 normally costs no database round trip at all.
+
+VERSIONS_SQL = """
+SELECT sequencename, last_value FROM pg_sequences
+WHERE schemaname = current_schema() AND sequencename = ANY(:names)
+"""
+
+
+class TableVersions:
+
+    def __init__(self):
+        self._known: Dict[str, int] = {}
+        self._generation = 0
+
+    def invalidate(self, tables: Optional[FrozenSet[str]]) -> None:
+        self._generation += 1
+        if tables is None:
+            self._known.clear()
+        else:
+            for t in tables:
+                self._known.pop(t, None)
+
+    async def get(self, tables: Iterable[str]) -> Dict[str, int]:
+        tables = sorted(tables)
+        missing = [t for t in tables if t not in self._known]
+        found: Dict[str, int] = {}
+        if missing:
+            generation = self._generation
+            names = {table_version_seq(t): t for t in missing}
+            q = sa.text(VERSIONS_SQL).bindparams(sa.bindparam("names", list(names), type_=ARRAY(sa.String)))
+            # last_value is NULL until the sequence is first used
+            found = {names[r["sequencename"]]: r["last_value"] or 0 for r in await database.fetch_all(q)}
+            for t in missing:
+                found.setdefault(t, 0)
+            if generation == self._generation:
+                self._known.update(found)
+        return {t: found[t] if t in found else self._known[t] for t in tables}
+
+
+versions = TableVersions()
+subscribe(versions.invalidate)
+
+
+async def validators(key: str, tables: Iterable[str]) -> Optional[str]:
+    """ETag for the response at `key` that reads `tables`; None while invalidations can't be heard."""
+    if not listening():
+        return None
+    current = await versions.get(tables)
+    marker = ",".join(f"{t}:{v}" for t, v in current.items())
+    digest = hashlib.sha1(f"{settings.APP_VERSION}|{key}|{marker}".encode()).hexdigest()[:24]
+    # weak: derived from what the body was built from, not from its bytes
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
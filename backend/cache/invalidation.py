@@ -0,0 +1,41 @@
+from __future__ import annotations
+import logging
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+## In-process invalidation hub
+#
+#  CRUD writes call tables_changed(<table>, ...) once the write is done (and again after
+#  the surrounding transaction commits, where there is one). Every cache in the worker
+#  subscribes and drops whatever it derived from those tables. `None` means "everything".
+#  Invalidations relayed from other workers (cache/notify.py) are dispatched with
+#  remote=True; a cache shared between workers can choose to hear only one kind.
+
+Listener = Callable[[Optional[FrozenSet[str]]], None]
+
+_listeners: List[Tuple[Listener, bool, bool]] = []
+
+
+def subscribe(listener: Listener, local: bool = True, remote: bool = True) -> Listener:
+    _listeners.append((listener, local, remote))
+    return listener
+
+
+def _dispatch(tables: Optional[FrozenSet[str]], remote: bool) -> None:
+    for listener, hears_local, hears_remote in _listeners:
+        if not (hears_remote if remote else hears_local):
+            continue
+        try:
+            listener(tables)
+        except Exception:
+            logger.exception("cache invalidation listener failed")
+
+
+def tables_changed(*tables: str, remote: bool = False) -> None:
+    _dispatch(frozenset(tables), remote)
+
+
+def flush_all(remote: bool = False) -> None:
+    _dispatch(None, remote)
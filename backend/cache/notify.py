@@ -0,0 +1,106 @@
+from __future__ import annotations
+import asyncio
+import logging
+from typing import Optional
+
+import asyncpg
+from pg_db import database, CACHE_INVALIDATION_CHANNEL, NOTIFIED_TABLES
+from config import settings
+from cache.invalidation import tables_changed, flush_all
+
+logger = logging.getLogger(__name__)
+
+
+## Cross-worker invalidation over LISTEN/NOTIFY
+#
+#  Triggers on the cached tables NOTIFY the table name at commit (see pg_db.py). Each
+#  worker keeps one dedicated connection LISTENing and forwards every message to the
+#  in-process hub, so all workers drop the same entries a local write would.
+#  Notifications sent while we weren't listening are lost, so every (re)connect starts
+#  with a full flush.
+#  The listener also bumps each notified table's version sequence (pg_db.py) before
+#  forwarding the message. The trigger's own bump is visible before its write commits;
+#  this one happens after, so an ETag computed in between can't match the committed rows
+#  (cache/etag.py). listening() is False whenever messages could be missed.
+
+_listening = False
+
+
+def listening() -> bool:
+    return _listening
+
+
+def _dsn() -> str:
+    # `databases` URLs carry the driver ("postgresql+asyncpg://"); asyncpg wants plain libpq form
+    return str(database.url).replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+BUMP_SQL = "SELECT nextval(('table_version_' || t)::regclass) FROM unnest($1::text[]) AS t"
+
+
+async def _bump(conn: asyncpg.Connection, tables) -> None:
+    await conn.fetch(BUMP_SQL, sorted(tables), timeout=settings.CACHE_NOTIFY_KEEPALIVE_SECONDS)
+
+
+async def _listen_until_lost(conn: asyncpg.Connection, ready: Optional[asyncio.Event]) -> None:
+    global _listening
+    lost = asyncio.Event()
+    pending: "asyncio.Queue[str]" = asyncio.Queue()
+    conn.add_termination_listener(lambda c: lost.set())
+    await conn.add_listener(CACHE_INVALIDATION_CHANNEL, lambda c, pid, channel, payload: pending.put_nowait(payload))
+    # anything written while we weren't listening gets a version no earlier ETag carries
+    await _bump(conn, NOTIFIED_TABLES)
+    flush_all(remote=True)
+    _listening = True
+    logger.info("Listening for cache invalidations on %s", CACHE_INVALIDATION_CHANNEL)
+    if ready is not None:
+        ready.set()
+    try:
+        while not lost.is_set():
+            getter = asyncio.ensure_future(pending.get())
+            waiter = asyncio.ensure_future(lost.wait())
+            try:
+                done, _ = await asyncio.wait({getter, waiter}, timeout=settings.CACHE_NOTIFY_KEEPALIVE_SECONDS,
+                                             return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                getter.cancel()
+                waiter.cancel()
+            if getter in done:
+                payloads = [getter.result()]
+                while not pending.empty():
+                    payloads.append(pending.get_nowait())
+                tables = {t for p in payloads for t in p.split(",") if t}
+                if tables:
+                    try:
+                        await _bump(conn, tables)
+                    finally:
+                        tables_changed(*tables, remote=True)
+            elif not done:
+                # a half-open TCP connection never reports termination; a round trip does
+                await conn.fetchval("SELECT 1", timeout=settings.CACHE_NOTIFY_KEEPALIVE_SECONDS)
+    finally:
+        _listening = False
+
+
+async def invalidation_listener(ready: Optional[asyncio.Event] = None) -> None:
+    """Runs for the lifetime of the worker; reconnects with backoff. Sets `ready` once listening."""
+    backoff = 1.0
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_dsn())
+            backoff = 1.0
+            await _listen_until_lost(conn, ready)
+            logger.warning("Cache invalidation listener lost its connection; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache invalidation listener failed; reconnecting in %.0fs", backoff)
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        # nothing is heard until we reconnect; don't keep serving entries we can't invalidate,
+        # nor the table versions memoised for ETags (cache/etag.py subscribes to the flush)
+        flush_all(remote=True)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+import functools
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from config import settings
+from cache.invalidation import subscribe
+from cache.shared import shared_cache
+from cache.singleflight import flights
+from cache.etag import validators, etag_matches
+from observability.asgi import route_template
+
+logger = logging.getLogger(__name__)
+
+
+## Response cache for GET routes
+#
+#  Key  : path + normalised query string (sorted by name, blanks dropped), so `?b=2&a=1`
+#         and `?a=1&b=2&c=` share an entry.
+#  Tags : the tables the endpoint reads. tables_changed() from a CRUD write drops every
+#         entry tagged with one of those tables.
+#  The endpoint's return value is stored as is; FastAPI still applies response_model.
+#  With SHARED_CACHE_ENABLED a local miss falls through to the host-wide tier
+#  (cache/shared.py) before running the endpoint. Concurrent misses for the same key
+#  share one execution (cache/singleflight.py). While the NOTIFY listener is up, every
+#  response carries an ETag built from the tables' change markers; a matching
+#  If-None-Match gets a 304 (cache/etag.py).
+
+
+def cache_key(request: Request) -> str:
+    # sorted by name only: repeated params (?ids=3&ids=1) keep their order, which can matter
+    params = sorted(((k, v) for k, v in request.query_params.multi_items() if v != ""), key=lambda kv: kv[0])
+    return f"{request.url.path}?{urlencode(params)}" if params else request.url.path
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, FrozenSet[str], Any]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._generation: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        expires, _, value = entry
+        if expires < time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def generations(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generation.get(t, 0) for t in tags)
+
+    def put(self, key: str, tags: FrozenSet[str], value: Any, ttl: Optional[float] = None,
+            seen: Optional[Tuple[int, ...]] = None) -> None:
+        # a write to one of the tags while the endpoint ran: the value may predate it
+        if seen is not None and seen != self.generations(tags):
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), tags, value)
+        for t in tags:
+            self._by_tag.setdefault(t, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for t in entry[1]:
+            keys = self._by_tag.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[t]
+
+    def invalidate(self, tables: Optional[FrozenSet[str]]) -> None:
+        if tables is None:
+            # every entry carries the "*" tag, so bumping it fails any in-flight put too
+            self._generation["*"] = self._generation.get("*", 0) + 1
+            self._entries.clear()
+            self._by_tag.clear()
+            return
+        for t in tables:
+            self._generation[t] = self._generation.get(t, 0) + 1
+            for key in list(self._by_tag.get(t, ())):
+                self._drop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+subscribe(response_cache.invalidate)
+
+
+def _with_headers(value: Any, response: Response) -> Any:
+    """
+    FastAPI ignores the injected `response` when an endpoint returns a Response of its own
+    (e.g. a sparse fieldset, curd/fields.py), so copy ours onto a fresh one. Fresh because
+    the cached object is shared between requests.
+    """
+    if not isinstance(value, Response) or not response.headers:
+        return value
+    out = Response(content=value.body, status_code=value.status_code, media_type=value.media_type)
+    for name, header in response.headers.items():
+        if name != "content-length":
+            out.headers[name] = header
+    return out
+
+
+def cached(*tags: str, ttl: Optional[float] = None) -> Callable:
+    """
+    Put under @router.get(...):
+
+        @router.get("/summary")
+        @cached("task_monitors", "project_staffing", ttl=30)
+        async def get_dashboard_summary(...): ...
+    """
+    tag_set = frozenset(tags) | {"*"}
+
+    def decorator(func: Callable) -> Callable:
+        sig = inspect.signature(func, eval_str=True)
+        # FastAPI hands the wrapper these; the endpoint only gets the ones it declares itself
+        injected = {name: cls for name, cls in (("request", Request), ("response", Response)) if name not in sig.parameters}
+
+        @functools.wraps(func)
+        async def wrapper(*args, request: Request, response: Response, **kwargs):
+            if "request" not in injected:
+                kwargs["request"] = request
+            if "response" not in injected:
+                kwargs["response"] = response
+            key = cache_key(request)
+
+            if settings.ETAG_ENABLED:
+                # conditional GET: answered from the table change markers alone
+                try:
+                    etag = await validators(key, tag_set - {"*"})
+                except Exception:
+                    logger.exception("ETag lookup failed for %s; serving without validators", key)
+                    etag = None
+                if etag is not None:
+                    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+                    if etag_matches(request.headers.get("if-none-match"), etag):
+                        return Response(status_code=304, headers=headers)
+                    response.headers.update(headers)
+
+            seen = response_cache.generations(tag_set)
+            # identical concurrent misses run the endpoint once; the generations are part of
+            # the flight key so a request that arrives after a write never joins an older read
+            flight_key = f"{key}#{seen}"
+            # the full declared path; scope["route"] may only hold the router-relative one
+            route = route_template(request.scope) or request.url.path
+            if not settings.RESPONSE_CACHE_ENABLED:
+                value = await flights.do(flight_key, lambda: func(*args, **kwargs), label=route)
+                return _with_headers(value, response)
+
+            hit, value = response_cache.get(key)
+            if hit:
+                return _with_headers(value, response)
+            if shared_cache is not None:
+                # another worker on this host may already have computed it
+                hit, value = shared_cache.get(key)
+                if hit:
+                    response_cache.put(key, tag_set, value, ttl=ttl, seen=seen)
+                    return _with_headers(value, response)
+                shared_seen = shared_cache.generations(tag_set)
+            value = await flights.do(flight_key, lambda: func(*args, **kwargs), label=route)
+            response_cache.put(key, tag_set, value, ttl=ttl, seen=seen)
+            if shared_cache is not None:
+                shared_cache.put(key, shared_seen, value, response_cache.ttl if ttl is None else ttl)
+            return _with_headers(value, response)
+
+        # FastAPI reads the signature: keep the endpoint's own params and add the injected ones
+        if injected:
+            params = list(sig.parameters.values()) + [
+                inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=cls)
+                for name, cls in injected.items()
+            ]
+            wrapper.__signature__ = sig.replace(parameters=params)
+        return wrapper
+
+    return decorator
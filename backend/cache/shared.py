@@ -0,0 +1,242 @@
+from __future__ import annotations
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from config import settings
+from cache.invalidation import subscribe
+from cache.notify import listening
+
+logger = logging.getLogger(__name__)
+
+
+## Host-wide cache tier shared by all gunicorn workers (optional: SHARED_CACHE_ENABLED)
+#
+#  Lives on tmpfs (/dev/shm), so entries are in RAM and counted once per host.
+#  - one file per entry, written to a temp name and os.replace()d: readers see the old
+#    entry or the new one, never a torn write
+#  - `generations` is a small mmap'd array of counters, one slot per table tag (hashed).
+#    Invalidating a table bumps its slot; every entry records the slot values it was
+#    computed under and is ignored once any of them moves on. A worker bumps slots for
+#    its own writes; the same write also reaches every other worker over NOTIFY, and of
+#    those relays only one worker per host (the holder of the `relay` lock) applies them,
+#    so writes from other hosts still invalidate the tier and local ones bump once more,
+#    not once per worker
+#  - trimming the directory runs in a thread, off the event loop
+#  Entries are JSON (never pickles: nothing read back can run code), and the tier only
+#  turns on when its directory is a real directory private to the service user, since
+#  /dev/shm is world-writable and someone else could have created the path first.
+
+SLOTS = 256
+_MAGIC = b"GMSC"
+_HEADER = struct.Struct("<4sdH")     # magic, expires_at (wall clock), tag count
+_TAG = struct.Struct("<HQ")          # slot, generation
+
+
+def _default_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "gms-cache")
+
+
+def _slot(tag: str) -> int:
+    return zlib.crc32(tag.encode()) % SLOTS
+
+
+def _check_private(directory: str) -> None:
+    """makedirs() leaves an existing path as it is: refuse one we don't solely own."""
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"{directory} must be a directory (not a symlink) owned by uid {os.getuid()} "
+            f"with no group/other access; found uid {st.st_uid}, mode {stat.filemode(st.st_mode)}"
+        )
+
+
+# Endpoints return JSON-able data, or a pre-rendered Response (sparse fieldsets, curd/fields.py).
+# Values come back as JSON types (dates as ISO strings); response_model parses them as usual.
+def _encode(value: Any) -> bytes:
+    if isinstance(value, Response):
+        doc = {"response": {"body": value.body.decode(), "status_code": value.status_code, "media_type": value.media_type}}
+    else:
+        doc = {"value": jsonable_encoder(value)}
+    return json.dumps(doc, separators=(",", ":")).encode()
+
+
+def _decode(payload: bytes) -> Any:
+    doc = json.loads(payload)
+    if "response" in doc:
+        r = doc["response"]
+        return Response(content=r["body"], status_code=r["status_code"], media_type=r["media_type"])
+    return doc["value"]
+
+
+class SharedCache:
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+        self._gen_path = os.path.join(directory, "generations")
+        # kept open: invalidate() serialises its increments on a flock of this descriptor
+        self._gen_fd = os.open(self._gen_path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        if os.fstat(self._gen_fd).st_size < SLOTS * 8:
+            os.ftruncate(self._gen_fd, SLOTS * 8)
+        self._gen = mmap.mmap(self._gen_fd, SLOTS * 8)
+        self._relay_fd = os.open(os.path.join(directory, "relay"), os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        self._relaying = False
+        self._puts = 0
+        self._trimming: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ── generations ──
+
+    def _generation(self, slot: int) -> int:
+        return struct.unpack_from("<Q", self._gen, slot * 8)[0]
+
+    def generations(self, tags: Iterable[str]) -> Tuple[Tuple[int, int], ...]:
+        return tuple((s, self._generation(s)) for s in sorted({_slot(t) for t in tags}))
+
+    def invalidate(self, tables: Optional[FrozenSet[str]]) -> None:
+        slots = range(SLOTS) if tables is None else {_slot(t) for t in tables}
+        # increments from several workers must not be lost: serialise them on the file lock
+        fcntl.flock(self._gen_fd, fcntl.LOCK_EX)
+        try:
+            for s in slots:
+                struct.pack_into("<Q", self._gen, s * 8, self._generation(s) + 1)
+        finally:
+            fcntl.flock(self._gen_fd, fcntl.LOCK_UN)
+
+    def invalidate_relayed(self, tables: Optional[FrozenSet[str]]) -> None:
+        """An invalidation heard over NOTIFY: every worker on the host hears it, one applies it."""
+        if not listening():
+            # the listener is (re)connecting and may have missed messages: flush, and let a
+            # worker that is listening take over the relay until this one is back
+            if self._relaying:
+                fcntl.flock(self._relay_fd, fcntl.LOCK_UN)
+                self._relaying = False
+            self.invalidate(tables)
+            return
+        if not self._relaying:
+            try:
+                fcntl.flock(self._relay_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._relaying = True
+            except BlockingIOError:
+                return
+        self.invalidate(tables)
+
+    # ── entries ──
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            fd = os.open(self._path(key), os.O_RDONLY | os.O_NOFOLLOW)
+            with open(fd, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, expires, n_tags = _HEADER.unpack_from(mm, 0)
+                offset = _HEADER.size
+                fresh = magic == _MAGIC and expires > time.time()
+                for _ in range(n_tags if fresh else 0):
+                    slot, gen = _TAG.unpack_from(mm, offset)
+                    offset += _TAG.size
+                    if self._generation(slot) != gen:
+                        fresh = False
+                        break
+                if fresh:
+                    offset = _HEADER.size + n_tags * _TAG.size
+                    value = _decode(mm[offset:])
+                    self.hits += 1
+                    return True, value
+        except (FileNotFoundError, ValueError, struct.error):
+            pass  # absent, or empty/short file
+        except Exception:
+            logger.exception("shared cache read failed for %s", key)
+        self.misses += 1
+        return False, None
+
+    def put(self, key: str, seen: Tuple[Tuple[int, int], ...], value: Any, ttl: float) -> None:
+        # computed under generations that have since moved on: don't publish it
+        if any(self._generation(s) != g for s, g in seen):
+            return
+        try:
+            payload = _encode(value)
+        except Exception:
+            logger.debug("shared cache: %s is not JSON-encodable; skipped", key)
+            return
+        body = b"".join(
+            [_HEADER.pack(_MAGIC, time.time() + ttl, len(seen))]
+            + [_TAG.pack(s, g) for s, g in seen]
+            + [payload]
+        )
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            try:
+                os.unlink(tmp)   # left over from a crashed write
+            except FileNotFoundError:
+                pass
+            with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600), "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            logger.exception("shared cache write failed for %s", key)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self._puts += 1
+        if self._puts % 50 == 0 and (self._trimming is None or self._trimming.done()):
+            self._trimming = asyncio.ensure_future(asyncio.to_thread(self._trim))
+
+    def _trim(self) -> None:
+        """Drop expired entries, then the oldest ones, until the store fits in max_bytes."""
+        try:
+            self._trim_entries()
+        except Exception:
+            logger.exception("shared cache trim failed")
+
+    def _trim_entries(self) -> None:
+        now = time.time()
+        entries = []
+        for e in os.scandir(self.directory):
+            if e.name in ("generations", "relay") or e.name.endswith(".tmp"):
+                continue
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes * 0.9 and mtime + settings.RESPONSE_CACHE_TTL_SECONDS > now:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+shared_cache: Optional[SharedCache] = None
+if settings.SHARED_CACHE_ENABLED:
+    try:
+        shared_cache = SharedCache(settings.SHARED_CACHE_DIR or _default_dir(), settings.SHARED_CACHE_MAX_BYTES)
+        subscribe(shared_cache.invalidate, remote=False)
+        subscribe(shared_cache.invalidate_relayed, local=False)
+    except OSError:
+        logger.exception("Shared cache disabled: cannot open its directory")
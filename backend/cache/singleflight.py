@@ -0,0 +1,54 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict
+
+from observability.sql import RequestQueries, adopt_queries, collect_queries
+
+
+## Single-flight: concurrent callers with the same key share one execution
+#
+#  The first caller starts the work as its own task; everyone with the same key,
+#  the first caller included, awaits that task. A caller that goes away (client
+#  disconnect) therefore doesn't cancel the result the others are waiting for.
+#  The task runs in an empty context, not a copy of the first caller's: its trace
+#  spans, loader scope and statement log belong to no one request. Its statements
+#  are counted towards the caller that started it once it is done.
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executed: Counter = Counter()    # label -> executions started
+        self.coalesced: Counter = Counter()   # label -> callers that joined one
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], label: str = "") -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced[label] += 1
+            return await asyncio.shield(task)
+        queries = RequestQueries()
+        task = contextvars.Context().run(asyncio.ensure_future, self._run(fn, queries))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        self.executed[label] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            adopt_queries(queries)
+
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[Any]], queries: RequestQueries) -> Any:
+        collect_queries(queries)
+        return await fn()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            label: {"executed": self.executed[label], "coalesced": self.coalesced[label]}
+            for label in set(self.executed) | set(self.coalesced)
+        }
+
+
+flights = SingleFlight()
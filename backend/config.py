@@ -1,6 +1,6 @@
 from pydantic import AnyUrl
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     # Async URL for runtime (databases/asyncpg)
@@ -14,6 +14,93 @@ class Settings(BaseSettings):
     APP_NAME: str = "GMS Project Management System"
     APP_VERSION: str = "1.0.0"
 
+    # task_monitors partitions: months created ahead of today, and how often to check
+    TASK_PARTITION_MONTHS_AHEAD: int = 3
+    TASK_PARTITION_CHECK_SECONDS: int = 6 * 60 * 60
+
+    # task_monitors archival: rows older than the horizon move to task_monitors_archive.
+    # Leave ARCHIVE_ENABLED off to run it from cron via scripts/archive_task_monitors.py instead.
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_HORIZON_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 5000
+    ARCHIVE_INTERVAL_SECONDS: int = 24 * 60 * 60
+
+    # GET response cache (cache/response.py): per-worker, LRU-bounded, dropped on writes
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+
+    # change_log behind GET /api/changes: how long entries are kept, and how often to prune
+    CHANGE_LOG_RETENTION_DAYS: int = 7
+    CHANGE_LOG_PRUNE_INTERVAL_SECONDS: int = 60 * 60
+
+    # Live dashboard over SSE (routers/events.py, jobs/dashboard_feed.py)
+    SSE_MAX_SUBSCRIBERS: int = 500          # per worker
+    SSE_QUEUE_SIZE: int = 16                # pending deltas per client before they coalesce
+    SSE_DEBOUNCE_SECONDS: float = 0.25
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    SSE_RETRY_MS: int = 5000
+
+    # ETag on @cached routes, from the per-table version sequences (cache/etag.py);
+    # only sent while the cache NOTIFY listener below is connected
+    ETAG_ENABLED: bool = True
+
+    # Host-wide response cache tier on tmpfs shared by all workers (cache/shared.py)
+    SHARED_CACHE_ENABLED: bool = False
+    SHARED_CACHE_DIR: Optional[str] = None          # default /dev/shm/gms-cache
+    SHARED_CACHE_MAX_BYTES: int = 32 * 1024 * 1024   # containers often get a 64 MiB /dev/shm
+
+    # Cross-worker cache invalidation over LISTEN/NOTIFY (cache/notify.py)
+    CACHE_NOTIFY_ENABLED: bool = True
+    CACHE_NOTIFY_KEEPALIVE_SECONDS: float = 30.0
+
+    # Batch-get endpoints (GET /api/<resource>/batch?ids=..)
+    BATCH_GET_MAX_IDS: int = 100
+
+    # SQL instrumentation: Server-Timing header and slow-query log (observability/sql.py)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 200.0
+
+    # Background EXPLAIN of slow statements (observability/explain.py)
+    EXPLAIN_CAPTURE_ENABLED: bool = True
+    EXPLAIN_THRESHOLD_MS: float = 500.0
+    EXPLAIN_SAMPLE_RATE: float = 0.2
+    EXPLAIN_MAX_PER_MINUTE: int = 6
+    EXPLAIN_FINGERPRINT_COOLDOWN_SECONDS: float = 600.0
+    EXPLAIN_BUFFER_SIZE: int = 100
+
+    # /api/admin/* require `X-Admin-Token: <ADMIN_TOKEN>`; unset disables them
+    ADMIN_TOKEN: Optional[str] = None
+
+    # GET /metrics and the per-route request metrics behind it (observability/metrics.py)
+    METRICS_ENABLED: bool = True
+
+    # Request tracing (observability/tracing.py): "none" turns it off entirely
+    TRACE_EXPORTER: Literal["none", "file", "otlp"] = "none"
+    TRACE_SAMPLE_RATE: float = 0.05                 # for requests without a sampled traceparent
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_BATCH_SIZE: int = 512
+    TRACE_QUEUE_SIZE: int = 8192                    # spans beyond this are dropped, not waited on
+    TRACE_EXPORT_INTERVAL_SECONDS: float = 5.0
+
+    # On-demand profiles (observability/profiling.py): `X-Profile: 1` plus the admin token
+    PROFILE_INTERVAL_MS: float = 2.0
+    PROFILE_MAX_SECONDS: float = 60.0               # sampler gives up on longer requests
+    PROFILE_BUFFER_SIZE: int = 20                   # kept per worker, oldest dropped
+
+    # Event-loop lag monitor (observability/loop_lag.py)
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.25
+    LOOP_BLOCKED_THRESHOLD_MS: float = 100.0        # stalls over this are logged with stacks
+
+    # Default traceback depth for /api/admin/tracemalloc/start (observability/memory.py)
+    TRACEMALLOC_FRAMES: int = 25
+
+    # Statement budgets per endpoint (observability/query_budget.py); the check only logs
+    QUERY_BUDGET_FILE: str = "query_budgets.json"
+    QUERY_BUDGET_CHECK: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
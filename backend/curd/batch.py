@@ -0,0 +1,32 @@
+from __future__ import annotations
+from typing import Any, Dict, Hashable, List, Sequence
+
+from fastapi import HTTPException, status
+from config import settings
+
+
+## Helpers for the batch-get endpoints
+#
+#  The CRUD methods fetch every id with one `= ANY(:ids)` query; these check the id list
+#  up front and lay the rows back out in the order the caller asked for.
+
+
+def unique_ids(ids: Sequence[Hashable]) -> List[Hashable]:
+    """Distinct ids, first-seen order. 400 on an empty or oversized list."""
+    if not ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one id is required")
+    distinct = list(dict.fromkeys(ids))
+    if len(distinct) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids per request (got {len(distinct)})",
+        )
+    return distinct
+
+
+def in_request_order(ids: Sequence[Hashable], found: Dict[Hashable, Any]) -> Dict[str, Any]:
+    """`items[i]` is the record for `ids[i]`, or None when there is none (also listed in `not_found`)."""
+    return {
+        "items": [found.get(i) for i in ids],
+        "not_found": [i for i in dict.fromkeys(ids) if i not in found],
+    }
@@ -0,0 +1,29 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Dict
+
+from curd.roles import RolesCurdOperation
+from curd.employees import EmployeesCurdOperation
+from curd.projects import ProjectsCurdOperation
+from curd.dashboard import DashboardCurdOperation
+
+# Everything GET /api/bootstrap reads; its ETag is built from these tables' versions
+BOOTSTRAP_TABLES = (
+    "roles", "employees", "projects", "project_staffing",
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+)
+
+
+class BootstrapCurdOperation:
+
+    @staticmethod
+    async def load() -> Dict[str, Any]:
+        # gather() runs each read in its own task, and `databases` gives every task its
+        # own pooled connection, so the four lists are fetched side by side
+        roles, employees, projects, dashboard = await asyncio.gather(
+            RolesCurdOperation.find_all_roles(),
+            EmployeesCurdOperation.find_all_employees_name(),
+            ProjectsCurdOperation.find_all_projects_with_trainer(),
+            DashboardCurdOperation.get_dashboard_summary(),
+        )
+        return {"roles": roles, "employees": employees, "projects": projects, "dashboard": dashboard}
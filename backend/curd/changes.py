@@ -0,0 +1,187 @@
+from __future__ import annotations
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlalchemy as sa
+from fastapi import HTTPException, status
+from sqlalchemy import any_
+from sqlalchemy.dialects.postgresql import ARRAY
+from pg_db import database, change_log, change_log_state, project_staffing, CHANGE_LOGGED_TABLES
+from schema.adapters import status_from_db
+from cache.dimensions import dimensions
+from curd.roles import RolesCurdOperation
+from curd.employees import EmployeesCurdOperation
+from curd.tasks_monitor import TaskMonitorsCurd
+from schema.roles import RolesList
+from schema.employees import EmployeesList
+from schema.projects import Projects
+from schema.tasks_monitor import TaskMonitorBase
+
+
+## Change feed over change_log
+#
+#  The cursor is a transaction id horizon: everything written by transactions below it
+#  has finished. A call returns the rows from [since, horizon) and the new horizon, so a
+#  transaction that commits late lands in a later call instead of being skipped.
+#  Clients take a cursor first (no `since`), then load full lists, then poll with it.
+#  A window is returned in pages of `limit` rows, keyset-ordered on (table, key): while
+#  `has_more` is true the cursor is an opaque page cursor that pins the window's horizon,
+#  and the client calls again with it; the last page hands back the plain horizon.
+#  Upserts carry the row as its list endpoint returns it (names, staffing fields, and so on),
+#  so a client can replace its copy as is.
+
+# response model of each table's list endpoint (projects: the project columns of its rows)
+LIST_MODELS = {
+    "roles": RolesList,
+    "employees": EmployeesList,
+    "projects": Projects,
+    "task_monitors": TaskMonitorBase,
+}
+
+# rows per page unless the caller asks for fewer or more
+PAGE_SIZE = 500
+
+
+class ChangesCurdOperation:
+
+    @staticmethod
+    def _decode(data: Any) -> Optional[Dict[str, Any]]:
+        if data is None:
+            return None
+        return json.loads(data) if isinstance(data, str) else dict(data)
+
+    @staticmethod
+    async def _task_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Raw task_monitors rows -> the /tasks list shape: staffing fields, then names."""
+        ids = sorted({d["project_staffing_id"] for d in rows})
+        ps = project_staffing
+        query = sa.select(
+            ps.c.id, ps.c.employees_id, ps.c.project_id,
+            ps.c.gms_manager.label("manager"), ps.c.t_manager.label("lead"), ps.c.pod_lead,
+        ).where(ps.c.id == any_(sa.bindparam("ids", ids, ARRAY(sa.Integer))))
+        staffing = {r["id"]: dict(r) for r in await database.fetch_all(query)}
+        out = []
+        for d in rows:
+            d = TaskMonitorsCurd._row_to_output(d)
+            s = staffing.get(d["project_staffing_id"])
+            if s is None:
+                # staffing deleted in the same window; its delete cascades to the task too
+                continue
+            d.update((k, v) for k, v in s.items() if k != "id")
+            out.append(d)
+        return await TaskMonitorsCurd._decorate_names(out)
+
+    @staticmethod
+    async def _to_list_shape(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Raw row JSON -> what the table's list endpoint returns for the same row."""
+        if table == "task_monitors":
+            rows = await ChangesCurdOperation._task_rows(rows)
+        elif table == "roles":
+            # RolesList has create_at and str() timestamps
+            rows = [
+                RolesCurdOperation._to_roles_list_dict({
+                    **d,
+                    "created_at": datetime.fromisoformat(d["created_at"]) if d.get("created_at") else None,
+                    "updated_at": datetime.fromisoformat(d["updated_at"]) if d.get("updated_at") else None,
+                })
+                for d in rows
+            ]
+        elif table == "employees":
+            for d in rows:
+                d["role_name"] = await dimensions.role_name(d.get("role"))
+            rows = [EmployeesCurdOperation._row_to_employees_list(d) for d in rows]
+        else:
+            for d in rows:
+                if "status" in d:
+                    d["status"] = status_from_db(d["status"])
+        model = LIST_MODELS.get(table)
+        if model is None:
+            return rows
+        # the list endpoints serialise through these, which drops internal columns and fixes formats
+        return [model.model_validate(d).model_dump(mode="json") for d in rows]
+
+    @staticmethod
+    async def _horizon() -> int:
+        return await database.fetch_val(sa.text("SELECT txid_snapshot_xmin(txid_current_snapshot())"))
+
+    @staticmethod
+    def _page_cursor(since: int, horizon: int, table: str, key: str) -> str:
+        raw = json.dumps([since, horizon, table, key], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[int, Optional[int], Optional[Tuple[str, str]]]:
+        """-> (since, horizon, last (table, key) seen); the last two are None for a plain cursor."""
+        if cursor.isdigit():
+            return int(cursor), None, None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            since, horizon, table, key = json.loads(raw)
+            return int(since), int(horizon), (str(table), str(key))
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed cursor")
+
+    @staticmethod
+    async def changes_since(since: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict[str, Any]:
+        if since is None:
+            horizon = await ChangesCurdOperation._horizon()
+            return {"cursor": str(horizon), "changes": [], "has_more": False}
+
+        since, horizon, after = ChangesCurdOperation._parse_cursor(since)
+        if horizon is None:
+            horizon = await ChangesCurdOperation._horizon()
+
+        pruned = await database.fetch_val(sa.select(change_log_state.c.pruned_through))
+        if pruned is not None and since <= pruned:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Cursor is older than the retained change log; reload the lists and take a new cursor",
+            )
+
+        cl = change_log
+        # latest entry per row only: an insert then three edits is one upsert
+        query = (
+            sa.select(cl.c.table_name, cl.c.op, cl.c.row_key, cl.c.row_data)
+            .where(cl.c.txid >= since, cl.c.txid < horizon)
+            .distinct(cl.c.table_name, cl.c.row_key)
+            .order_by(cl.c.table_name, cl.c.row_key, cl.c.id.desc())
+            .limit(limit + 1)
+        )
+        if after is not None:
+            query = query.where(sa.tuple_(cl.c.table_name, cl.c.row_key) > sa.tuple_(*after))
+        try:
+            rows = await database.fetch_all(query)
+        except Exception as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to read changes: {exc}")
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # map the upserts table by table, so a task page costs one staffing query
+        upserts: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            if r["op"] != "D":
+                upserts.setdefault(r["table_name"], []).append(ChangesCurdOperation._decode(r["row_data"]))
+        data: Dict[tuple, Dict[str, Any]] = {}
+        for table, raw in upserts.items():
+            for d in await ChangesCurdOperation._to_list_shape(table, raw):
+                data[(table, str(d[CHANGE_LOGGED_TABLES[table]]))] = d
+
+        changes: List[Dict[str, Any]] = []
+        for r in rows:
+            if r["op"] == "D":
+                changes.append({"table": r["table_name"], "op": "delete", "key": r["row_key"], "data": None})
+            elif (r["table_name"], r["row_key"]) in data:
+                changes.append({
+                    "table": r["table_name"],
+                    "op": "upsert",
+                    "key": r["row_key"],
+                    "data": data[(r["table_name"], r["row_key"])],
+                })
+        if has_more:
+            last = rows[-1]
+            cursor = ChangesCurdOperation._page_cursor(since, horizon, last["table_name"], last["row_key"])
+        else:
+            cursor = str(max(horizon, since))
+        return {"cursor": cursor, "changes": changes, "has_more": has_more}
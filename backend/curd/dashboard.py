@@ -1,35 +1,78 @@
-from pg_db import database,projects, project_staffing, employees, task_monitors
+from datetime import date
+from typing import Optional
+from pg_db import database,projects, project_staffing, employees, task_monitors, task_monitors_archive, task_monitors_archive_totals, task_monitors_archive_state
 from sqlalchemy import select, func, case, literal
+from schema.adapters import hours_from_db
+
+FIGURES = ("task_completed", "task_inprogress", "task_reworked", "task_approved", "task_rejected", "task_reviewed", "hours_logged_hundredths")
 
 class DashboardCurdOperation:
 
+    # helper
+    @staticmethod
+    def _per_staffing(tm, date_from: Optional[date], date_to: Optional[date]):
+        """Task figures summed per project_staffing_id, so the outer query joins one row per staffing."""
+        q = select(
+            tm.c.project_staffing_id,
+            *[func.sum(tm.c[f]).label(f) for f in FIGURES],
+            func.min(tm.c.task_date).label("first_task_date"),
+        ).group_by(tm.c.project_staffing_id)
+        # task_date is the partition key, so these prune task_monitors partitions
+        if date_from:
+            q = q.where(tm.c.task_date >= date_from)
+        if date_to:
+            q = q.where(tm.c.task_date <= date_to)
+        return q
+
+    @staticmethod
+    def _archived_per_staffing(date_from: Optional[date], date_to: Optional[date]):
+        """
+        Archived figures per staffing. All-time totals come from the stored pre-aggregate;
+        a date range has to read archived rows, and only does so when it reaches below the
+        archive watermark.
+        """
+        if date_from is None and date_to is None:
+            t = task_monitors_archive_totals
+            return select(t.c.project_staffing_id, *[t.c[f] for f in FIGURES], t.c.first_task_date)
+        q = DashboardCurdOperation._per_staffing(task_monitors_archive, date_from, date_to)
+        if date_from:
+            archived_before = select(task_monitors_archive_state.c.archived_before).scalar_subquery()
+            q = q.where(archived_before > date_from)
+        return q
+
     ## Dashboard Summary
     @staticmethod
-    async def get_dashboard_summary():
+    async def get_dashboard_summary(date_from: Optional[date] = None, date_to: Optional[date] = None):
         p  = projects.alias("p")
         ps = project_staffing.alias("ps")
         e  = employees.alias("e")
-        tm = task_monitors.alias("tm")
+        live = DashboardCurdOperation._per_staffing(task_monitors, date_from, date_to).subquery("live")
+        arch = DashboardCurdOperation._archived_per_staffing(date_from, date_to).subquery("arch")
 
         # normalize to collapse case/space duplicates of project_name
         norm_name = func.trim(func.lower(p.c.project_name))
 
-        # correct join path for new schema:
+        # join path:
         # projects p
         #   ← ps.project_id
         # project_staffing ps
-        #   ← tm.project_staffing_id
-        # task_monitors tm
+        #   ← live / arch (at most one row each per staffing, so no fan-out)
         #   → e via ps.employees_id
         j = (
             p.outerjoin(ps, ps.c.project_id == p.c.project_id)
-            .outerjoin(tm, tm.c.project_staffing_id == ps.c.id)
+            .outerjoin(live, live.c.project_staffing_id == ps.c.id)
+            .outerjoin(arch, arch.c.project_staffing_id == ps.c.id)
             .outerjoin(e,  e.c.employees_id == ps.c.employees_id)
         )
 
+        def total(figure: str, label: str):
+            return func.coalesce(
+                func.sum(func.coalesce(live.c[figure], 0) + func.coalesce(arch.c[figure], 0)), 0
+            ).label(label)
+
         # active if ANY row under this normalized name is '1'
         active_flag = case(
-            (func.bool_or(p.c.status == literal('1')), literal('1')),
+            (func.bool_or(p.c.status), literal('1')),
             else_=literal('0')
         ).label("status")
 
@@ -42,16 +85,10 @@ class DashboardCurdOperation:
                 func.string_agg(func.distinct(ps.c.t_manager),    literal(', ')).label("lead_name"),
                 func.string_agg(func.distinct(ps.c.pod_lead),     literal(', ')).label("pod_lead_name"),
                 func.count(func.distinct(e.c.employees_id)).label("num_trainers"),
-                # task aggregates (via tm)
-                func.coalesce(func.sum(tm.c.task_completed),  0).label("task_completed_sum"),
-                func.coalesce(func.sum(tm.c.task_inprogress), 0).label("task_inprogress_sum"),
-                func.coalesce(func.sum(tm.c.task_reworked),   0).label("task_reworked_sum"),
-                func.coalesce(func.sum(tm.c.task_approved),   0).label("task_approved_sum"),
-                func.coalesce(func.sum(tm.c.task_rejected),   0).label("task_rejected_sum"),
-                func.coalesce(func.sum(tm.c.task_reviewed),   0).label("task_reviewed_sum"),
-                func.coalesce(func.sum(tm.c.hours_logged),    0).label("hours_logged_sum"),
-                # dates
-                func.min(tm.c.task_date).label("first_task_date"),
+                # task aggregates (live + archived)
+                *[total(f, f"{f}_sum") for f in FIGURES],
+                # dates (least() skips NULLs)
+                func.min(func.least(live.c.first_task_date, arch.c.first_task_date)).label("first_task_date"),
                 func.min(p.c.created_at).label("project_created_on"),
             )
             .select_from(j)
@@ -60,4 +97,9 @@ class DashboardCurdOperation:
         )
 
         rows = await database.fetch_all(query)
-        return [dict(r) for r in rows]
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["hours_logged_sum"] = hours_from_db(d.pop("hours_logged_hundredths_sum"))
+            out.append(d)
+        return out
@@ -2,10 +2,16 @@ from __future__ import annotations
 from fastapi import HTTPException, status
 import sqlalchemy as sa
 from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects.postgresql import ARRAY
 from schema.employees import EmployeesEntry,EmployeesUpdate, EmployeesList
 from pg_db import database,employees, roles
+from schema.adapters import status_to_db, status_from_db, uuid_str
+from curd.loaders import current_loaders
+from curd.batch import unique_ids, in_request_order
+from cache.dimensions import dimensions
+from cache.invalidation import tables_changed
 from passlib.context import CryptContext
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, FrozenSet
 from datetime import date
 
  
@@ -20,19 +26,22 @@ class EmployeesCurdOperation:
 
     @staticmethod
     async def _ensure_employee_exists(employees_id: str) -> Dict[str, Any]:
-        row = await database.fetch_one(
-            select(employees).where(employees.c.employees_id == employees_id)
-        )
-        if not row:
-            return None
-        return dict(row)
+        return await current_loaders().employees.load(employees_id)
 
     @staticmethod
     async def _email_exists(email: str, exclude_emp_id: Optional[str] = None) -> bool:
-        q = select(employees.c.employees_id).where(employees.c.email == email)
-        if exclude_emp_id:
-            q = q.where(employees.c.employees_id != exclude_emp_id)
-        return (await database.fetch_one(q)) is not None
+        owner = await current_loaders().employee_emails.load(email)
+        return owner is not None and owner != exclude_emp_id
+
+    @staticmethod
+    def _forget(employees_id: str, *emails: Optional[str]) -> None:
+        """Drop memoised lookups and cached dimensions a write just made stale."""
+        tables_changed("employees")
+        loaders = current_loaders()
+        loaders.employees.clear(employees_id)
+        for email in emails:
+            if email:
+                loaders.employee_emails.clear(email)
 
     @staticmethod
     def _row_to_employees_list(row: sa.engine.Row | Dict[str, Any]) -> Dict[str, Any]:
@@ -55,7 +64,7 @@ class EmployeesCurdOperation:
             "phone": d.get("phone"),
             "gender": d.get("gender"),
             "designation": d.get("designation"),
-            "role": d.get("role"),
+            "role": uuid_str(d.get("role")),
             "role_name": role_name,
             "skill": d.get("skill"),
             "experience": d.get("experience"),
@@ -64,7 +73,7 @@ class EmployeesCurdOperation:
             "city": d.get("city"),
             "active_at": d["active_at"],                 # NOT NULL in your model
             "inactive_at": d.get("inactive_at"),
-            "status": d["status"],                       # '0' | '1'
+            "status": status_from_db(d["status"]),       # bool in DB -> '0' | '1'
             "created_at": created_at,
             "updated_at": updated_at,
         }
@@ -78,19 +87,23 @@ class EmployeesCurdOperation:
         status_flag: Optional[str] = None,   # '1' or '0'
         limit: int = 50,
         offset: int = 0,
+        fields: Optional[FrozenSet[str]] = None,   # sparse fieldset, see curd/fields.py
     ) -> List[EmployeesList]:
         """List employees with optional search & status filter, including role_name."""
-        e, r = employees.alias("e"), roles.alias("r")
+        e = employees
+        columns = [
+            e.c.employees_id, e.c.first_name, e.c.last_name, e.c.email, e.c.c_email, e.c.phone, e.c.gender,
+            e.c.designation, e.c.role, e.c.skill, e.c.experience, e.c.qualification,
+            e.c.state, e.c.city, e.c.active_at, e.c.inactive_at, e.c.status,
+            e.c.created_at, e.c.updated_at,
+        ]
+        if fields is not None:
+            wanted = fields | {"role"} if "role_name" in fields else fields
+            columns = [c for c in columns if c.name in wanted]
 
+        # role_name comes from the in-memory roles dimension instead of a join
         stmt = (
-            select(
-                e.c.employees_id, e.c.first_name, e.c.last_name, e.c.email, e.c.c_email, e.c.phone, e.c.gender,
-                e.c.designation, e.c.role, e.c.skill, e.c.experience, e.c.qualification,
-                e.c.state, e.c.city, e.c.active_at, e.c.inactive_at, e.c.status,
-                e.c.created_at, e.c.updated_at,
-                r.c.role_name,
-            )
-            .select_from(e.outerjoin(r, r.c.role_id == e.c.role))
+            select(*columns)
             .order_by(e.c.created_at.desc())
             .limit(limit)
             .offset(offset)
@@ -106,40 +119,44 @@ class EmployeesCurdOperation:
                 )
             )
         if status_flag in ("0", "1"):
-            stmt = stmt.where(e.c.status == status_flag)
+            stmt = stmt.where(e.c.status == status_to_db(status_flag))
 
         try:
-            rows = await database.fetch_all(stmt)
-            return [EmployeesCurdOperation._row_to_employees_list(r) for r in rows]
+            rows = [dict(r) for r in await database.fetch_all(stmt)]
+            if fields is not None:
+                return [await EmployeesCurdOperation._sparse_row(d, fields) for d in rows]
+            for d in rows:
+                d["role_name"] = await dimensions.role_name(d["role"])
+            return [EmployeesCurdOperation._row_to_employees_list(d) for d in rows]
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to list employees")
 
+    @staticmethod
+    async def _sparse_row(d: Dict[str, Any], fields: FrozenSet[str]) -> Dict[str, Any]:
+        """Same conversions as _row_to_employees_list, for the columns that were selected."""
+        if "role_name" in fields:
+            d["role_name"] = await dimensions.role_name(d["role"])
+        if "role" in d:
+            d["role"] = uuid_str(d["role"])
+        if "status" in d:
+            d["status"] = status_from_db(d["status"])
+        return {k: d[k] for k in fields}
+
     # ───────────────────────── basic name list (optional) ─────────────────────────
     # If you keep this endpoint, it returns a simplified shape (not EmployeesList).
     @staticmethod
     async def find_all_employees_name( active_only: bool = True
     ) -> List[Dict[str, Any]]:
-        e, r = employees.alias("e"), roles.alias("r")
-        stmt = (
-            select(
-                e.c.employees_id,
-                e.c.first_name,
-                e.c.last_name,
-                r.c.role_name,
-            )
-            .select_from(e.outerjoin(r, r.c.role_id == e.c.role))
-        )
-        if active_only:
-            stmt = stmt.where(e.c.status == sa.literal("1"))
+        # served from the in-memory employees/roles dimensions; no DB round trip once warm
         try:
-            rows = await database.fetch_all(stmt)
             return [
                 {
-                    "employees_id": row["employees_id"],
-                    "full_name": row["first_name"]+" "+row["last_name"],
-                    "role_name": row["role_name"],
+                    "employees_id": emp["employees_id"],
+                    "full_name": " ".join(n for n in (emp["first_name"], emp["last_name"]) if n),
+                    "role_name": await dimensions.role_name(emp["role"]),
                 }
-                for row in rows
+                for emp in (await dimensions.employees()).values()
+                if emp["status"] or not active_only
             ]
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to list employee names")
@@ -170,6 +187,30 @@ class EmployeesCurdOperation:
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to fetch employee")
 
+    # ───────────────────────── get by id list ─────────────────────────
+
+    @staticmethod
+    async def find_employees_by_ids(employees_ids: List[str]) -> Dict[str, Any]:
+        ids = unique_ids(employees_ids)
+        e, r = employees.alias("e"), roles.alias("r")
+        stmt = (
+            select(
+                e.c.employees_id, e.c.first_name, e.c.last_name, e.c.email, e.c.c_email, e.c.phone, e.c.gender,
+                e.c.designation, e.c.role, e.c.skill, e.c.experience, e.c.qualification,
+                e.c.state, e.c.city, e.c.active_at, e.c.inactive_at, e.c.status,
+                e.c.created_at, e.c.updated_at,
+                r.c.role_name,
+            )
+            .select_from(e.outerjoin(r, r.c.role_id == e.c.role))
+            .where(e.c.employees_id == sa.any_(sa.bindparam("employees_ids", ids, type_=ARRAY(sa.String))))
+        )
+        try:
+            rows = await database.fetch_all(stmt)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Failed to fetch employees")
+        found = {row["employees_id"]: EmployeesCurdOperation._row_to_employees_list(row) for row in rows}
+        return in_request_order(employees_ids, found)
+
     # ───────────────────────── create ─────────────────────────
 
     @staticmethod
@@ -199,15 +240,15 @@ class EmployeesCurdOperation:
                 "state": employee.state,
                 "city": employee.city,
                 "active_at": employee.active_at or date.today(),
-                "status": employee.status or "1",
+                "status": status_to_db(employee.status or "1"),
                 # created_at/updated_at should be DB defaults/triggers; avoid setting explicitly
             }
-            print(values)
             try:
                 ins = insert(employees).values(**values).returning(*employees.c)
                 inserted = await database.execute(ins)
                 if not inserted:
                     raise HTTPException(status_code=400, detail="Insert failed")
+                EmployeesCurdOperation._forget(employee.employees_id, employee.email)
                 
                 # Return full row (joined)
                 return await EmployeesCurdOperation.find_employees_by_id(employee.employees_id)
@@ -225,7 +266,7 @@ class EmployeesCurdOperation:
     @staticmethod
     async def update_employees(employees_id: str, employee: "EmployeesUpdate") -> EmployeesList:
         # Ensure exists for nicer 404
-        await EmployeesCurdOperation._ensure_employee_exists(employees_id)
+        current = await EmployeesCurdOperation._ensure_employee_exists(employees_id)
 
         # Email uniqueness (if changed)
         if employee.email and await EmployeesCurdOperation._email_exists(employee.email, exclude_emp_id=employees_id):
@@ -233,6 +274,8 @@ class EmployeesCurdOperation:
 
         # Build update dict; ignore None to allow partial-like update with this model
         data = {k: v for k, v in employee.dict(exclude_unset=True).items() if v is not None}
+        if "status" in data:
+            data["status"] = status_to_db(data["status"])
 
         # Map schema field names directly to columns.
         # DO NOT touch created_at here; rely on DB trigger to bump updated_at, or set it explicitly:
@@ -248,6 +291,7 @@ class EmployeesCurdOperation:
                 .values(**data)
             )
             await database.execute(stmt)
+            EmployeesCurdOperation._forget(employees_id, current and current["email"], data.get("email"))
             return await EmployeesCurdOperation.find_employees_by_id(employees_id)
         except HTTPException:
             raise
@@ -259,13 +303,14 @@ class EmployeesCurdOperation:
     @staticmethod
     async def delete_employee(employees_id: str) -> Dict[str, Any]:
         # Ensure exists
-        await EmployeesCurdOperation._ensure_employee_exists(employees_id)
+        current = await EmployeesCurdOperation._ensure_employee_exists(employees_id)
 
         try:
             # If you have ON DELETE CASCADE from project_staffing/task_monitors → employees,
             # this will cascade cleanly; otherwise you may get FK errors.
             stmt = delete(employees).where(employees.c.employees_id == employees_id)
             await database.execute(stmt)
+            EmployeesCurdOperation._forget(employees_id, current and current["email"])
             return {"status": True, "message": "Employee has been deleted successfully.", "employees_id": employees_id}
         except Exception:
             raise HTTPException(
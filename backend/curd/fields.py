@@ -0,0 +1,38 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, TypeAdapter
+from schema.fields import sparse_model
+
+
+## Sparse fieldsets (`?fields=task_id,task_date,task_completed`) for the list endpoints
+#
+#  The CRUD list methods take the parsed set and select only the columns (and joins)
+#  those fields need; the router serialises the rows with a model narrowed to the same
+#  fields, since the full response model would reject the missing required ones.
+
+
+def requested_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """`"a, b"` -> {"a", "b"}; None when absent (full rows). 400 on names `model` doesn't have."""
+    if fields is None or not fields.strip():
+        return None
+    names = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = sorted(names - model.model_fields.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(model.model_fields)}",
+        )
+    return names
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel], fields: FrozenSet[str]) -> TypeAdapter:
+    return TypeAdapter(List[sparse_model(model, fields)])
+
+
+def sparse_response(model: Type[BaseModel], fields: FrozenSet[str], rows: List[Dict[str, Any]]) -> Response:
+    adapter = _list_adapter(model, fields)
+    return Response(content=adapter.dump_json(adapter.validate_python(rows)), media_type="application/json")
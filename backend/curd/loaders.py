@@ -0,0 +1,208 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+from pg_db import database, projects, employees, project_staffing, roles
+
+
+## Request-scoped batching + memoisation for lookup/existence checks
+#
+#  Lookups of one kind made in the same request collapse into a single
+#  `WHERE key = ANY(:keys)` query, and a key is fetched at most once per request.
+#  The batch query runs in the task of the first caller, so it shares that
+#  caller's connection and sees rows written earlier in its transaction.
+#  Lookups of different kinds go out side by side with gather_lookups(); each
+#  gathered lookup is its own task and `databases` gives it its own connection,
+#  which can't see an open transaction's writes. Inside a transaction they therefore
+#  run in turn on the caller's connection; prime() what it wrote to skip them.
+#  Outside a scope current_loaders() is a new set on every call, so code that primes
+#  and then reads back opens its own loader_scope() (a no-op inside an existing one).
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+
+    def __init__(self, batch_fn: BatchFn):
+        self._batch_fn = batch_fn
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._collecting = False
+
+    async def load(self, key: Hashable) -> Any:
+        """Value for `key`, or None if the batch query didn't return it."""
+        fut = self._futures.get(key)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._futures[key] = fut
+            self._queue.append(key)
+            if not self._collecting:
+                # give concurrent callers one loop tick to add their keys to this batch
+                self._collecting = True
+                try:
+                    await asyncio.sleep(0)
+                except BaseException as exc:
+                    # cancelled while collecting: fail the queued keys so their waiters don't hang
+                    self._fail(self._take_queue(), exc)
+                    raise
+                await self._resolve(self._take_queue())
+        return await fut
+
+    def _take_queue(self) -> List[Hashable]:
+        keys, self._queue = self._queue, []
+        self._collecting = False
+        return keys
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        keys = list(keys)
+        missing = [k for k in dict.fromkeys(keys) if k not in self._futures]
+        if missing:
+            loop = asyncio.get_running_loop()
+            for k in missing:
+                self._futures[k] = loop.create_future()
+            await self._resolve(missing)
+        return [await self._futures[k] for k in keys]
+
+    async def _resolve(self, keys: List[Hashable]) -> None:
+        try:
+            found = await self._batch_fn(keys)
+        except BaseException as exc:
+            self._fail(keys, exc)
+            raise
+        for k in keys:
+            fut = self._futures[k]
+            if not fut.done():
+                fut.set_result(found.get(k))
+
+    def _fail(self, keys: List[Hashable], exc: BaseException) -> None:
+        # nothing is memoised on failure; other waiters on this batch get the error
+        err = exc if isinstance(exc, Exception) else RuntimeError("batched lookup was cancelled")
+        for k in keys:
+            fut = self._futures.get(k)
+            if fut is not None and not fut.done():
+                del self._futures[k]
+                fut.set_exception(err)
+                fut.exception()  # the caller that ran the batch re-raises; don't log it twice
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Record a value we already know (e.g. a row we just inserted)."""
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(value)
+        self._futures[key] = fut
+
+    def clear(self, key: Optional[Hashable] = None) -> None:
+        """Forget one key (or everything) after a write changed it."""
+        if key is None:
+            self._futures = {k: f for k, f in self._futures.items() if not f.done()}
+        elif key in self._futures and self._futures[key].done():
+            del self._futures[key]
+
+
+def _in_transaction() -> bool:
+    # `databases` keeps one connection per task; an open transaction lives on the caller's
+    connection = database._connection
+    return connection is not None and bool(connection._transaction_stack)
+
+
+async def gather_lookups(*lookups: Awaitable[Any]) -> List[Any]:
+    """asyncio.gather() for checks: all run side by side, and the first failure in argument
+    order is raised (not the first to finish), so a request's error doesn't depend on timing.
+    Inside a transaction they run one after another on the caller's connection instead, so
+    they see what the transaction wrote."""
+    if _in_transaction():
+        return [await lookup for lookup in lookups]
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+    return results
+
+
+# ───────────────────────── batch queries ─────────────────────────
+
+def _any(column, keys: List[Hashable], item_type) -> sa.ColumnElement:
+    return column == sa.any_(sa.bindparam(f"{column.name}_keys", keys, type_=ARRAY(item_type)))
+
+
+async def _projects_by_id(keys: List[int]) -> Dict[int, bool]:
+    q = sa.select(projects.c.project_id).where(_any(projects.c.project_id, keys, sa.Integer))
+    return {r["project_id"]: True for r in await database.fetch_all(q)}
+
+
+async def _employees_by_id(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    q = sa.select(employees).where(_any(employees.c.employees_id, keys, sa.String))
+    return {r["employees_id"]: dict(r) for r in await database.fetch_all(q)}
+
+
+async def _staffing_by_pair(keys: List[Tuple[int, str]]) -> Dict[Tuple[int, str], int]:
+    # two ANY filters return a superset of the pairs; the exact match happens here
+    ps = project_staffing
+    q = sa.select(ps.c.id, ps.c.project_id, ps.c.employees_id).where(
+        _any(ps.c.project_id, sorted({p for p, _ in keys}), sa.Integer),
+        _any(ps.c.employees_id, sorted({e for _, e in keys}), sa.String),
+    )
+    wanted = set(keys)
+    rows = await database.fetch_all(q)
+    return {(r["project_id"], r["employees_id"]): r["id"] for r in rows if (r["project_id"], r["employees_id"]) in wanted}
+
+
+async def _employee_id_by_email(keys: List[str]) -> Dict[str, str]:
+    q = sa.select(employees.c.email, employees.c.employees_id).where(_any(employees.c.email, keys, sa.String))
+    return {r["email"]: r["employees_id"] for r in await database.fetch_all(q)}
+
+
+async def _role_id_by_name(keys: List[str]) -> Dict[str, str]:
+    q = sa.select(roles.c.role_name, roles.c.role_id).where(_any(roles.c.role_name, keys, sa.String))
+    return {r["role_name"]: str(r["role_id"]) for r in await database.fetch_all(q)}
+
+
+class Loaders:
+    """One set of loaders per request (or per bulk operation)."""
+
+    def __init__(self):
+        self.projects = BatchLoader(_projects_by_id)               # project_id -> True
+        self.employees = BatchLoader(_employees_by_id)             # employees_id -> employees row
+        self.staffing = BatchLoader(_staffing_by_pair)             # (project_id, employees_id) -> staffing id
+        self.employee_emails = BatchLoader(_employee_id_by_email)  # email -> employees_id
+        self.role_names = BatchLoader(_role_id_by_name)            # role_name -> role_id
+
+
+_current: contextvars.ContextVar[Optional[Loaders]] = contextvars.ContextVar("loaders", default=None)
+
+
+def current_loaders() -> Loaders:
+    """Loaders of the active scope; outside a scope a throwaway set (batching, no memo across calls)."""
+    return _current.get() or Loaders()
+
+
+@contextmanager
+def loader_scope(reuse: bool = False):
+    """
+    Share one memo across everything inside the block, e.g. a bulk import. With `reuse`
+    an already active scope is kept, so primes made inside stay visible to the caller.
+    """
+    if reuse and _current.get() is not None:
+        yield _current.get()
+        return
+    token = _current.set(Loaders())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+class LoaderScopeMiddleware:
+    """Pure ASGI middleware: every HTTP request gets its own loader scope."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with loader_scope():
+            await self.app(scope, receive, send)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 from datetime import date, datetime
 from operator import and_
-from typing import Any, List, Dict
+from typing import Any, List, Dict, FrozenSet, Optional
 import sqlalchemy
-from schema.projects import ProjectsAdd,ProjectStaffingAdd, ProjectWithStaffingAdd, Projects, ProjectsWithTrainer, TrainerProjectUpdate
+from sqlalchemy.dialects.postgresql import ARRAY
+from schema.projects import ProjectsAdd,ProjectStaffingAdd, ProjectWithStaffingAdd, Projects, ProjectsWithTrainer, TrainerProjectUpdate, ProjectTrainer
 from pg_db import database,projects, project_staffing, employees
+from schema.adapters import status_to_db, status_from_db
+from curd.loaders import current_loaders, gather_lookups, loader_scope
+from curd.batch import unique_ids, in_request_order
+from cache.invalidation import tables_changed
 from fastapi import HTTPException, status
 
 
@@ -15,76 +20,92 @@ class ProjectsCurdOperation:
     default_limit = 500
     default_offset = 0
 
+    @staticmethod
+    def _row_to_output(row) -> Dict[str, Any]:
+        """DB row -> API dict; status is boolean in the DB and '1'/'0' in the API."""
+        d = dict(row)
+        if "status" in d:
+            d["status"] = status_from_db(d["status"])
+        return d
+
     @staticmethod
     async def _ensure_project_exists(project_id: int) -> None:
-        q = sqlalchemy.select(projects.c.project_id).where(projects.c.project_id == project_id)
-        if await database.fetch_one(q) is None:
+        if not await current_loaders().projects.load(project_id):
             raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
 
     @staticmethod
-    async def _ensure_employee_exists(employees_id: str) -> None:
-        q = sqlalchemy.select(employees.c.employees_id).where(employees.c.employees_id == employees_id)
-        if await database.fetch_one(q) is None:
+    async def _ensure_employee_exists(employees_id: str) -> Dict[str, Any]:
+        emp = await current_loaders().employees.load(employees_id)
+        if emp is None:
             raise HTTPException(status_code=404, detail=f"Employee '{employees_id}' not found")
+        return emp
         
     @staticmethod
     async def _staffing_exists(project_id: int, employees_id: str) -> bool:
-        q = sqlalchemy.select(project_staffing.c.id).where(
-            sqlalchemy.and_(
-                project_staffing.c.project_id == project_id,
-                project_staffing.c.employees_id == employees_id,
+        return (await current_loaders().staffing.load((project_id, employees_id))) is not None
+
+    @staticmethod
+    async def _ensure_staffing(project_id: int, employees_id: str) -> None:
+        if not await ProjectsCurdOperation._staffing_exists(project_id, employees_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No staffing for project_id={project_id} with trainer_id='{employees_id}'"
             )
-        )
-        return (await database.fetch_one(q)) is not None
 
     ## All projects only
     @staticmethod
     async def find_all_projects(limit: int = default_limit, offset: int = default_offset, is_active: bool = False) -> List[Projects]: 
         try:
-            query = projects.select().order_by(projects.c.project_id.desc()).limit(limit).offset(offset).where(projects.c.status == '1' if is_active else True)
-            return await database.fetch_all(query)
+            query = projects.select().order_by(projects.c.project_id.desc()).limit(limit).offset(offset).where(projects.c.status.is_(True) if is_active else True)
+            return [ProjectsCurdOperation._row_to_output(r) for r in await database.fetch_all(query)]
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to list projects")
 
     ## All projects with trainer details
     @staticmethod
-    async def find_all_projects_with_trainer(limit: int = default_limit, offset: int = default_offset, is_active: bool = False) -> List[ProjectsWithTrainer]:
+    async def find_all_projects_with_trainer(limit: int = default_limit, offset: int = default_offset, is_active: bool = False,
+                                             fields: Optional[FrozenSet[str]] = None) -> List[ProjectsWithTrainer]:
+        """`fields`: sparse fieldset (curd/fields.py); the employees join is skipped unless a name is asked for."""
         try:
             p, ps, e = projects.alias("p"), project_staffing.alias("ps"), employees.alias("e")
-            query = (
-                sqlalchemy.select(
+            columns = [
                 # from project_staffing
-                    ps.c.id.label("staffing_id"),
-                    ps.c.employees_id,
-                    ps.c.gms_manager,
-                    ps.c.t_manager,
-                    ps.c.pod_lead,
-                    ps.c.created_at.label("staffing_created_at"),
-                    ps.c.updated_at.label("staffing_updated_at"),
-
-                    # from projects
-                    p.c.project_id,
-                    p.c.project_name,
-                    p.c.active_at,
-                    p.c.status,
-                    p.c.inactive_at,
-                    p.c.created_at,
-                    p.c.updated_at,
-
-                    # from employees (optional)
-                    e.c.first_name.label("employee_first_name"),
-                    e.c.last_name.label("employee_last_name"),
-                )
-                .select_from(ps.join(p, ps.c.project_id == p.c.project_id)       # INNER (must have a project)
-                  .outerjoin(e, e.c.employees_id == ps.c.employees_id)  # LEFT (employee may be missing)
-                )
+                ps.c.id.label("staffing_id"),
+                ps.c.employees_id,
+                ps.c.gms_manager,
+                ps.c.t_manager,
+                ps.c.pod_lead,
+                ps.c.created_at.label("staffing_created_at"),
+                ps.c.updated_at.label("staffing_updated_at"),
+
+                # from projects
+                p.c.project_id,
+                p.c.project_name,
+                p.c.active_at,
+                p.c.status,
+                p.c.inactive_at,
+                p.c.created_at,
+                p.c.updated_at,
+
+                # from employees (optional)
+                e.c.first_name.label("employee_first_name"),
+                e.c.last_name.label("employee_last_name"),
+            ]
+            joined = ps.join(p, ps.c.project_id == p.c.project_id)       # INNER (must have a project)
+            if fields is not None:
+                columns = [c for c in columns if c.name in fields]
+            if fields is None or fields & {"employee_first_name", "employee_last_name"}:
+                joined = joined.outerjoin(e, e.c.employees_id == ps.c.employees_id)  # LEFT (employee may be missing)
+            query = (
+                sqlalchemy.select(*columns)
+                .select_from(joined)
                 .order_by(p.c.project_id.desc(), ps.c.id.asc())
                 .limit(limit)
                 .offset(offset)
-                .where(p.c.status == '1' if is_active else True)
+                .where(p.c.status.is_(True) if is_active else True)
             )
             rows = await database.fetch_all(query)
-            return [dict(r) for r in rows]
+            return [ProjectsCurdOperation._row_to_output(r) for r in rows]
         except Exception as exc:
             raise HTTPException(status_code=400, detail=f"Failed to list projects with trainer details: {exc}")
 
@@ -117,11 +138,49 @@ class ProjectsCurdOperation:
             proj = await database.fetch_one(sqlalchemy.select(projects).where(projects.c.project_id == project_id))
             if not proj:
                 raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
-            return dict(proj)
-        return dict(row)
+            return ProjectsCurdOperation._row_to_output(proj)
+        return ProjectsCurdOperation._row_to_output(row)
     
 
 
+    ## Projects by ID list, each with everyone staffed on it
+    @staticmethod
+    async def find_projects_by_ids(project_ids: List[int]) -> Dict[str, Any]:
+        ids = unique_ids(project_ids)
+        p, ps, e = projects.alias("p"), project_staffing.alias("ps"), employees.alias("e")
+        stmt = (
+            sqlalchemy.select(
+                # project
+                p.c.project_id, p.c.project_name, p.c.active_at, p.c.status,
+                p.c.inactive_at, p.c.created_at, p.c.updated_at,
+                # staffing (LEFT: a project may have nobody yet)
+                ps.c.id.label("staffing_id"), ps.c.employees_id,
+                ps.c.gms_manager, ps.c.t_manager, ps.c.pod_lead,
+                ps.c.created_at.label("staffing_created_at"),
+                ps.c.updated_at.label("staffing_updated_at"),
+                # employee
+                e.c.first_name.label("employee_first_name"), e.c.last_name.label("employee_last_name"),
+            )
+            .select_from(
+                p.outerjoin(ps, ps.c.project_id == p.c.project_id)
+                .outerjoin(e, e.c.employees_id == ps.c.employees_id)
+            )
+            .where(p.c.project_id == sqlalchemy.any_(sqlalchemy.bindparam("project_ids", ids, type_=ARRAY(sqlalchemy.Integer))))
+            .order_by(p.c.project_id, ps.c.id)
+        )
+        try:
+            rows = await database.fetch_all(stmt)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch projects: {exc}")
+
+        found: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            d = ProjectsCurdOperation._row_to_output(row)
+            project = found.setdefault(d["project_id"], {k: d[k] for k in Projects.model_fields} | {"trainers": []})
+            if d["staffing_id"] is not None:
+                project["trainers"].append({k: d[k] for k in ProjectTrainer.model_fields})
+        return in_request_order(project_ids, found)
+
     # ## Projects register with trainer
     # @staticmethod
     # async def register_projects_with_trainer(project: ProjectsAdd) -> ProjectsWithTrainer:
@@ -270,7 +329,7 @@ class ProjectsCurdOperation:
             "project_name": project.project_name,
             "active_at": project.active_at or date.today(),
             "inactive_at": project.inactive_at,
-            "status": project.status or "1",
+            "status": status_to_db(project.status or "1"),
             # created_at/updated_at handled by DB defaults/triggers
         }
 
@@ -279,7 +338,9 @@ class ProjectsCurdOperation:
             row = await database.fetch_one(stmt)
             if not row:
                 raise HTTPException(status_code=400, detail="Project create failed")
-            return dict(row)
+            current_loaders().projects.prime(row["project_id"], True)
+            tables_changed("projects")
+            return ProjectsCurdOperation._row_to_output(row)
         except HTTPException:
             raise
         except Exception as exc:
@@ -291,12 +352,13 @@ class ProjectsCurdOperation:
     ## Add project staffing
     @staticmethod
     async def add_project_staffing(staff: "ProjectStaffingAdd") -> dict:
-        # validate FKs
-        await ProjectsCurdOperation._ensure_project_exists(staff.project_id)
-        await ProjectsCurdOperation._ensure_employee_exists(staff.employees_id)
-
-        # prevent duplicate assignment
-        if await ProjectsCurdOperation._staffing_exists(staff.project_id, staff.employees_id):
+        # validate FKs and prevent duplicate assignment; the three lookups go out together
+        _, _, already_staffed = await gather_lookups(
+            ProjectsCurdOperation._ensure_project_exists(staff.project_id),
+            ProjectsCurdOperation._ensure_employee_exists(staff.employees_id),
+            ProjectsCurdOperation._staffing_exists(staff.project_id, staff.employees_id),
+        )
+        if already_staffed:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"Employee '{staff.employees_id}' is already assigned to project '{staff.project_id}'",
@@ -315,6 +377,8 @@ class ProjectsCurdOperation:
             row = await database.fetch_one(stmt)
             if not row:
                 raise HTTPException(status_code=400, detail="Project staffing create failed")
+            current_loaders().staffing.prime((row["project_id"], row["employees_id"]), row["id"])
+            tables_changed("project_staffing")
             return dict(row)
         except HTTPException:
             raise
@@ -331,10 +395,22 @@ class ProjectsCurdOperation:
         Uses the ProjectWithStaffingAdd variant that includes project fields (via inheritance from ProjectsAdd)
         AND the trainer assignment fields.
         """
+        # validate the trainer before creating anything (the row also supplies the names below)
+        emp = await ProjectsCurdOperation._ensure_employee_exists(payload.employees_id)
+
+        # add_project's prime must reach add_project_staffing, also for callers without a request scope
+        with loader_scope(reuse=True):
+            return await ProjectsCurdOperation._add_project_with_staff(payload, emp)
+
+    @staticmethod
+    async def _add_project_with_staff(payload: "ProjectWithStaffingAdd", emp: Dict[str, Any]) -> ProjectsWithTrainer:
         async with database.transaction():
             # 3a. create project
             proj = await ProjectsCurdOperation.add_project(payload)  # reuses method #1
             project_id = proj["project_id"]
+            # a new project has no staffing yet; with the project primed too, add_project_staffing's
+            # checks are answered from the loaders without a round trip
+            current_loaders().staffing.prime((project_id, payload.employees_id), None)
 
             # 3b. create staffing
             staff_input = type("Tmp", (), {})()   # minimal shim to reuse method #2
@@ -344,16 +420,8 @@ class ProjectsCurdOperation:
             staff_input.t_manager    = getattr(payload, "t_manager", None)
             staff_input.pod_lead     = getattr(payload, "pod_lead", None)
 
-            print("Staff input:", staff_input)  # Debugging line
-
             staff = await ProjectsCurdOperation.add_project_staffing(staff_input)  # reuses method #2
 
-            # (optional) include a couple of employee name fields for convenience
-            emp = await database.fetch_one(
-                sqlalchemy.select(employees.c.first_name, employees.c.last_name)
-                .where(employees.c.employees_id == payload.employees_id)
-            )
-
             result = {
                 **proj,
                 "staffing_id": staff["id"],
@@ -365,11 +433,13 @@ class ProjectsCurdOperation:
                 "staffing_updated_at" : staff["updated_at"]
             }
             
-            if emp:
-                result["employee_first_name"] = emp["first_name"]
-                result["employee_last_name"] = emp["last_name"]
+            # (optional) include a couple of employee name fields for convenience
+            result["employee_first_name"] = emp["first_name"]
+            result["employee_last_name"] = emp["last_name"]
 
-            return result
+        # add_project invalidated before the commit; repeat so no reader kept the old state
+        tables_changed("projects", "project_staffing")
+        return result
     
     ## Update projects and project staffing
     @staticmethod
@@ -378,7 +448,7 @@ class ProjectsCurdOperation:
             "project_name": project.project_name,
             "active_at": project.active_at,
             "inactive_at": project.inactive_at,
-            "status": project.status,
+            "status": status_to_db(project.status),
         }
         proj_update = {k: v for k, v in proj_update.items() if v is not None}
 
@@ -393,6 +463,9 @@ class ProjectsCurdOperation:
         if not proj_update and not staff_update:
             return await ProjectsCurdOperation.find_project_by_id(project_id, trainer_id)
 
+        # the staffing row must exist (its FK also vouches for the project): one lookup
+        await ProjectsCurdOperation._ensure_staffing(project_id, trainer_id)
+
         try:
             async with database.transaction():
                 # Update projects
@@ -416,6 +489,11 @@ class ProjectsCurdOperation:
                     )
                     await database.execute(stmt)
 
+            if proj_update:
+                tables_changed("projects")
+            if staff_update:
+                tables_changed("project_staffing")
+
             # Return a joined view (project + staffing + employee)
             return await ProjectsCurdOperation.find_project_by_id(project_id, trainer_id)
 
@@ -431,18 +509,11 @@ class ProjectsCurdOperation:
     @staticmethod
     async def delete_project(project_id: int, trainer_id: str) -> Dict[str, Any]:
         ps = project_staffing
-        p = projects
-        row_exists_query = sqlalchemy.select(ps.c.id).where(
-            and_(ps.c.project_id == project_id, ps.c.employees_id == trainer_id)
-        )
-        row_exists = await database.fetch_one(row_exists_query)
-        if not row_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No staffing for project_id={project_id} with trainer_id='{trainer_id}'"
-            )
+        await ProjectsCurdOperation._ensure_staffing(project_id, trainer_id)
         query = ps.delete().where(ps.c.project_id == project_id, ps.c.employees_id == trainer_id)
         await database.execute(query)
+        current_loaders().staffing.prime((project_id, trainer_id), None)
+        tables_changed("project_staffing")
         return {"message": "Project ID deleted successfully"}
     
     ## Get Projects by Trainer Name
@@ -458,8 +529,8 @@ class ProjectsCurdOperation:
                                       project_staffing.c.created_at.label("staffing_created_at"),
                                       project_staffing.c.updated_at.label("staffing_updated_at")
                                       ).select_from(projects.join(project_staffing, project_staffing.c.project_id == projects.c.project_id)
-                                                            ).where(project_staffing.c.employees_id == trainer_id).limit(limit).offset(offset).where(projects.c.status == '1' if is_active else True)
+                                                            ).where(project_staffing.c.employees_id == trainer_id).limit(limit).offset(offset).where(projects.c.status.is_(True) if is_active else True)
             res = await database.fetch_all(query)
-            return res
+            return [ProjectsCurdOperation._row_to_output(r) for r in res]
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to list projects for trainer")
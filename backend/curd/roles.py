@@ -3,6 +3,10 @@ import datetime, uuid
 from typing import Dict, Any, List, Optional
 from schema.roles import RolesEntry,RolesUpdate, RolesList
 from pg_db import database,roles
+from schema.adapters import uuid_str, is_uuid
+from curd.loaders import current_loaders
+from cache.dimensions import dimensions
+from cache.invalidation import tables_changed
 from sqlalchemy import select, insert, update, delete
 from fastapi import HTTPException, status
 
@@ -15,6 +19,8 @@ class RolesCurdOperation:
 
     @staticmethod
     async def _ensure_role_exists(role_id: str) -> Dict[str, Any]:
+        if not is_uuid(role_id):
+            raise HTTPException(status_code=404, detail=f"Role '{role_id}' not found")
         row = await database.fetch_one(select(roles).where(roles.c.role_id == role_id))
         if not row:
             raise HTTPException(status_code=404, detail=f"Role '{role_id}' not found")
@@ -22,10 +28,8 @@ class RolesCurdOperation:
 
     @staticmethod
     async def _role_name_exists(role_name: str, exclude_role_id: Optional[str] = None) -> bool:
-        q = select(roles.c.role_id).where(roles.c.role_name == role_name)
-        if exclude_role_id:
-            q = q.where(roles.c.role_id != exclude_role_id)
-        return (await database.fetch_one(q)) is not None
+        owner = await current_loaders().role_names.load(role_name)
+        return owner is not None and owner != uuid_str(exclude_role_id)
     
     @staticmethod
     def _to_roles_list_dict(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -43,7 +47,7 @@ class RolesCurdOperation:
             updated_at = create_at
 
         return {
-            "role_id": d["role_id"],
+            "role_id": uuid_str(d["role_id"]),
             "role_name": d["role_name"],
             "create_at": str(create_at) if create_at is not None else "",
             "updated_at": str(updated_at) if updated_at is not None else "",
@@ -54,8 +58,9 @@ class RolesCurdOperation:
     @staticmethod
     async def find_all_roles() -> List[RolesList]:
         try:
-            rows = await database.fetch_all(select(roles).order_by(roles.c.role_name.asc()))
-            return [RolesCurdOperation._to_roles_list_dict(dict(r)) for r in rows]
+            # served from memory; already ordered by role_name
+            rows = (await dimensions.roles()).values()
+            return [RolesCurdOperation._to_roles_list_dict(r) for r in rows]
         except Exception:
             raise HTTPException(status_code=400, detail="Failed to list roles")
 
@@ -79,6 +84,8 @@ class RolesCurdOperation:
                 )
             )
             await database.execute(stmt)
+            current_loaders().role_names.prime(role.role_name, new_role_id)
+            tables_changed("roles")
 
             stored = await database.fetch_one(select(roles).where(roles.c.role_id == new_role_id))
             if not stored:
@@ -96,7 +103,9 @@ class RolesCurdOperation:
     @staticmethod
     async def update_role(role_id: str, role: RolesUpdate) -> RolesList:
         # ensure it exists
-        await RolesCurdOperation._ensure_role_exists(role_id)
+        current = await RolesCurdOperation._ensure_role_exists(role_id)
+        # from here on the row's uuid, not the path's spelling of it (case, dashes)
+        role_id = uuid_str(current["role_id"])
 
         # prevent duplicate name (excluding current role)
         if await RolesCurdOperation._role_name_exists(role.role_name, exclude_role_id=role_id):
@@ -111,6 +120,9 @@ class RolesCurdOperation:
                 )
             )
             await database.execute(stmt)
+            current_loaders().role_names.clear(current["role_name"])
+            current_loaders().role_names.prime(role.role_name, uuid_str(role_id))
+            tables_changed("roles")
 
             updated = await database.fetch_one(select(roles).where(roles.c.role_id == role_id))
             if not updated:
@@ -127,11 +139,13 @@ class RolesCurdOperation:
 
     @staticmethod
     async def delete_role(role_id: str) -> Dict[str, Any]:
-        await RolesCurdOperation._ensure_role_exists(role_id)
+        current = await RolesCurdOperation._ensure_role_exists(role_id)
 
         try:
             stmt = delete(roles).where(roles.c.role_id == role_id)
             await database.execute(stmt)
+            current_loaders().role_names.clear(current["role_name"])
+            tables_changed("roles")
             return {"message": "Role deleted successfully", "role_id": role_id}
         except Exception:
             # Likely FK violation if employees reference this role
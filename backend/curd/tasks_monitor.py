@@ -1,10 +1,17 @@
 from __future__ import annotations
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, FrozenSet
+from datetime import date
 from schema.tasks_monitor import TaskMonitorBase,TaskMonitorCreate,TaskMonitorUpdate
-from pg_db import database,task_monitors, employees, projects, project_staffing
+from schema.adapters import hours_to_db, hours_from_db
+from curd.loaders import current_loaders
+from curd.batch import unique_ids, in_request_order
+from cache.dimensions import dimensions
+from cache.invalidation import tables_changed
+from pg_db import database,task_monitors, employees, projects, project_staffing, task_monitors_archive, task_monitors_archive_state
 from fastapi import HTTPException, status
 from sqlalchemy import select, insert, update, delete, and_
 import sqlalchemy
+from sqlalchemy.dialects.postgresql import ARRAY
 
 
 ## Curd Operation for task_monitor Table
@@ -20,8 +27,93 @@ class TaskMonitorsCurd:
         # Make sure 'date' is present to satisfy schema (maps from 'task_date')
         if "task_date" in d and "date" not in d:
             d["date"] = d["task_date"]
+        # stored as hundredths of an hour; the API keeps exposing decimal hours
+        if "hours_logged_hundredths" in d:
+            d["hours_logged"] = hours_from_db(d.pop("hours_logged_hundredths"))
         return d
 
+    @staticmethod
+    def _as_date(value: date | str | None) -> date | None:
+        """Accept 'YYYY-MM-DD' strings too; a real date bind is what lets Postgres prune partitions."""
+        if value is None or isinstance(value, date):
+            return value
+        return date.fromisoformat(value)
+
+    # fields filled from the dimensions after the query, and the ids they are looked up by
+    NAME_FIELDS = frozenset({"first_name", "last_name", "project_name"})
+
+    @staticmethod
+    def _joined_select(tm, fields: Optional[FrozenSet[str]] = None, staffing: bool = False):
+        """
+        Task row + staffing fields; `tm` is task_monitors or its archive.
+        Employee/project names are filled in afterwards by _decorate_names.
+        With `fields` (sparse fieldset) only the columns those need are selected, and the
+        staffing join is skipped unless a staffing column or `staffing` (a filter) needs it.
+        """
+        ps = project_staffing
+        task_columns = {
+            "task_id": tm.c.task_id,
+            "project_staffing_id": tm.c.project_staffing_id,
+            "task_date": tm.c.task_date,
+            "billable": tm.c.billable,
+            "task_completed": tm.c.task_completed,
+            "task_inprogress": tm.c.task_inprogress,
+            "task_reworked": tm.c.task_reworked,
+            "task_approved": tm.c.task_approved,
+            "task_rejected": tm.c.task_rejected,
+            "task_reviewed": tm.c.task_reviewed,
+            "hours_logged": tm.c.hours_logged_hundredths,
+            "description": tm.c.description,
+            "created_at": tm.c.created_at,
+            "updated_at": tm.c.updated_at,
+        }
+        staffing_columns = {
+            # expose employees_id/project_id via project_staffing (so your mapper sees them)
+            "employees_id": ps.c.employees_id.label("employees_id"),
+            "project_id": ps.c.project_id.label("project_id"),
+
+            # staffing manager fields
+            "manager": ps.c.gms_manager.label("manager"),
+            "lead": ps.c.t_manager.label("lead"),
+            "pod_lead": ps.c.pod_lead.label("pod_lead"),
+        }
+        if fields is None:
+            wanted = task_columns.keys() | staffing_columns.keys()
+        else:
+            # the list is ordered by these
+            wanted = set(fields) | {"task_id", "task_date"}
+            if fields & TaskMonitorsCurd.NAME_FIELDS:
+                wanted |= {"employees_id", "project_id"}
+        columns = {**task_columns, **staffing_columns}
+        query = select(*(col for name, col in columns.items() if name in wanted))
+        if fields is None or staffing or wanted & staffing_columns.keys():
+            return query.select_from(tm.join(ps, ps.c.id == tm.c.project_staffing_id))
+        return query.select_from(tm)
+
+    @staticmethod
+    async def _decorate_names(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill first/last/project name from the in-memory dimensions (staffing FKs guarantee a match)."""
+        emps = await dimensions.employees(require={r["employees_id"] for r in rows})
+        names = await dimensions.projects(require={r["project_id"] for r in rows})
+        for r in rows:
+            emp = emps.get(r["employees_id"]) or {}
+            r["first_name"] = emp.get("first_name")
+            r["last_name"] = emp.get("last_name")
+            r["project_name"] = names.get(r["project_id"])
+        return rows
+
+    @staticmethod
+    def _archive_needed(date_from: Optional[date]):
+        """
+        SQL guard for the archive branch: true only when something is archived and the
+        range reaches below the archive watermark. Postgres evaluates it once (one-time
+        filter), so a recent-range query never touches the archive table.
+        """
+        archived_before = select(task_monitors_archive_state.c.archived_before).scalar_subquery()
+        if date_from is None:
+            return archived_before.is_not(None)
+        return archived_before > date_from
+
     ## All projects
     @staticmethod
     async def find_all_task(
@@ -29,73 +121,50 @@ class TaskMonitorsCurd:
         offset: int = 0,
         employees_id: Optional[str] = None,
         project_id: Optional[int] = None,
-        date_from: Optional[str] = None,   # 'YYYY-MM-DD'
-        date_to: Optional[str] = None,     # 'YYYY-MM-DD'
+        date_from: Optional[date | str] = None,   # 'YYYY-MM-DD'
+        date_to: Optional[date | str] = None,     # 'YYYY-MM-DD'
+        fields: Optional[FrozenSet[str]] = None,  # sparse fieldset, see curd/fields.py
         ) -> List[TaskMonitorBase]  | None:
-        tm, ps, e, p = task_monitors, project_staffing, employees, projects
-        query = (
-            select(
-                # task_monitors fields
-                tm.c.task_id,
-                tm.c.project_staffing_id,
-                tm.c.task_date,
-                tm.c.billable,
-                tm.c.task_completed,
-                tm.c.task_inprogress,
-                tm.c.task_reworked,
-                tm.c.task_approved,
-                tm.c.task_rejected,
-                tm.c.task_reviewed,
-                tm.c.hours_logged,
-                tm.c.description,
-                tm.c.created_at,
-                tm.c.updated_at,
+        ps = project_staffing
 
-                # expose employees_id/project_id via project_staffing (so your mapper sees them)
-                ps.c.employees_id.label("employees_id"),
-                ps.c.project_id.label("project_id"),
-
-                # employees
-                e.c.first_name.label("first_name"),
-                e.c.last_name.label("last_name"),
+        try:
+            # task_date is the partition key: filtering on it directly restricts the scan to matching months
+            date_from, date_to = TaskMonitorsCurd._as_date(date_from), TaskMonitorsCurd._as_date(date_to)
 
-                # projects
-                p.c.project_name.label("project_name"),
+            def filtered(tm):
+                q = TaskMonitorsCurd._joined_select(tm, fields, staffing=bool(employees_id or project_id))
+                if employees_id:
+                    q = q.where(ps.c.employees_id == employees_id)
+                if project_id:
+                    q = q.where(ps.c.project_id == project_id)
+                if date_from:
+                    q = q.where(tm.c.task_date >= date_from)
+                if date_to:
+                    q = q.where(tm.c.task_date <= date_to)
+                return q
 
-                # staffing manager fields
-                ps.c.gms_manager.label("manager"),
-                ps.c.t_manager.label("lead"),
-                ps.c.pod_lead.label("pod_lead"),
+            # live rows, plus archived ones when the range reaches back far enough
+            archived = filtered(task_monitors_archive).where(TaskMonitorsCurd._archive_needed(date_from))
+            u = sqlalchemy.union_all(filtered(task_monitors), archived).subquery("t")
+            query = (
+                select(u)
+                .order_by(u.c.task_date.desc(), u.c.task_id.desc())
+                .limit(limit)
+                .offset(offset)
             )
-            .select_from(
-                tm.join(ps, ps.c.id == tm.c.project_staffing_id)
-              .join(e, e.c.employees_id == ps.c.employees_id)
-              .join(p, p.c.project_id == ps.c.project_id)
-            )
-            .order_by(tm.c.task_date.desc(), tm.c.task_id.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        if employees_id:
-            query = query.where(tm.c.employees_id == employees_id)
-        if project_id:
-            query = query.where(tm.c.project_id == project_id)
-        if date_from:
-            query = query.where(tm.c.task_date >= date_from)
-        if date_to:
-            query = query.where(tm.c.task_date <= date_to)
 
-        try:
-            rows = await database.fetch_all(query)
-            return [TaskMonitorsCurd._row_to_output(r) for r in rows]
+            rows = [TaskMonitorsCurd._row_to_output(r) for r in await database.fetch_all(query)]
+            if fields is not None and not fields & TaskMonitorsCurd.NAME_FIELDS:
+                return rows
+            return await TaskMonitorsCurd._decorate_names(rows)
         except Exception as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to list task monitors: {exc}")
     
-    ## Task by ID
     @staticmethod
-    async def find_task_by_id(task_id: int) -> TaskMonitorBase | None:
-        tm, ps, e, p = task_monitors, project_staffing, employees, projects
-        query = (
+    def _by_id_select(tm, task_id: int, archived: bool):
+        """Task row with staffing and names from `tm` (task_monitors or its archive), flagged `archived`."""
+        ps, e, p = project_staffing, employees, projects
+        return (
             select(
                 # task_monitors fields
                 tm.c.task_id,
@@ -108,7 +177,7 @@ class TaskMonitorsCurd:
                 tm.c.task_approved,
                 tm.c.task_rejected,
                 tm.c.task_reviewed,
-                tm.c.hours_logged,
+                tm.c.hours_logged_hundredths,
                 tm.c.description,
                 tm.c.created_at,
                 tm.c.updated_at,
@@ -128,6 +197,8 @@ class TaskMonitorsCurd:
                 ps.c.gms_manager.label("manager"),
                 ps.c.t_manager.label("lead"),
                 ps.c.pod_lead.label("pod_lead"),
+
+                (sqlalchemy.true() if archived else sqlalchemy.false()).label("archived"),
                 )
                 .select_from(
                     tm.join(ps, ps.c.id == tm.c.project_staffing_id)
@@ -136,8 +207,17 @@ class TaskMonitorsCurd:
                 )
                 .where(tm.c.task_id == task_id)
         )
+
+    @staticmethod
+    async def _fetch_task(task_id: int) -> Dict[str, Any]:
+        """Live row, else the archived one; `archived` in the result tells which."""
+        live = TaskMonitorsCurd._by_id_select(task_monitors, task_id, archived=False)
+        archived = TaskMonitorsCurd._by_id_select(task_monitors_archive, task_id, archived=True).where(
+            TaskMonitorsCurd._archive_needed(None)
+        )
+        u = sqlalchemy.union_all(live, archived).subquery("t")
         try:
-            row = await database.fetch_one(query)
+            row = await database.fetch_one(select(u).order_by(u.c.archived).limit(1))
             if not row:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Task '{task_id}' not found")
             return TaskMonitorsCurd._row_to_output(row)
@@ -146,22 +226,52 @@ class TaskMonitorsCurd:
         except Exception as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to fetch task monitor: {exc}")
 
+    @staticmethod
+    async def _require_live(task_id: int) -> None:
+        """Archived tasks are read-only history (their totals are stored); writes get a 409."""
+        if (await TaskMonitorsCurd._fetch_task(task_id))["archived"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Task '{task_id}' is archived and can no longer be changed",
+            )
+
+    ## Task by ID
+    @staticmethod
+    async def find_task_by_id(task_id: int) -> TaskMonitorBase | None:
+        task = await TaskMonitorsCurd._fetch_task(task_id)
+        task.pop("archived")
+        return task
+
+    ## Tasks by ID list
+    @staticmethod
+    async def find_tasks_by_ids(task_ids: List[int]) -> Dict[str, Any]:
+        """One query for all ids; results in request order, missing ids marked (curd/batch.py)."""
+        ids = unique_ids(task_ids)
+
+        def by_ids(tm):
+            return TaskMonitorsCurd._joined_select(tm).where(
+                tm.c.task_id == sqlalchemy.any_(sqlalchemy.bindparam("task_ids", ids, type_=ARRAY(sqlalchemy.Integer)))
+            )
+
+        # archived tasks too, as find_task_by_id serves them; the guard skips the archive when it's empty
+        query = sqlalchemy.union_all(
+            by_ids(task_monitors),
+            by_ids(task_monitors_archive).where(TaskMonitorsCurd._archive_needed(None)),
+        )
+        try:
+            rows = [TaskMonitorsCurd._row_to_output(r) for r in await database.fetch_all(query)]
+            rows = await TaskMonitorsCurd._decorate_names(rows)
+        except Exception as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to fetch task monitors: {exc}")
+        return in_request_order(task_ids, {r["task_id"]: r for r in rows})
+
     ## Tasks register
     @staticmethod
     async def register_task(task: TaskMonitorCreate) -> TaskMonitorBase | None:
         try:
             # 1) Resolve staffing row
-            ps_q = (
-                select(project_staffing.c.id)
-                .where(
-                    and_(
-                        project_staffing.c.project_id == task.project_id,
-                        project_staffing.c.employees_id == task.employees_id,
-                    )
-                )
-            )
-            ps_row = await database.fetch_one(ps_q)
-            if not ps_row:
+            ps_id = await current_loaders().staffing.load((task.project_id, task.employees_id))
+            if ps_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=(
@@ -169,17 +279,18 @@ class TaskMonitorsCurd:
                         f"and employees_id='{task.employees_id}'. Assign the trainer to the project first."
                     ),
                 )
-            ps_id = ps_row["id"]
 
-            # 2) Uniqueness check: one row per (project_staffing_id, task_date)
-            dup_q = (
-                select(task_monitors.c.task_id)
-                .where(
+            # 2) Uniqueness check: one row per (project_staffing_id, task_date), archived rows included
+            def same_day(tm):
+                return select(tm.c.task_id).where(
                     and_(
-                        task_monitors.c.project_staffing_id == ps_id,
-                        task_monitors.c.task_date == task.task_date,
+                        tm.c.project_staffing_id == ps_id,
+                        tm.c.task_date == task.task_date,
                     )
                 )
+            dup_q = sqlalchemy.union_all(
+                same_day(task_monitors),
+                same_day(task_monitors_archive).where(TaskMonitorsCurd._archive_needed(task.task_date)),
             )
             dup = await database.fetch_one(dup_q)
             if dup:
@@ -204,7 +315,7 @@ class TaskMonitorsCurd:
                     task_approved       = task.task_approved,
                     task_rejected       = task.task_rejected,
                     task_reviewed       = task.task_reviewed,
-                    hours_logged        = task.hours_logged,
+                    hours_logged_hundredths = hours_to_db(task.hours_logged),
                     description         = getattr(task, "description", None),
                 )
                 .returning(*task_monitors.c)
@@ -212,6 +323,7 @@ class TaskMonitorsCurd:
             row = await database.fetch_one(ins)
             if not row:
                 raise HTTPException(status_code=400, detail="Insert failed")
+            tables_changed("task_monitors")
 
             # 4) Return the expanded row (join with employees/projects)
             return await TaskMonitorsCurd.find_task_by_id(row["task_id"])
@@ -229,10 +341,12 @@ class TaskMonitorsCurd:
     ## Update task_monitors
     @staticmethod
     async def update_task(task_id: int, task: TaskMonitorUpdate) -> TaskMonitorBase | None:
-        # Ensure row exists first (for a nicer 404)
-        await TaskMonitorsCurd.find_task_by_id(task_id)
+        # Ensure row exists first (for a nicer 404), and isn't archived
+        await TaskMonitorsCurd._require_live(task_id)
         # Build partial payload
         update_data = {k: v for k, v in task.dict(exclude_unset=True).items() if v is not None}
+        if "hours_logged" in update_data:
+            update_data["hours_logged_hundredths"] = hours_to_db(update_data.pop("hours_logged"))
         if not update_data:
             # Nothing to change; return current row
             return await TaskMonitorsCurd.find_task_by_id(task_id)
@@ -249,6 +363,7 @@ class TaskMonitorsCurd:
             if not row:
                 # Highly unlikely after the pre-check, but safe:
                 raise HTTPException(status_code=404, detail="Task not found after update")
+            tables_changed("task_monitors")
             return await TaskMonitorsCurd.find_task_by_id(row["task_id"])
         except HTTPException:
             raise
@@ -258,12 +373,13 @@ class TaskMonitorsCurd:
 
     @staticmethod
     async def delete_task(task_id: int) -> Dict[str, str]:
-        # Ensure exists
-        await TaskMonitorsCurd.find_task_by_id(task_id)
+        # Ensure exists, and isn't archived
+        await TaskMonitorsCurd._require_live(task_id)
 
         stmt = delete(task_monitors).where(task_monitors.c.task_id == task_id)
         try:
             await database.execute(stmt)
+            tables_changed("task_monitors")
             return {"message": "Task deleted successfully"}
         except Exception as exc:
             # With ON DELETE CASCADE on FKs from task_monitors, this should be fine.
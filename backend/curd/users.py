@@ -4,6 +4,7 @@ from typing import List, Dict, Any, Optional
 
 from schema.users import UserEntry, UserList, UserLogin, UserUpdate
 from pg_db import database, users
+from schema.adapters import status_to_db, status_from_db, uuid_str, is_uuid
 from fastapi import HTTPException
 from passlib.context import CryptContext
 from sqlalchemy import select
@@ -16,6 +17,13 @@ pwd_context = CryptContext(
 )
 
 class UserCurdOperation:
+    @staticmethod
+    def _row_to_output(row) -> Dict[str, Any]:
+        d = dict(row)
+        d["id"] = uuid_str(d["id"])
+        d["status"] = status_from_db(d["status"])
+        return d
+
     # -------- All users --------
     @staticmethod
     async def find_all_users() -> List[Dict[str, Any]]:
@@ -30,7 +38,7 @@ class UserCurdOperation:
             users.c.status,
         )
         rows = await database.fetch_all(query)
-        return [dict(r) for r in rows]
+        return [UserCurdOperation._row_to_output(r) for r in rows]
 
     # -------- Register (Sign Up) --------
     @staticmethod
@@ -49,7 +57,7 @@ class UserCurdOperation:
             gender=user.gender,
             created_at=now,
             updated_at=now,
-            status="1",
+            status=True,
         )
         await database.execute(ins)
 
@@ -67,6 +75,8 @@ class UserCurdOperation:
     # -------- Find by ID --------
     @staticmethod
     async def find_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
+        if not is_uuid(user_id):
+            return None
         query = select(
             users.c.id,
             users.c.username,
@@ -78,11 +88,13 @@ class UserCurdOperation:
         ).where(users.c.id == user_id)
 
         row = await database.fetch_one(query)
-        return dict(row) if row else None
+        return UserCurdOperation._row_to_output(row) if row else None
 
     # -------- Update --------
     @staticmethod
     async def update_user(userId: str, user: UserUpdate) -> Dict[str, Any]:
+        if not is_uuid(userId):
+            raise HTTPException(status_code=404, detail="User not found")
         now = datetime.now(timezone.utc)
 
         upd = (
@@ -92,7 +104,7 @@ class UserCurdOperation:
                 first_name=user.first_name,
                 last_name=user.last_name,
                 gender=user.gender,
-                status=user.status,
+                status=status_to_db(user.status),
                 updated_at=now,
             )
         )
@@ -132,4 +144,4 @@ class UserCurdOperation:
         if not user.password == db_user['password']:
             raise HTTPException(status_code=401, detail="Invalid username or password")
 
-        return {"status": True, "message": "Login successful", "user_id": db_user["id"]}
\ No newline at end of file
+        return {"status": True, "message": "Login successful", "user_id": uuid_str(db_user["id"])}
\ No newline at end of file
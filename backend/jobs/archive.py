@@ -0,0 +1,117 @@
+from __future__ import annotations
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pg_db import database, task_monitors_archive_state
+from config import settings
+from cache.invalidation import tables_changed
+
+logger = logging.getLogger(__name__)
+
+
+## Archival of cold task_monitors rows
+
+# One statement per batch: the delete, the archive insert and the totals bump commit
+# together, so a row is always counted exactly once (live, or archive + totals).
+# SKIP LOCKED lets a batch run next to live edits, and next to another worker's run.
+ARCHIVE_BATCH_SQL = """
+WITH batch AS (
+  SELECT task_id, task_date
+  FROM task_monitors
+  WHERE task_date < :cutoff
+  ORDER BY task_date
+  LIMIT :batch_size
+  FOR UPDATE SKIP LOCKED
+), moved AS (
+  DELETE FROM task_monitors tm
+  USING batch b
+  WHERE tm.task_id = b.task_id AND tm.task_date = b.task_date
+  RETURNING tm.*
+), archived AS (
+  INSERT INTO task_monitors_archive (
+    task_id, project_staffing_id, task_date, task_completed, task_inprogress, task_reworked,
+    task_approved, task_rejected, task_reviewed, hours_logged_hundredths, billable, description, created_at, updated_at
+  )
+  SELECT task_id, project_staffing_id, task_date, task_completed, task_inprogress, task_reworked,
+         task_approved, task_rejected, task_reviewed, hours_logged_hundredths, billable, description, created_at, updated_at
+  FROM moved
+), totals AS (
+  INSERT INTO task_monitors_archive_totals AS t (
+    project_staffing_id, task_completed, task_inprogress, task_reworked, task_approved,
+    task_rejected, task_reviewed, hours_logged_hundredths, rows_archived, first_task_date, last_task_date
+  )
+  SELECT project_staffing_id, sum(task_completed), sum(task_inprogress), sum(task_reworked), sum(task_approved),
+         sum(task_rejected), sum(task_reviewed), sum(hours_logged_hundredths), count(*), min(task_date), max(task_date)
+  FROM moved
+  GROUP BY project_staffing_id
+  ON CONFLICT (project_staffing_id) DO UPDATE SET
+    task_completed  = t.task_completed  + EXCLUDED.task_completed,
+    task_inprogress = t.task_inprogress + EXCLUDED.task_inprogress,
+    task_reworked   = t.task_reworked   + EXCLUDED.task_reworked,
+    task_approved   = t.task_approved   + EXCLUDED.task_approved,
+    task_rejected   = t.task_rejected   + EXCLUDED.task_rejected,
+    task_reviewed   = t.task_reviewed   + EXCLUDED.task_reviewed,
+    hours_logged_hundredths = t.hours_logged_hundredths + EXCLUDED.hours_logged_hundredths,
+    rows_archived   = t.rows_archived   + EXCLUDED.rows_archived,
+    first_task_date = LEAST(t.first_task_date, EXCLUDED.first_task_date),
+    last_task_date  = GREATEST(t.last_task_date, EXCLUDED.last_task_date),
+    updated_at      = now()
+)
+SELECT count(*) FROM moved
+"""
+
+
+async def _advance_watermark(cutoff: date) -> None:
+    st = task_monitors_archive_state
+    stmt = pg_insert(st).values(id=1, archived_before=cutoff)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[st.c.id],
+        set_={
+            "archived_before": sa.func.greatest(st.c.archived_before, stmt.excluded.archived_before),
+            "updated_at": sa.func.now(),
+        },
+    )
+    await database.execute(stmt)
+
+
+async def archive_task_monitors(horizon_days: int | None = None, batch_size: int | None = None) -> int:
+    """Move task_monitors rows older than the horizon into task_monitors_archive. Returns rows moved."""
+    horizon = settings.ARCHIVE_HORIZON_DAYS if horizon_days is None else horizon_days
+    size = settings.ARCHIVE_BATCH_SIZE if batch_size is None else batch_size
+    cutoff = date.today() - timedelta(days=horizon)
+
+    # Raise the watermark first: readers then consult the archive for anything older than
+    # the cutoff, and each batch moves its rows atomically, so nothing is ever missed.
+    await _advance_watermark(cutoff)
+
+    stmt = sa.text(ARCHIVE_BATCH_SQL).bindparams(
+        sa.bindparam("cutoff", cutoff, type_=sa.Date),
+        sa.bindparam("batch_size", size, type_=sa.Integer),
+    )
+    total = 0
+    while True:
+        async with database.transaction():
+            # archived rows are still served (from the archive); don't tombstone them in change_log
+            await database.execute(sa.text("SET LOCAL gms.skip_change_log = 'on'"))
+            moved = await database.fetch_val(stmt) or 0
+        total += moved
+        if moved < size:
+            break
+        await asyncio.sleep(0)  # let request handlers in between batches
+    if total:
+        tables_changed("task_monitors", "task_monitors_archive", "task_monitors_archive_totals")
+        logger.info("Archived %s task_monitors row(s) older than %s", total, cutoff)
+    return total
+
+
+async def archive_loop() -> None:
+    """Runs for the lifetime of the worker when ARCHIVE_ENABLED is set."""
+    while True:
+        try:
+            await archive_task_monitors()
+        except Exception:
+            logger.exception("task_monitors archival failed")
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+import asyncio
+import logging
+
+import sqlalchemy as sa
+from pg_db import database
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+## Retention for change_log
+
+# Delete old entries and raise pruned_through in one statement, so a cursor is either
+# fully served or refused with 410 by curd/changes.py, never silently short.
+PRUNE_SQL = """
+WITH gone AS (
+  DELETE FROM change_log
+  WHERE changed_at < now() - make_interval(days => :days)
+  RETURNING txid
+)
+INSERT INTO change_log_state AS s (id, pruned_through)
+SELECT 1, max(txid) FROM gone HAVING count(*) > 0
+ON CONFLICT (id) DO UPDATE SET
+  pruned_through = GREATEST(s.pruned_through, EXCLUDED.pruned_through),
+  updated_at     = now()
+"""
+
+
+async def prune_change_log(retention_days: int | None = None) -> None:
+    days = settings.CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    await database.execute(sa.text(PRUNE_SQL).bindparams(sa.bindparam("days", days, type_=sa.Integer)))
+
+
+async def change_log_prune_loop() -> None:
+    """Runs for the lifetime of the worker."""
+    while True:
+        try:
+            await prune_change_log()
+        except Exception:
+            logger.exception("change_log pruning failed")
+        await asyncio.sleep(settings.CHANGE_LOG_PRUNE_INTERVAL_SECONDS)
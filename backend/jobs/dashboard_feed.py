@@ -0,0 +1,161 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from config import settings
+from curd.dashboard import DashboardCurdOperation
+from cache.invalidation import subscribe
+
+logger = logging.getLogger(__name__)
+
+
+## Live dashboard deltas for SSE subscribers (routers/events.py)
+#
+#  Writes reach every worker through the cache NOTIFY listener (cache/notify.py) and the
+#  invalidation hub. When a table the summary reads changes, this worker recomputes the
+#  summary once (debounced, and only while someone is subscribed), diffs it per project
+#  row and puts the delta on each subscriber's bounded queue.
+#  A subscriber whose queue is full has its pending deltas replaced by one "snapshot",
+#  so a slow client gets coalesced state instead of holding memory or stalling others.
+
+WATCHED_TABLES = frozenset({
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+    "project_staffing", "projects", "employees",
+})
+
+RowKey = Tuple[str, str]
+
+
+def _row_key(row: Dict[str, Any]) -> RowKey:
+    # the summary groups by normalised name and status bucket
+    return ((row.get("project_name") or "").strip().lower(), row.get("status") or "")
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), separators=(',', ':'))}\n\n"
+
+
+class Subscriber:
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.needs_snapshot = True   # the first message is always the full state
+        self.wakeup = asyncio.Event()
+
+
+class DashboardFeed:
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._snapshot: Optional[Dict[RowKey, Dict[str, Any]]] = None
+        self._dirty = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.coalesced = 0
+
+    # ── hub ──
+
+    def on_invalidate(self, tables: Optional[FrozenSet[str]]) -> None:
+        if tables is None or tables & WATCHED_TABLES:
+            self._dirty.set()
+
+    # ── subscribers ──
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        if len(self._subscribers) >= settings.SSE_MAX_SUBSCRIBERS:
+            raise OverflowError("too many dashboard subscribers")
+        sub = Subscriber(settings.SSE_QUEUE_SIZE)
+        self._subscribers.add(sub)
+        sub.wakeup.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+        if not self._subscribers:
+            self._snapshot = None   # nobody listening: stop tracking, recompute on next subscribe
+
+    async def snapshot(self) -> List[Dict[str, Any]]:
+        async with self._lock:
+            if self._snapshot is None:
+                rows = await DashboardCurdOperation.get_dashboard_summary()
+                self._snapshot = {_row_key(r): r for r in rows}
+            return list(self._snapshot.values())
+
+    async def next_message(self, sub: Subscriber, timeout: float) -> Optional[str]:
+        """Next SSE frame for `sub`, or None after `timeout` (caller sends a keepalive)."""
+        if sub.needs_snapshot:
+            sub.needs_snapshot = False
+            return _sse("snapshot", {"projects": await self.snapshot()})
+        try:
+            return sub.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        sub.wakeup.clear()
+        try:
+            await asyncio.wait_for(sub.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return await self.next_message(sub, 0)
+
+    def _publish(self, frame: str) -> None:
+        for sub in list(self._subscribers):
+            if sub.needs_snapshot:
+                continue   # its pending snapshot will already include this change
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # slow client: forget its backlog, send it the current state instead
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.needs_snapshot = True
+                self.coalesced += 1
+            sub.wakeup.set()
+
+    # ── worker ──
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            previous = self._snapshot
+            if previous is None:
+                return   # nothing was sent yet; subscribers will get a fresh snapshot
+            rows = await DashboardCurdOperation.get_dashboard_summary()
+            # unsubscribe() is synchronous and clears the snapshot without the lock
+            if self._snapshot is not previous:
+                return
+            current = {_row_key(r): r for r in rows}
+            upserts = [r for k, r in current.items() if previous.get(k) != r]
+            removed = [{"project_name": r.get("project_name"), "status": r.get("status")}
+                       for k, r in previous.items() if k not in current]
+            self._snapshot = current
+        if upserts or removed:
+            self._publish(_sse("delta", {"upserts": upserts, "removed": removed}))
+
+    async def run(self) -> None:
+        """Runs for the lifetime of the worker."""
+        while True:
+            await self._dirty.wait()
+            # let a burst of writes settle into one recompute
+            await asyncio.sleep(settings.SSE_DEBOUNCE_SECONDS)
+            self._dirty.clear()
+            if not self._subscribers:
+                self._snapshot = None
+                continue
+            try:
+                await self._refresh()
+            except Exception:
+                logger.exception("dashboard feed refresh failed")
+                # don't leave subscribers on a diff base we couldn't compare against
+                self._snapshot = None
+                for sub in self._subscribers:
+                    sub.needs_snapshot = True
+                    sub.wakeup.set()
+
+
+dashboard_feed = DashboardFeed()
+subscribe(dashboard_feed.on_invalidate)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+import asyncio
+import logging
+from datetime import date
+
+import sqlalchemy as sa
+from pg_db import database
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+## Partition maintenance for task_monitors
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+async def ensure_task_monitor_partitions(months_ahead: int | None = None) -> int:
+    """Create the current month's partition and `months_ahead` more. Returns how many were created."""
+    ahead = settings.TASK_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    this_month = date.today().replace(day=1)
+    created = await database.fetch_val(
+        sa.text("SELECT task_monitors_ensure_partitions(:p_from, :p_to)").bindparams(
+            sa.bindparam("p_from", this_month, type_=sa.Date),
+            sa.bindparam("p_to", _add_months(this_month, ahead + 1), type_=sa.Date),
+        )
+    )
+    if created:
+        logger.info("Created %s task_monitors partition(s)", created)
+    return created or 0
+
+
+async def partition_maintenance_loop() -> None:
+    """Runs for the lifetime of the worker; a failed round is retried on the next tick."""
+    while True:
+        try:
+            await ensure_task_monitor_partitions()
+        except Exception:
+            logger.exception("task_monitors partition maintenance failed")
+        await asyncio.sleep(settings.TASK_PARTITION_CHECK_SECONDS)
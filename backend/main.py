@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import HTTPException, RequestValidationError
@@ -13,6 +14,31 @@ from routers.roles import router as roles_router
 from routers.projects import router as projects_router
 from routers.tasks_monitor import router as tasks_router
 from routers.dashboard import router as dashboard_router
+from routers.changes import router as changes_router
+from routers.events import router as events_router
+from routers.bootstrap import router as bootstrap_router
+from routers.admin import router as admin_router
+from jobs.partitions import partition_maintenance_loop
+from jobs.archive import archive_loop
+from jobs.changes import change_log_prune_loop
+from jobs.dashboard_feed import dashboard_feed
+from curd.loaders import LoaderScopeMiddleware
+from cache.dimensions import dimensions
+from cache.notify import invalidation_listener
+from observability.sql import instrument, SQLTimingMiddleware
+from observability.metrics import registry, MetricsMiddleware
+from observability import tracing
+from observability.profiling import ProfilingMiddleware
+from observability.loop_lag import loop_lag_monitor
+from observability.query_budget import QueryRecorder, load_budgets
+from curd.tasks_monitor import TaskMonitorsCurd
+from curd.employees import EmployeesCurdOperation
+from curd.projects import ProjectsCurdOperation
+from curd.roles import RolesCurdOperation
+from curd.users import UserCurdOperation
+from curd.dashboard import DashboardCurdOperation
+from curd.changes import ChangesCurdOperation
+from curd.bootstrap import BootstrapCurdOperation
 from errors import (
     http_error_handler,
     validation_exception_handler,
@@ -39,11 +65,37 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 App starting… connecting to DB")
     await database.connect()
+    background = [
+        asyncio.create_task(partition_maintenance_loop()),
+        asyncio.create_task(change_log_prune_loop()),
+        asyncio.create_task(dashboard_feed.run()),
+    ]
+    if settings.ARCHIVE_ENABLED:
+        background.append(asyncio.create_task(archive_loop()))
+    if tracing.enabled():
+        background.append(asyncio.create_task(tracing.exporter.run()))
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        background.append(asyncio.create_task(loop_lag_monitor.run()))
+    if settings.CACHE_NOTIFY_ENABLED:
+        # warm caches only once we are listening, so no write can slip in between
+        listening = asyncio.Event()
+        background.append(asyncio.create_task(invalidation_listener(listening)))
+        try:
+            await asyncio.wait_for(listening.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Cache invalidation listener not up yet; continuing")
+    try:
+        await dimensions.warm()
+    except Exception:
+        # not fatal: the first request that needs a dimension loads it
+        logger.exception("Failed to warm the dimension cache")
     try:
         yield
     finally:
         # Shutdown
         logger.info("🛑 App shutting down… disconnecting DB")
+        for task in background:
+            task.cancel()
         await database.disconnect()
 
 
@@ -59,6 +111,29 @@ app.add_middleware(
     allow_headers=["*"],                        # add others if you send them
 )
 
+# One lookup memo per request (see curd/loaders.py)
+app.add_middleware(LoaderScopeMiddleware)
+
+# Time every statement; per-request totals go out as Server-Timing (see observability/sql.py)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument(database)
+    app.add_middleware(SQLTimingMiddleware)
+    # dev/CI: log requests that issue more statements than query_budgets.json allows
+    if settings.QUERY_BUDGET_CHECK:
+        app.add_middleware(QueryRecorder, budgets=load_budgets(), keep=False, log_violations=True)
+
+# Server span per sampled request; see observability/tracing.py
+if tracing.enabled():
+    app.add_middleware(tracing.TracingMiddleware)
+
+# `X-Profile: 1` with the admin token profiles that request; not installed without a token
+if settings.ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so its latency covers everything above
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Global error handlers
 app.add_exception_handler(HTTPException, http_error_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -69,6 +144,13 @@ app.add_exception_handler(Exception, unhandled_exception_handler)
 async def healthz():
     return {"ok": True}
 
+# Prometheus scrape target
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 ## ----------------------------------- USER ENDPOINTS -----------------------------
 
@@ -93,3 +175,28 @@ app.include_router(tasks_router, prefix="/api")
 ## ------------------------------------Dashboard Endpoints-----------------------------
 
 app.include_router(dashboard_router, prefix="/api")
+
+## ------------------------------------Changes Endpoints-----------------------------
+
+app.include_router(changes_router, prefix="/api")
+
+## ------------------------------------Events (SSE) Endpoints-----------------------------
+
+app.include_router(events_router, prefix="/api")
+
+## ------------------------------------Bootstrap Endpoints-----------------------------
+
+app.include_router(bootstrap_router, prefix="/api")
+
+## ------------------------------------Admin Endpoints-----------------------------
+
+app.include_router(admin_router, prefix="/api")
+
+## ------------------------------------Tracing-----------------------------
+# route/endpoint/serialize spans come from TracedRoute on each router; CRUD spans wrap the classes in place
+
+if tracing.enabled():
+    tracing.trace_crud(
+        TaskMonitorsCurd, EmployeesCurdOperation, ProjectsCurdOperation, RolesCurdOperation,
+        UserCurdOperation, DashboardCurdOperation, ChangesCurdOperation, BootstrapCurdOperation,
+    )
@@ -0,0 +1,11 @@
+from typing import Optional
+
+
+def route_template(scope) -> Optional[str]:
+    """
+    Matched route as declared, e.g. `/api/tasks/{task_id}`; None when nothing matched.
+    Newer FastAPI keeps included routers nested and puts the prefixed path on the
+    effective route context; older versions copy the route with the full path.
+    """
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    return getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
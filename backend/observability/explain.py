@@ -0,0 +1,139 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from pg_db import database
+from config import settings
+from observability.sql import QueryRecord, add_observer, detach_from_request
+
+logger = logging.getLogger(__name__)
+
+
+## Plans for slow statements (GET /api/admin/slow-plans)
+#
+#  A statement over EXPLAIN_THRESHOLD_MS is re-planned in the background with
+#  `EXPLAIN (ANALYZE false, FORMAT JSON)` and the same parameters: planning only, the
+#  statement itself never runs a second time. Capture is sampled (EXPLAIN_SAMPLE_RATE),
+#  capped per minute, limited to one in flight, and each fingerprint is re-captured at
+#  most once per cooldown. Plans live in a per-worker ring buffer.
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN around a Core statement; it compiles (and binds) exactly like the original."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (ANALYZE false, FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _walk(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+
+def summarise(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts worth scanning a list for: cost, and which relations are read sequentially."""
+    root = plan.get("Plan", {})
+    nodes = list(_walk(root))
+    return {
+        "total_cost": root.get("Total Cost"),
+        "plan_rows": root.get("Plan Rows"),
+        "seq_scans": sorted({n["Relation Name"] for n in nodes if n.get("Node Type") == "Seq Scan" and "Relation Name" in n}),
+        "node_types": sorted({n.get("Node Type") for n in nodes if n.get("Node Type")}),
+    }
+
+
+class PlanCapture:
+
+    def __init__(self, size: int):
+        self.plans: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._last_by_fingerprint: Dict[str, float] = {}
+        self._window_start = 0.0
+        self._in_window = 0
+        self._in_flight: Optional[asyncio.Task] = None
+        self.skipped = 0
+
+    def _admit(self, rec: QueryRecord) -> bool:
+        now = time.monotonic()
+        if self._in_flight is not None and not self._in_flight.done():
+            return False
+        last = self._last_by_fingerprint.get(rec.fingerprint)
+        if last is not None and now - last < settings.EXPLAIN_FINGERPRINT_COOLDOWN_SECONDS:
+            return False
+        if random.random() >= settings.EXPLAIN_SAMPLE_RATE:
+            return False
+        if now - self._window_start >= 60:
+            self._window_start, self._in_window = now, 0
+        if self._in_window >= settings.EXPLAIN_MAX_PER_MINUTE:
+            return False
+        self._in_window += 1
+        self._last_by_fingerprint[rec.fingerprint] = now
+        if len(self._last_by_fingerprint) > 5000:
+            self._last_by_fingerprint.clear()
+        return True
+
+    def on_query(self, rec: QueryRecord) -> None:
+        """SQL observer: runs for every statement, so the common path returns immediately."""
+        if rec.duration_ms < settings.EXPLAIN_THRESHOLD_MS or rec.error or isinstance(rec.query, _Explain):
+            return
+        if rec.method == "execute_many" or not rec.sql.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        if not self._admit(rec):
+            self.skipped += 1
+            return
+        try:
+            self._in_flight = asyncio.get_running_loop().create_task(self._capture(rec))
+        except RuntimeError:
+            pass  # no loop (scripts): nothing to do
+
+    async def _capture(self, rec: QueryRecord) -> None:
+        detach_from_request()   # not part of the request that triggered it
+        try:
+            query = rec.query
+            if isinstance(query, str):
+                query = sa.text(query)
+                if rec.values:
+                    query = query.bindparams(**rec.values)
+            elif rec.values:
+                return   # Core statement + separate values: `databases` merges those itself
+            raw = await database.fetch_val(_Explain(query))
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        except Exception:
+            logger.warning("EXPLAIN capture failed for %s", rec.fingerprint, exc_info=True)
+            return
+        self.plans.append({
+            "fingerprint": rec.fingerprint,
+            "caller": rec.caller,
+            "duration_ms": round(rec.duration_ms, 2),
+            "captured_at": datetime.now(timezone.utc),
+            "sql": rec.sql,
+            "summary": summarise(plan),
+            "plan": plan,
+        })
+
+    def recent(self, fingerprint: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest first."""
+        found = [p for p in reversed(self.plans) if fingerprint is None or p["fingerprint"] == fingerprint]
+        return found[:limit]
+
+
+plan_capture = PlanCapture(settings.EXPLAIN_BUFFER_SIZE)
+if settings.EXPLAIN_CAPTURE_ENABLED:
+    add_observer(plan_capture.on_query)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import List, Optional
+
+from config import settings
+from observability import metrics
+
+blocked_log = logging.getLogger("gms.loop.blocked")
+
+
+## Event-loop lag monitor
+#
+#  A ticker on the loop sleeps LOOP_LAG_INTERVAL_SECONDS at a time; how late it wakes up
+#  is the scheduling delay every other coroutine saw in that window (passlib hashing,
+#  validating a large pydantic list, ...). It goes to the event_loop_lag_seconds
+#  histogram. It is a lower bound: a stall that starts mid-sleep only counts from the
+#  scheduled wake-up.
+#  A watchdog thread checks the ticker's heartbeat; while the loop is overdue by more
+#  than LOOP_BLOCKED_THRESHOLD_MS it samples the loop thread's stack. When the ticker
+#  finally runs it logs one JSON line to "gms.loop.blocked" with the delay and the most
+#  frequent stacks, i.e. whatever held the loop.
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STACK_DEPTH = 25
+
+loop_lag = metrics.registry.register(metrics.Histogram("event_loop_lag_seconds", "Event loop scheduling delay", buckets=LAG_BUCKETS))
+loop_lag_last = metrics.registry.register(metrics.Gauge("event_loop_lag_last_seconds", "Most recent event loop scheduling delay"))
+loop_blocked = metrics.registry.register(metrics.Counter("event_loop_blocked_total", "Loop stalls over LOOP_BLOCKED_THRESHOLD_MS"))
+
+
+def _stack(frame) -> str:
+    return " <- ".join(
+        f"{f.name} ({f.filename}:{f.lineno})"
+        for f in reversed(traceback.extract_stack(frame, limit=STACK_DEPTH))
+    )
+
+
+class LoopLagMonitor:
+
+    def __init__(self):
+        self._heartbeat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._samples: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ── watchdog thread ──
+
+    def _watch(self) -> None:
+        interval = settings.LOOP_LAG_INTERVAL_SECONDS
+        threshold = settings.LOOP_BLOCKED_THRESHOLD_MS / 1000
+        check = max(threshold / 4, 0.005)
+        while not self._stop.wait(check):
+            overdue = time.monotonic() - self._heartbeat - interval
+            if overdue < threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                with self._lock:
+                    self._samples[_stack(frame)] += 1
+
+    def _take_samples(self) -> Counter:
+        with self._lock:
+            samples, self._samples = self._samples, Counter()
+        return samples
+
+    # ── on the loop ──
+
+    def _report(self, lag: float, samples: Counter) -> None:
+        loop_blocked.inc()
+        total = sum(samples.values())
+        top: List[dict] = [{"stack": s, "samples": n} for s, n in samples.most_common(3)]
+        blocked_log.warning(json.dumps({
+            "event": "loop_blocked",
+            "lag_ms": round(lag * 1000, 1),
+            "threshold_ms": settings.LOOP_BLOCKED_THRESHOLD_MS,
+            "samples": total,
+            "stacks": top,
+        }))
+
+    async def run(self) -> None:
+        """Runs for the lifetime of the worker."""
+        interval = settings.LOOP_LAG_INTERVAL_SECONDS
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._heartbeat = time.monotonic()
+        watchdog = threading.Thread(target=self._watch, name="gms-loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                before = time.monotonic()
+                await asyncio.sleep(interval)
+                self._heartbeat = now = time.monotonic()
+                lag = max(now - before - interval, 0.0)
+                loop_lag.observe(lag)
+                loop_lag_last.set(value=lag)
+                samples = self._take_samples()
+                if lag * 1000 >= settings.LOOP_BLOCKED_THRESHOLD_MS:
+                    self._report(lag, samples)
+        finally:
+            self._stop.set()
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import inspect
+import os
+import sys
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+
+## tracemalloc, driven from /api/admin/tracemalloc
+#
+#  start: begin tracing (TRACEMALLOC_FRAMES deep) and take the baseline snapshot
+#  diff:  snapshot now, compare with the baseline; allocation sites are attributed to the
+#         innermost frame that lies inside a CRUD method (curd/*), so `fetch_all` rows kept
+#         alive by ProjectsCurdOperation.find_all_projects_with_trainer show up under it
+#  stop:  stop tracing and drop the snapshots
+#  Tracing costs memory and CPU on every allocation, so it is off until started. Snapshots
+#  are taken and compared in a worker thread. Per worker process, like everything else.
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _crud_ranges() -> Dict[str, List[Tuple[int, int, str]]]:
+    """filename -> [(first_line, last_line, "Class.method")] for the CRUD classes' methods."""
+    ranges: Dict[str, List[Tuple[int, int, str]]] = defaultdict(list)
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("curd.") or module is None:
+            continue
+        for cls in vars(module).values():
+            if not inspect.isclass(cls) or cls.__module__ != name:
+                continue
+            for attr, value in vars(cls).items():
+                func = inspect.unwrap(getattr(value, "__func__", value))
+                if not inspect.isfunction(func):
+                    continue
+                try:
+                    lines, first = inspect.getsourcelines(func)
+                except (OSError, TypeError):
+                    continue
+                ranges[func.__code__.co_filename].append((first, first + len(lines) - 1, f"{cls.__name__}.{attr}"))
+    return dict(ranges)
+
+
+def crud_method(traceback: tracemalloc.Traceback, ranges: Dict[str, List[Tuple[int, int, str]]]) -> Optional[str]:
+    """Innermost public CRUD method on an allocation's traceback; private helpers roll up into it."""
+    helper = None
+    for frame in reversed(traceback):   # most recent call last
+        for first, last, method in ranges.get(frame.filename, ()):
+            if first <= frame.lineno <= last:
+                if not method.split(".")[-1].startswith("_"):
+                    return method
+                helper = helper or method
+    return helper
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    filename = frame.filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, APP_ROOT)
+    return f"{filename}:{frame.lineno}"
+
+
+class MemoryTracer:
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at: Optional[datetime] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or settings.TRACEMALLOC_FRAMES)
+        self.reset_baseline()
+        return self.status()
+
+    def reset_baseline(self) -> None:
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+        self.baseline_at = datetime.now(timezone.utc)
+
+    def stop(self) -> Dict[str, Any]:
+        tracemalloc.stop()
+        self._baseline = self.baseline_at = None
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "baseline_at": self.baseline_at,
+        }
+
+    def diff(self, limit: int = 20, reset: bool = False) -> Optional[Dict[str, Any]]:
+        """Growth since the baseline, by CRUD method and by allocation site; None when not tracing."""
+        if not self.tracing or self._baseline is None:
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+        stats = snapshot.compare_to(self._baseline, "traceback")
+        ranges = _crud_ranges()
+
+        by_method: Dict[str, Dict[str, int]] = defaultdict(lambda: {"size_diff_bytes": 0, "count_diff": 0, "size_bytes": 0})
+        for stat in stats:
+            totals = by_method[crud_method(stat.traceback, ranges) or "<outside crud>"]
+            totals["size_diff_bytes"] += stat.size_diff
+            totals["count_diff"] += stat.count_diff
+            totals["size_bytes"] += stat.size
+
+        top_sites = [
+            {
+                "site": _site(stat.traceback[-1]),
+                "crud_method": crud_method(stat.traceback, ranges),
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size_bytes": stat.size,
+                "traceback": [_site(f) for f in reversed(stat.traceback)],
+            }
+            for stat in stats[:limit]
+        ]
+        result = {
+            **self.status(),
+            "by_crud_method": sorted(
+                ({"method": m, **t} for m, t in by_method.items()),
+                key=lambda row: row["size_diff_bytes"], reverse=True,
+            )[:limit],
+            "top_sites": top_sites,
+        }
+        if reset:
+            self._baseline, self.baseline_at = snapshot, datetime.now(timezone.utc)
+        return result
+
+
+memory_tracer = MemoryTracer()
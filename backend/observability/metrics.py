@@ -0,0 +1,270 @@
+from __future__ import annotations
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from pg_db import database
+from config import settings
+from observability.sql import QueryRecord, add_observer
+from observability.asgi import route_template
+from cache.response import response_cache
+from cache.shared import shared_cache
+from cache.singleflight import flights
+from jobs.dashboard_feed import dashboard_feed
+
+logger = logging.getLogger(__name__)
+
+
+## Prometheus metrics (GET /metrics, text exposition format 0.0.4)
+#
+#  A small in-process registry: counters, gauges and histograms are plain dicts keyed by
+#  label values, updated without locks (single event loop), rendered on scrape.
+#  Label values are always bounded: route *templates* (`/api/tasks/{task_id}`, never
+#  the raw path), HTTP method and status, and CRUD method names, which come from code.
+#  Cache, pool and feed figures are read from their owners at scrape time, so they cost
+#  nothing per request. Values are per worker process.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STREAM_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 14400)
+UNMATCHED_ROUTE = "<unmatched>"
+METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _number(value: float) -> str:
+    # :g keeps 6 significant digits, which truncates large counters and sums
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(value)
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        return f"{name}{{{inner}}} {_number(value)}"
+    return f"{name} {_number(value)}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+
+    def samples(self) -> Iterable[Sample]:
+        return ()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [_format(n, l, v) for n, l, v in self.samples()]
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        for key, v in self._values.items():
+            yield self.name, dict(zip(self.labels, key)), v
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def samples(self):
+        for key, (counts, total) in self._values.items():
+            base = dict(zip(self.labels, key))
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                yield f"{self.name}_bucket", {**base, "le": "+Inf" if bound == float("inf") else f"{bound:g}"}, running
+            yield f"{self.name}_sum", base, total[0]
+            yield f"{self.name}_count", base, running
+
+
+class Collected(Metric):
+    """Read at scrape time from `collect()` -> [(labels, value)]."""
+
+    def __init__(self, name, help, kind: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        super().__init__(name, help)
+        self.kind, self._collect = kind, collect
+
+    def samples(self):
+        for labels, value in self._collect():
+            yield self.name, labels, value
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            try:
+                lines += m.render()
+            except Exception:
+                logger.exception("metric %s failed to render", m.name)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ── HTTP ──
+requests_total = registry.register(Counter("http_requests_total", "Requests handled", ("method", "route", "status")))
+request_duration = registry.register(Histogram("http_request_duration_seconds", "Time to full response", ("method", "route")))
+response_size = registry.register(Histogram("http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS))
+in_flight = registry.register(Gauge("http_requests_in_flight", "Requests being handled"))
+in_flight.set(value=0)
+# event streams stay open for minutes; counted apart so they don't skew the two above
+streams_open = registry.register(Gauge("http_streams_open", "Event streams being served"))
+streams_open.set(value=0)
+stream_duration = registry.register(Histogram("http_stream_duration_seconds", "Time an event stream stayed open", ("route",), STREAM_BUCKETS))
+
+# ── SQL, by the CRUD method that issued it ──
+query_duration = registry.register(Histogram("db_query_duration_seconds", "Statement time by calling method", ("caller",)))
+query_errors = registry.register(Counter("db_query_errors_total", "Failed statements by calling method", ("caller",)))
+
+
+def _on_query(rec: QueryRecord) -> None:
+    query_duration.observe(rec.duration_ms / 1000, rec.caller)
+    if rec.error:
+        query_errors.inc(rec.caller)
+
+
+if settings.METRICS_ENABLED:
+    add_observer(_on_query)
+
+
+# ── read at scrape time ──
+
+def _pool():
+    pool = getattr(getattr(database, "_backend", None), "_pool", None)
+    if pool is None:
+        return []
+    return [
+        ({"state": "size"}, pool.get_size()),
+        ({"state": "idle"}, pool.get_idle_size()),
+        ({"state": "max"}, pool.get_max_size()),
+        ({"state": "min"}, pool.get_min_size()),
+    ]
+
+
+def _cache_lookups():
+    tiers = [("response", response_cache)] + ([("shared", shared_cache)] if shared_cache is not None else [])
+    for tier, cache in tiers:
+        yield {"tier": tier, "result": "hit"}, cache.hits
+        yield {"tier": tier, "result": "miss"}, cache.misses
+
+
+def _flights():
+    for route, counts in flights.stats().items():
+        for outcome, n in counts.items():
+            yield {"route": route, "outcome": outcome}, n
+
+
+registry.register(Collected("db_pool_connections", "asyncpg pool connections", "gauge", _pool))
+registry.register(Collected("cache_lookups_total", "Response cache lookups by tier and result", "counter", _cache_lookups))
+registry.register(Collected("cache_entries", "Entries in the local response cache", "gauge", lambda: [({}, len(response_cache))]))
+registry.register(Collected("singleflight_requests_total", "Cache misses run (executed) or joined (coalesced)", "counter", _flights))
+registry.register(Collected("dashboard_feed_subscribers", "Live dashboard SSE clients", "gauge",
+                            lambda: [({}, dashboard_feed.subscriber_count)]))
+registry.register(Collected("dashboard_feed_coalesced_total", "Slow SSE clients switched to a snapshot", "counter",
+                            lambda: [({}, dashboard_feed.coalesced)]))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: request count, latency, size and in-flight, by route template.
+    text/event-stream responses leave in-flight once their headers go out and are timed
+    as streams instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+        stream = False
+
+        async def observed_send(message):
+            nonlocal status, size, stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", ())).get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    stream = True
+                    in_flight.dec()
+                    streams_open.inc()
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, observed_send)
+        finally:
+            # the router stores the matched route in the scope; unmatched paths share one label
+            route = route_template(scope) or UNMATCHED_ROUTE
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            requests_total.inc(method, route, str(status))
+            if stream:
+                streams_open.dec()
+                stream_duration.observe(time.perf_counter() - started, route)
+            else:
+                in_flight.dec()
+                request_duration.observe(time.perf_counter() - started, method, route)
+                response_size.observe(size, method, route)
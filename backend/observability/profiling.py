@@ -0,0 +1,195 @@
+from __future__ import annotations
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from security import admin_token_valid
+from observability.asgi import route_template
+
+
+## On-demand profiling of one request (`X-Profile: 1` + `X-Admin-Token`)
+#
+#  A sampler thread looks at the event loop every PROFILE_INTERVAL_MS while the flagged
+#  request runs:
+#  - loop thread inside this request (its frame is on the stack): the Python stack
+#  - request suspended: its await chain, walked from the task's coroutine, ending in a
+#    synthetic "[await ...]" frame; under databases/asyncpg that is DB wait
+#  - anything else (another request on the loop) is not counted; child tasks of an
+#    asyncio.gather show up as the parent waiting on the gather
+#  Stacks are stored as folded lines ("a;b;c 12"), which flamegraph.pl, speedscope and
+#  Inferno read as is; GET /api/admin/profiles/{id} returns them.
+#  Not flagged: the middleware is only installed when ADMIN_TOKEN is set, and then costs
+#  one header lookup.
+
+DB_MODULES = ("databases.", "asyncpg.")
+# CPU samples: the innermost frame matching one of these decides
+CATEGORIES = (
+    ("db_client", DB_MODULES),
+    ("serialization", ("fastapi.encoders", "fastapi.routing:serialize_response", "pydantic", "json.")),
+    ("crud", ("curd.",)),
+    ("router", ("routers.", "cache.response")),
+)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _cpu_stack(top, anchor) -> Optional[List[str]]:
+    """Frames from `anchor` (this request's middleware frame) down to `top`, or None."""
+    stack = []
+    frame = top
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        if frame is anchor:
+            return stack[::-1]
+        frame = frame.f_back
+    return None
+
+
+def _await_stack(task: asyncio.Task, anchor) -> List[str]:
+    """The suspended coroutine chain of `task` from `anchor` down, outermost first."""
+    stack = []
+    awaited: Any = task.get_coro()
+    while True:
+        frame = getattr(awaited, "cr_frame", None) or getattr(awaited, "gi_frame", None)
+        if frame is None:
+            break
+        if frame is anchor:
+            stack.clear()
+        stack.append(_frame_name(frame))
+        awaited = getattr(awaited, "cr_await", None) or getattr(awaited, "gi_yieldfrom", None)
+    # whatever ends the chain (usually a Future) is what the request is waiting on
+    leaf = type(awaited).__name__ if awaited is not None else "?"
+    stack.append(f"[await {leaf}]")
+    return stack
+
+
+def _category(stack: List[str]) -> str:
+    if stack[-1].startswith("[await"):
+        return "db_wait" if any(f.startswith(DB_MODULES) for f in stack) else "other_wait"
+    for frame in reversed(stack):
+        for name, prefixes in CATEGORIES:
+            if frame.startswith(prefixes):
+                return name
+    return "other"
+
+
+class Sampler(threading.Thread):
+
+    def __init__(self, loop_thread_id: int, anchor, task: asyncio.Task):
+        super().__init__(name="gms-profiler", daemon=True)
+        self.loop_thread_id, self.anchor, self.task = loop_thread_id, anchor, task
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        interval = settings.PROFILE_INTERVAL_MS / 1000
+        deadline = time.monotonic() + settings.PROFILE_MAX_SECONDS
+        while not self._stop_event.wait(interval) and time.monotonic() < deadline:
+            try:
+                self._sample()
+            except Exception:
+                pass   # the loop moved on under us; skip this tick
+
+    def _sample(self) -> None:
+        top = sys._current_frames().get(self.loop_thread_id)
+        stack = _cpu_stack(top, self.anchor) if top is not None else None
+        if stack is None:
+            if self.task.done():
+                return
+            # suspended; waiting while the loop runs someone else's code still counts
+            stack = _await_stack(self.task, self.anchor)
+        if stack:
+            self.samples[";".join(stack)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+class ProfileStore:
+
+    def __init__(self, size: int):
+        self.size = size
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        self._profiles[profile["id"]] = profile
+        while len(self._profiles) > self.size:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [{k: v for k, v in p.items() if k != "folded"} for p in reversed(self._profiles.values())]
+
+
+profiles = ProfileStore(settings.PROFILE_BUFFER_SIZE)
+
+
+def _summarise(samples: Counter) -> Dict[str, Any]:
+    by_category: Counter = Counter()
+    for stack, n in samples.items():
+        by_category[_category(stack.split(";"))] += n
+    total = sum(samples.values()) or 1
+    return {name: round(100 * n / total, 1) for name, n in by_category.most_common()}
+
+
+def _flagged(scope) -> Tuple[bool, Optional[str]]:
+    flag = token = None
+    for name, value in scope.get("headers") or ():
+        if name == b"x-profile":
+            flag = value
+        elif name == b"x-admin-token":
+            token = value.decode("latin-1")
+    return flag is not None and flag not in (b"0", b""), token
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: profiles requests sent with `X-Profile: 1` and a valid admin token."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        flagged, token = _flagged(scope)
+        if not flagged or not admin_token_valid(token):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = Sampler(threading.get_ident(), sys._getframe(), asyncio.current_task())
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            profiles.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "route": route_template(scope) or scope.get("path"),
+                "path": scope.get("path"),
+                "captured_at": datetime.now(timezone.utc),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "interval_ms": settings.PROFILE_INTERVAL_MS,
+                "samples": sum(sampler.samples.values()),
+                "breakdown_pct": _summarise(sampler.samples),
+                "folded": "\n".join(f"{stack} {n}" for stack, n in sampler.samples.most_common()),
+            })
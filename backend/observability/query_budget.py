@@ -0,0 +1,143 @@
+from __future__ import annotations
+import contextvars
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from config import settings
+from observability.sql import QueryRecord, add_observer, current_queries
+from observability.asgi import route_template
+
+budget_log = logging.getLogger("gms.sql.budget")
+
+
+## Statement budgets per endpoint (query_budgets.json)
+#
+#  QueryRecorder wraps an ASGI app and records every statement each request issues, keyed
+#  "METHOD /route/template". Budgets are {"max": n} or {"exact": n} and apply to
+#  successful responses (error paths may legitimately look further); endpoints without
+#  one are recorded but not checked. Counts are for a cold response cache; with the NOTIFY
+#  listener running, cached GETs also issue the version-sequence lookup behind their ETag.
+#  The numbers are measured by tests/test_query_budgets.py. "exact" is for endpoints whose
+#  count can't vary; "max" covers a cold dimension cache (cache/dimensions.py), which the
+#  first request after a write reloads.
+#
+#  In a test:
+#      recorder = QueryRecorder(app, load_budgets())
+#      async with httpx.AsyncClient(transport=httpx.ASGITransport(recorder), base_url="http://t") as c:
+#          await c.post("/api/projects", json=...)
+#      assert_within_budget(recorder)
+#  In a running app QUERY_BUDGET_CHECK=true logs every over-budget request to
+#  "gms.sql.budget" instead. Both rely on SQL instrumentation (SQL_INSTRUMENTATION_ENABLED).
+
+
+@dataclass(frozen=True)
+class Budget:
+    max: Optional[int] = None
+    exact: Optional[int] = None
+
+    def allows(self, count: int) -> bool:
+        if self.exact is not None:
+            return count == self.exact
+        return self.max is None or count <= self.max
+
+    def describe(self) -> str:
+        return f"= {self.exact}" if self.exact is not None else f"<= {self.max}"
+
+
+def load_budgets(path: Optional[str] = None) -> Dict[str, Budget]:
+    with open(path or settings.QUERY_BUDGET_FILE, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {endpoint: Budget(**limits) for endpoint, limits in raw.items()}
+
+
+@dataclass
+class RecordedRequest:
+    method: str
+    route: str
+    status: int
+    statements: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.route}"
+
+    def describe(self) -> str:
+        lines = [f"{self.endpoint} -> {self.status}: {len(self.statements)} statements"]
+        lines += [f"  {i}. {rec.caller} {rec.method}: {rec.sql[:120]}" for i, rec in enumerate(self.statements, 1)]
+        return "\n".join(lines)
+
+
+_recording: contextvars.ContextVar[Optional[List[QueryRecord]]] = contextvars.ContextVar("budget_statements", default=None)
+_observing = False
+
+
+def _on_query(rec: QueryRecord) -> None:
+    statements = _recording.get()
+    # current_queries() is cleared for work detached from the request (e.g. EXPLAIN capture)
+    if statements is not None and current_queries() is not None:
+        statements.append(rec)
+
+
+class QueryRecorder:
+    """Pure ASGI middleware: records each request's statements and checks them against budgets."""
+
+    def __init__(self, app, budgets: Optional[Dict[str, Budget]] = None, keep: bool = True, log_violations: bool = False):
+        global _observing
+        if not settings.SQL_INSTRUMENTATION_ENABLED:
+            raise RuntimeError("QueryRecorder needs SQL_INSTRUMENTATION_ENABLED")
+        if not _observing:
+            add_observer(_on_query, per_request=True)
+            _observing = True
+        self.app = app
+        self.budgets = budgets or {}
+        self.keep, self.log_violations = keep, log_violations
+        self.requests: List[RecordedRequest] = []
+        self.violations: List[RecordedRequest] = []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        statements: List[QueryRecord] = []
+        status = 500
+
+        async def observed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _recording.set(statements)
+        try:
+            await self.app(scope, receive, observed_send)
+        finally:
+            _recording.reset(token)
+            self._check(RecordedRequest(scope["method"], route_template(scope) or scope.get("path", ""), status, statements))
+
+    def _check(self, req: RecordedRequest) -> None:
+        if self.keep:
+            self.requests.append(req)
+        budget = self.budgets.get(req.endpoint)
+        if budget is None or req.status >= 400 or budget.allows(len(req.statements)):
+            return
+        if self.keep:
+            self.violations.append(req)
+        if self.log_violations:
+            budget_log.warning(json.dumps({
+                "event": "query_budget_exceeded",
+                "endpoint": req.endpoint,
+                "statements": len(req.statements),
+                "budget": budget.describe(),
+                "callers": [rec.caller for rec in req.statements],
+            }))
+
+
+def assert_within_budget(recorder: QueryRecorder) -> None:
+    """Raise AssertionError listing every recorded request that broke its budget."""
+    if recorder.violations:
+        report = "\n".join(
+            f"budget {recorder.budgets[req.endpoint].describe()} exceeded by\n{req.describe()}"
+            for req in recorder.violations
+        )
+        raise AssertionError(f"{len(recorder.violations)} request(s) over their statement budget:\n{report}")
@@ -0,0 +1,243 @@
+from __future__ import annotations
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+slow_log = logging.getLogger("gms.sql.slow")
+
+
+## SQL instrumentation
+#
+#  instrument(database) wraps the query methods of the shared `databases.Database`, so
+#  every statement the CRUD layer (and jobs) run is timed without touching call sites.
+#  Each statement becomes a QueryRecord: fingerprint, duration, row count and the CRUD
+#  method that issued it. Records are
+#  - added to the current request's RequestQueries (SQLTimingMiddleware), which is sent
+#    back as a `Server-Timing` header
+#  - written to the "gms.sql.slow" log as one JSON object when over SQL_SLOW_QUERY_MS
+#  - handed to every observer registered with add_observer()
+
+METHODS = ("fetch_one", "fetch_all", "fetch_val", "execute", "execute_many")
+# the header only needs totals; keep the details bounded for long requests
+MAX_RECORDS = 200
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    sql: str
+    method: str
+    caller: str
+    duration_ms: float
+    rows: Optional[int]
+    error: Optional[str] = None
+    query: Any = None       # the statement object, for observers that need to re-run it
+    values: Any = None
+
+
+@dataclass
+class RequestQueries:
+    count: int = 0
+    total_ms: float = 0.0
+    records: List[QueryRecord] = field(default_factory=list)
+
+    def add(self, rec: QueryRecord) -> None:
+        self.count += 1
+        self.total_ms += rec.duration_ms
+        if len(self.records) < MAX_RECORDS:
+            self.records.append(rec)
+
+    def merge(self, other: "RequestQueries") -> None:
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.records.extend(other.records[:max(0, MAX_RECORDS - len(self.records))])
+
+
+_current: contextvars.ContextVar[Optional[RequestQueries]] = contextvars.ContextVar("sql_queries", default=None)
+_observers: List[Callable[[QueryRecord], None]] = []
+_request_observers: List[Callable[[QueryRecord], None]] = []
+
+
+def add_observer(fn: Callable[[QueryRecord], None], per_request: bool = False) -> None:
+    """`per_request` observers also see statements a request adopts (see adopt_queries())."""
+    _observers.append(fn)
+    if per_request:
+        _request_observers.append(fn)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def detach_from_request() -> None:
+    """For background tasks started inside a request: stop counting towards it."""
+    _current.set(None)
+
+
+def collect_queries(queries: RequestQueries) -> None:
+    """For tasks that run apart from any request: count into `queries` instead."""
+    _current.set(queries)
+
+
+def adopt_queries(queries: RequestQueries) -> None:
+    """Count statements collected elsewhere towards the current request, as if it ran them."""
+    current = _current.get()
+    if current is None:
+        return
+    current.merge(queries)
+    for rec in queries.records:
+        for observer in _request_observers:
+            try:
+                observer(rec)
+            except Exception:
+                logger.exception("SQL observer failed")
+
+
+# ── fingerprints ──
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+_fingerprints: "OrderedDict[Any, tuple]" = OrderedDict()
+
+
+def _normalise(sql: str) -> str:
+    return _SPACE.sub(" ", _LITERALS.sub("?", sql)).strip()
+
+
+def fingerprint(query: Any) -> tuple:
+    """(fingerprint, normalised SQL) for a Core statement or SQL string."""
+    key = None
+    if not isinstance(query, str):
+        # SQLAlchemy's own statement cache key: same shape -> same key, values aside
+        try:
+            cache_key = query._generate_cache_key()
+            key = cache_key.key if cache_key is not None else None
+        except Exception:
+            key = None
+        if key is not None and key in _fingerprints:
+            _fingerprints.move_to_end(key)
+            return _fingerprints[key]
+    sql = _normalise(str(query))
+    result = (hashlib.sha1(sql.encode()).hexdigest()[:12], sql)
+    if key is not None:
+        _fingerprints[key] = result
+        if len(_fingerprints) > 2000:
+            _fingerprints.popitem(last=False)
+    return result
+
+
+def _caller() -> str:
+    """Nearest app frame that issued the statement, as `module:Class.method`."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(("curd.", "jobs.", "cache.", "routers.")):
+            code = frame.f_code
+            return f"{module.split('.', 1)[1]}:{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return "-"
+
+
+def _row_count(method: str, result: Any) -> Optional[int]:
+    if method == "fetch_all":
+        return len(result)
+    if method == "fetch_one":
+        return 0 if result is None else 1
+    return None
+
+
+# ── wrapping ──
+
+def _record(method: str, query: Any, values: Any, started: float, result: Any, error: Optional[BaseException]) -> None:
+    duration_ms = (time.perf_counter() - started) * 1000
+    fp, sql = fingerprint(query)
+    rec = QueryRecord(
+        fingerprint=fp, sql=sql, method=method, caller=_caller(),
+        duration_ms=duration_ms, rows=None if error else _row_count(method, result),
+        error=type(error).__name__ if error else None, query=query, values=values,
+    )
+    queries = _current.get()
+    if queries is not None:
+        queries.add(rec)
+    if duration_ms >= settings.SQL_SLOW_QUERY_MS:
+        slow_log.warning(json.dumps({
+            "event": "slow_query",
+            "fingerprint": fp,
+            "duration_ms": round(duration_ms, 2),
+            "rows": rec.rows,
+            "caller": rec.caller,
+            "method": method,
+            "error": rec.error,
+            "sql": sql[:2000],
+        }))
+    for observer in _observers:
+        try:
+            observer(rec)
+        except Exception:
+            logger.exception("SQL observer failed")
+
+
+def _wrap(method: str, original: Callable) -> Callable:
+    @functools.wraps(original)
+    async def timed(query, values=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await original(query, values, *args, **kwargs)
+        except BaseException as exc:
+            _record(method, query, values, started, None, exc)
+            raise
+        _record(method, query, values, started, result, None)
+        return result
+    return timed
+
+
+def instrument(database) -> None:
+    """Time every statement run through `database`. Idempotent."""
+    if getattr(database, "_gms_instrumented", False):
+        return
+    for method in METHODS:
+        # instance attributes shadow the class methods; `databases` itself is untouched
+        setattr(database, method, _wrap(method, getattr(database, method)))
+    database._gms_instrumented = True
+
+
+# ── per request ──
+
+class SQLTimingMiddleware:
+    """Pure ASGI middleware: collects the request's statements and adds `Server-Timing`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        queries = RequestQueries()
+        token = _current.set(queries)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={queries.total_ms:.1f};desc="{queries.count} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
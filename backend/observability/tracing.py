@@ -0,0 +1,335 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import re
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from config import settings
+from fastapi.routing import APIRoute
+from observability.sql import QueryRecord, add_observer
+from observability.asgi import route_template
+
+logger = logging.getLogger(__name__)
+
+
+## Request tracing (W3C traceparent in, batched OTLP/JSON or JSON-lines out)
+#
+#  Span tree per sampled request:
+#    server   "GET /api/tasks/{task_id}"      TracingMiddleware
+#    route    handler incl. validation         TracedRoute (route_class of every router)
+#      endpoint                                 (the router function)
+#        crud "TaskMonitorsCurd.find_task_by_id"  trace_crud(...)
+#          db  one per statement                (SQL observer, observability/sql.py)
+#      serialize  from the endpoint's return to the response being built
+#  Sampling is parent-based: an incoming sampled traceparent is always followed, an
+#  unsampled one never; otherwise TRACE_SAMPLE_RATE decides. Unsampled requests only pay
+#  for one ContextVar lookup per span site.
+#  Finished spans go on a bounded queue (dropped when full) that a background task drains
+#  in batches; the actual write/POST runs in a thread so it never blocks the event loop.
+
+SERVER, INTERNAL, CLIENT = 2, 1, 3   # OTLP span kinds
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: int = INTERNAL
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def enabled() -> bool:
+    return settings.TRACE_EXPORTER != "none"
+
+
+# ── export ──
+
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    out = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+    }
+    if s.parent_id:
+        out["parentSpanId"] = s.parent_id
+    return out
+
+
+class SpanExporter:
+
+    def __init__(self):
+        self._queue: Deque[Span] = deque()
+        self._wakeup = asyncio.Event()
+        self.dropped = 0
+        self.exported = 0
+
+    def submit(self, span: Span) -> None:
+        if len(self._queue) >= settings.TRACE_QUEUE_SIZE:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+        if len(self._queue) >= settings.TRACE_BATCH_SIZE:
+            self._wakeup.set()
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        while self._queue and len(batch) < settings.TRACE_BATCH_SIZE:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _export(self, batch: List[Span]) -> None:
+        """Runs in a worker thread."""
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.APP_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "gms"}, "spans": [_otlp_span(s) for s in batch]}],
+            }]
+        }
+        if settings.TRACE_EXPORTER == "file":
+            with open(settings.TRACE_FILE_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        elif settings.TRACE_EXPORTER == "otlp":
+            req = urllib.request.Request(
+                settings.TRACE_OTLP_ENDPOINT,
+                data=json.dumps(payload).encode(),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                resp.read()
+
+    async def _flush(self) -> None:
+        while self._queue:
+            batch = self._drain()
+            try:
+                await asyncio.to_thread(self._export, batch)
+                self.exported += len(batch)
+            except Exception:
+                self.dropped += len(batch)
+                logger.warning("Trace export failed; dropped %d spans", len(batch), exc_info=True)
+                return
+
+    async def run(self) -> None:
+        """Runs for the lifetime of the worker; flushes what's left on shutdown."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.TRACE_EXPORT_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self._flush()
+        except asyncio.CancelledError:
+            await self._flush()
+            raise
+
+
+exporter = SpanExporter()
+
+
+# ── spans ──
+
+def _finish(span: Span) -> None:
+    span.end_ns = span.end_ns or time.time_ns()
+    exporter.submit(span)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child of the current span; a no-op (yields None) outside a sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace_id, _new_id(8), parent.span_id, name, kind, time.time_ns(), attributes=attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        _finish(s)
+
+
+def _on_query(rec: QueryRecord) -> None:
+    """SQL observer: the statement already ran, so its span is back-dated by its duration."""
+    parent = _current.get()
+    if parent is None:
+        return
+    end = time.time_ns()
+    _finish(Span(
+        parent.trace_id, _new_id(8), parent.span_id, f"db {rec.method}", CLIENT,
+        end - int(rec.duration_ms * 1_000_000), end,
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": rec.sql[:1000],
+            "db.fingerprint": rec.fingerprint,
+            "db.rows": -1 if rec.rows is None else rec.rows,
+            "code.function": rec.caller,
+        },
+        error=rec.error,
+    ))
+
+
+def trace_crud(*classes: type) -> None:
+    """Wrap the public async methods of CRUD classes in a span named `Class.method`."""
+    for cls in classes:
+        for name, attr in list(vars(cls).items()):
+            func = attr.__func__ if isinstance(attr, staticmethod) else None
+            if name.startswith("_") or func is None or not asyncio.iscoroutinefunction(func):
+                continue
+            setattr(cls, name, staticmethod(_traced(f"{cls.__name__}.{name}", func)))
+
+
+def _traced(span_name: str, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return await func(*args, **kwargs)
+        with span(span_name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+class TracedRoute(APIRoute):
+    """
+    route_class for the API routers: a span around the route handler (validation,
+    endpoint, serialisation), one around the endpoint itself, and `serialize` for the
+    time from the endpoint's return to the finished Response.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _traced_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            if _current.get() is None:
+                return await handler(request)
+            done: list = []
+            token = _endpoint_done.set(done)
+            try:
+                with span(f"route {route_template(request.scope) or self.path}") as route_span:
+                    response = await handler(request)
+                    if done:
+                        _finish(Span(route_span.trace_id, _new_id(8), route_span.span_id, "serialize",
+                                     INTERNAL, done[0], time.time_ns()))
+                    return response
+            finally:
+                _endpoint_done.reset(token)
+
+        return traced_handler
+
+
+_endpoint_done: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("trace_endpoint_done", default=None)
+
+
+def _traced_endpoint(call):
+    @functools.wraps(call)
+    async def endpoint(*args, **kwargs):
+        if _current.get() is None:
+            return await call(*args, **kwargs)
+        with span("endpoint"):
+            result = await call(*args, **kwargs)
+        done = _endpoint_done.get()
+        if done is not None:
+            done.append(time.time_ns())
+        return result
+    return endpoint
+
+
+# ── per request ──
+
+def _sampled(traceparent: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from an incoming header, or a fresh decision."""
+    match = _TRACEPARENT.match(traceparent or "")
+    if match and match.group(1) != "0" * 32 and match.group(2) != "0" * 16:
+        return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+    return _new_id(16), None, random.random() < settings.TRACE_SAMPLE_RATE
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: opens the server span and answers with our `traceparent`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent", b"").decode("latin-1") or None
+        trace_id, parent_id, sampled = _sampled(incoming)
+        if not sampled:
+            return await self.app(scope, receive, send)
+
+        root = Span(trace_id, _new_id(8), parent_id, scope["method"], SERVER, time.time_ns())
+        root.attributes.update({"http.method": scope["method"], "url.path": scope.get("path", "")})
+        traceparent = f"00-{trace_id}-{root.span_id}-01".encode()
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent)]
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _current.reset(token)
+            template = route_template(scope)
+            if template:
+                root.name = f"{scope['method']} {template}"
+                root.attributes["http.route"] = template
+            _finish(root)
+
+
+if enabled():
+    add_observer(_on_query)
@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 
 import sqlalchemy as sa
 from sqlalchemy import CheckConstraint, text, UniqueConstraint, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 import databases
 
@@ -32,26 +33,40 @@ def timestamp_columns():
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
     ]
 
+# Per-day task figures shared by task_monitors and its archive
+def task_figure_columns():
+    return [
+        sa.Column("task_completed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("task_inprogress", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("task_reworked", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("task_approved", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("task_rejected", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("task_reviewed", sa.Integer, nullable=False, server_default="0"),
+        # hundredths of an hour: exact for the API's 2-decimal hours, and a plain int to decode
+        sa.Column("hours_logged_hundredths", sa.SmallInteger, nullable=False, server_default="0"),
+        sa.Column("billable", sa.Boolean, nullable=False, server_default="false"),
+        sa.Column("description", sa.Text, nullable=True),
+    ]
+
 # USERS
 users = sa.Table(
     "users",
     metadata,
-    sa.Column("id", sa.String(36), primary_key=True),         # consider UUID if you can
+    sa.Column("id", UUID(as_uuid=False), primary_key=True),
     sa.Column("username", sa.String(150), unique=True, nullable=False),
     sa.Column("password", sa.String(255), nullable=False),
     sa.Column("first_name", sa.String(100), nullable=True),
     sa.Column("last_name", sa.String(100), nullable=True),
     sa.Column("gender", sa.String(10), nullable=True),        # or Enum(...) if you want
-    sa.Column("status", sa.CHAR(1), nullable=False, server_default=text("'1'")),  # '1' active, '0' inactive
+    sa.Column("status", sa.Boolean, nullable=False, server_default=sa.true()),  # API still speaks '1' / '0'
     *timestamp_columns(),
-    CheckConstraint("status in ('0','1')", name="ck_status_01")
 )
 
 # ROLES
 roles = sa.Table(
     "roles",
     metadata,
-    sa.Column("role_id", sa.String(36), primary_key=True),
+    sa.Column("role_id", UUID(as_uuid=False), primary_key=True),
     sa.Column("role_name", sa.String(100), unique=True, nullable=False),
     *timestamp_columns(),
 )
@@ -68,7 +83,7 @@ employees = sa.Table(
     sa.Column("phone", sa.String(20), nullable=True),
     sa.Column("gender", sa.CHAR(1), nullable=True),
     sa.Column("designation", sa.String(100), nullable=True),
-    sa.Column("role", sa.String(36), ForeignKey("roles.role_id", ondelete="RESTRICT"), nullable=True),
+    sa.Column("role", UUID(as_uuid=False), ForeignKey("roles.role_id", ondelete="RESTRICT"), nullable=True),
     sa.Column("skill", sa.String(255), nullable=True),
     sa.Column("experience", sa.Numeric(4, 1), nullable=True),  # e.g., 3.5 years
     sa.Column("qualification", sa.String(255), nullable=True),
@@ -76,9 +91,8 @@ employees = sa.Table(
     sa.Column("city", sa.String(100), nullable=True),
     sa.Column("active_at", sa.Date, nullable=False, server_default=sa.func.current_date()),
     sa.Column("inactive_at", sa.Date, nullable=True),
-    sa.Column("status", sa.CHAR(1), nullable=False, server_default=text("'1'")),
+    sa.Column("status", sa.Boolean, nullable=False, server_default=sa.true()),
     *timestamp_columns(),
-    CheckConstraint("status in ('0','1')", name="ck_status_01"),
     UniqueConstraint("email", name="uq_employee_email"),
 )
 
@@ -89,10 +103,9 @@ projects = sa.Table(
     sa.Column("project_id", sa.Integer, sa.Identity(start=101, cycle=True), primary_key=True),
     sa.Column("project_name", sa.String(200), nullable=False),
     sa.Column("active_at", sa.Date, nullable=False, server_default=sa.func.current_date()),
-    sa.Column("status", sa.CHAR(1), nullable=False, server_default=text("'1'")),
+    sa.Column("status", sa.Boolean, nullable=False, server_default=sa.true()),
     sa.Column("inactive_at", sa.Date, nullable=True),
     *timestamp_columns(),
-    CheckConstraint("status in ('0','1')", name="ck_status_01"),
 )
 
 # PROJECT STAFFING
@@ -101,7 +114,7 @@ project_staffing = sa.Table(
     metadata,
     sa.Column("id", sa.BigInteger, sa.Identity(start=1, cycle=True), primary_key=True),
     sa.Column("project_id", sa.Integer, ForeignKey("projects.project_id", ondelete="RESTRICT"), nullable=False),
-    sa.Column("employees_id", sa.String(50), ForeignKey("employees.employees_id", ondelete="RESTRICT"), nullable=False),
+    sa.Column("employees_id", sa.String(36), ForeignKey("employees.employees_id", ondelete="RESTRICT"), nullable=False),
     sa.Column("gms_manager", sa.String(150), nullable=True),
     sa.Column("t_manager", sa.String(150), nullable=True),
     sa.Column("pod_lead", sa.String(150), nullable=True),
@@ -109,24 +122,252 @@ project_staffing = sa.Table(
 )
 
 # TASK MONITORS
+# Range-partitioned by task_date month; the partition key has to be part of the primary key.
+task_monitors_task_id_seq = sa.Sequence("task_monitors_task_id_seq", start=1, cycle=True)
+
 task_monitors = sa.Table(
     "task_monitors",
     metadata,
-    sa.Column("task_id", sa.Integer, sa.Identity(start=1, cycle=True), primary_key=True),
+    sa.Column("task_id", sa.Integer, task_monitors_task_id_seq, server_default=task_monitors_task_id_seq.next_value(), primary_key=True),
     sa.Column("project_staffing_id", sa.BigInteger, ForeignKey("project_staffing.id", ondelete="RESTRICT"), nullable=False),
-    sa.Column("task_date", sa.Date, nullable=False),
-    sa.Column("task_completed", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("task_inprogress", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("task_reworked", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("task_approved", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("task_rejected", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("task_reviewed", sa.Integer, nullable=False, server_default="0"),
-    sa.Column("hours_logged", sa.Numeric(4, 2), nullable=False, server_default="0.00"),
-    sa.Column("billable", sa.Boolean, nullable=False, server_default="false"),
-    sa.Column("description", sa.Text, nullable=True),
+    sa.Column("task_date", sa.Date, primary_key=True),
+    *task_figure_columns(),
     *timestamp_columns(),
+    sa.Index("ix_task_monitors_psid_date", "project_staffing_id", "task_date"),
+    # list order, covering the chart columns: `?fields=task_id,task_date,task_completed,..`
+    # is an index-only scan
+    sa.Index(
+        "ix_task_monitors_date_id", "task_date", "task_id",
+        postgresql_include=[
+            "project_staffing_id", "task_completed", "task_inprogress", "task_reworked",
+            "task_approved", "task_rejected", "task_reviewed", "hours_logged_hundredths",
+        ],
+    ),
+    postgresql_partition_by="RANGE (task_date)",
+)
+
+# Creates the month partitions in [p_from, p_to) that don't exist yet, pulling any
+# matching rows out of the default partition first. Also installed by migration f27f6b585bb3.
+TASK_MONITORS_ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION task_monitors_ensure_partitions(
+    p_from date, p_to date, p_parent text DEFAULT 'task_monitors'
+) RETURNS integer AS $$
+DECLARE
+  m       date := date_trunc('month', p_from)::date;
+  m_next  date;
+  part    text;
+  created integer := 0;
+BEGIN
+  -- several workers may call this at startup
+  PERFORM pg_advisory_xact_lock(hashtext('task_monitors_ensure_partitions'));
+  WHILE m < p_to LOOP
+    m_next := (m + interval '1 month')::date;
+    part := format('task_monitors_p%s', to_char(m, 'YYYY_MM'));
+    IF to_regclass(part) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, p_parent);
+      -- rows that fell into the default partition for this month move into the new one
+      IF to_regclass('task_monitors_default') IS NOT NULL THEN
+        EXECUTE format(
+          'WITH moved AS (DELETE FROM task_monitors_default WHERE task_date >= $1 AND task_date < $2 RETURNING *) '
+          'INSERT INTO %I SELECT * FROM moved', part
+        ) USING m, m_next;
+      END IF;
+      -- a valid CHECK lets ATTACH skip its validation scan
+      EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (task_date >= %L AND task_date < %L)',
+                     part, part || '_range', m, m_next);
+      EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                     p_parent, part, m, m_next);
+      EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', part, part || '_range');
+      created := created + 1;
+    END IF;
+    m := m_next;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Fresh databases built by create_all get the same partition plumbing as migrated ones
+sa.event.listen(task_monitors, "after_create", sa.DDL(TASK_MONITORS_ENSURE_PARTITIONS_FN.replace("%", "%%")))
+sa.event.listen(task_monitors, "after_create", sa.DDL("CREATE TABLE task_monitors_default PARTITION OF task_monitors DEFAULT"))
+
+# TASK MONITORS ARCHIVE
+# Rows older than ARCHIVE_HORIZON_DAYS, moved here in batches by jobs/archive.py. Read-only
+# history: created_at/updated_at keep their original values and no triggers are attached.
+task_monitors_archive = sa.Table(
+    "task_monitors_archive",
+    metadata,
+    sa.Column("task_id", sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column("project_staffing_id", sa.BigInteger, ForeignKey("project_staffing.id", ondelete="RESTRICT"), nullable=False),
+    sa.Column("task_date", sa.Date, primary_key=True),
+    *task_figure_columns(),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Index("ix_task_monitors_archive_date_id", "task_date", "task_id"),
+    sa.Index("ix_task_monitors_archive_psid_date", "project_staffing_id", "task_date"),
+)
+
+# Archive is append-only: pack pages full and compress descriptions harder (lz4 needs PG14+ built with lz4)
+sa.event.listen(task_monitors_archive, "after_create", sa.DDL(
+    "ALTER TABLE task_monitors_archive SET (fillfactor = 100, toast_tuple_target = 128)"
+))
+
+# Running totals of everything in task_monitors_archive, one row per staffing, so the
+# dashboard never has to scan archived rows for its all-time figures.
+task_monitors_archive_totals = sa.Table(
+    "task_monitors_archive_totals",
+    metadata,
+    sa.Column("project_staffing_id", sa.BigInteger, ForeignKey("project_staffing.id", ondelete="RESTRICT"), primary_key=True),
+    sa.Column("task_completed", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("task_inprogress", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("task_reworked", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("task_approved", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("task_rejected", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("task_reviewed", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("hours_logged_hundredths", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("rows_archived", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("first_task_date", sa.Date, nullable=True),
+    sa.Column("last_task_date", sa.Date, nullable=True),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+)
+
+# Single row: every archived row has task_date < archived_before
+task_monitors_archive_state = sa.Table(
+    "task_monitors_archive_state",
+    metadata,
+    sa.Column("id", sa.SmallInteger, primary_key=True, server_default=text("1"), autoincrement=False),
+    sa.Column("archived_before", sa.Date, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    CheckConstraint("id = 1", name="ck_archive_state_single_row"),
 )
 
-# Create tables (sync engine just for schema creation; migrations will own changes later)
+# Cache invalidation: every write to a cached table sends its name on this channel at commit
+# (cache/notify.py listens in each worker). Statement-level, so a bulk write is one message.
+CACHE_INVALIDATION_CHANNEL = "gms_cache_invalidation"
+NOTIFIED_TABLES = [
+    "roles", "employees", "projects", "project_staffing",
+    "task_monitors", "task_monitors_archive", "task_monitors_archive_totals",
+]
+
+# Per-table change markers for ETags (cache/etag.py): one sequence per notified table, bumped
+# by the statement trigger below. nextval() never waits and never rolls back, so writers to a
+# table don't queue on a shared row. It is visible before the write commits, though, so each
+# worker's NOTIFY listener bumps again once the message (sent at commit) arrives.
+def table_version_seq(table: str) -> str:
+    return f"table_version_{table}"
+
+table_version_sequences = {t: sa.Sequence(table_version_seq(t), metadata=metadata) for t in NOTIFIED_TABLES}
+
+NOTIFY_TABLE_CHANGE_FN = f"""
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+  PERFORM nextval(('table_version_' || TG_TABLE_NAME)::regclass);
+  PERFORM pg_notify('{CACHE_INVALIDATION_CHANNEL}', TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+for _t in NOTIFIED_TABLES:
+    sa.event.listen(metadata.tables[_t], "after_create", sa.DDL(NOTIFY_TABLE_CHANGE_FN))
+    sa.event.listen(metadata.tables[_t], "after_create", sa.DDL(
+        f"CREATE TRIGGER {_t}_notify_change AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_t} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change()"
+    ))
+
+# CHANGE LOG
+# One row per row-level write to the synced tables (curd/changes.py serves it as a feed).
+# `txid` is the writing transaction: readers only hand out rows from transactions older than
+# every one still running, so a row that commits late is never skipped by a cursor.
+change_log = sa.Table(
+    "change_log",
+    metadata,
+    sa.Column("id", sa.BigInteger, sa.Identity(always=True), primary_key=True),
+    sa.Column("txid", sa.BigInteger, nullable=False, server_default=text("txid_current()")),
+    sa.Column("table_name", sa.String(63), nullable=False),
+    sa.Column("op", sa.CHAR(1), nullable=False),          # 'U' upsert, 'D' delete (tombstone)
+    sa.Column("row_key", sa.Text, nullable=False),
+    sa.Column("row_data", JSONB, nullable=True),        # NULL for tombstones
+    sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    CheckConstraint("op in ('U','D')", name="ck_change_log_op"),
+    sa.Index("ix_change_log_txid", "txid", "id"),
+    sa.Index("ix_change_log_changed_at", "changed_at"),
+)
+
+# Single row: change_log rows from transactions up to pruned_through may have been deleted
+change_log_state = sa.Table(
+    "change_log_state",
+    metadata,
+    sa.Column("id", sa.SmallInteger, primary_key=True, server_default=text("1"), autoincrement=False),
+    sa.Column("pruned_through", sa.BigInteger, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    CheckConstraint("id = 1", name="ck_change_log_state_single_row"),
+)
+
+# table -> key column. task_monitors is keyed on task_id alone: a task_date edit moves the row
+# to another partition (logged as D + U of the same key), and the client keeps one task.
+CHANGE_LOGGED_TABLES = {
+    "roles": "role_id",
+    "employees": "employees_id",
+    "projects": "project_id",
+    "project_staffing": "id",
+    "task_monitors": "task_id",
+}
+LOG_ROW_CHANGE_FN = """
+CREATE OR REPLACE FUNCTION log_row_change() RETURNS trigger AS $$
+DECLARE
+  tbl text := TG_ARGV[0];   -- partitions fire this too; TG_TABLE_NAME would be the partition
+  key_col text := TG_ARGV[1];
+  rec jsonb;
+BEGIN
+  -- set by jobs/archive.py: moving a task to the archive is not a delete for clients
+  IF current_setting('gms.skip_change_log', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO change_log (table_name, op, row_key) VALUES (tbl, 'D', to_jsonb(OLD) ->> key_col);
+    RETURN NULL;
+  END IF;
+  rec := to_jsonb(NEW);
+  IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) ->> key_col) IS DISTINCT FROM (rec ->> key_col) THEN
+    INSERT INTO change_log (table_name, op, row_key) VALUES (tbl, 'D', to_jsonb(OLD) ->> key_col);
+  END IF;
+  INSERT INTO change_log (table_name, op, row_key, row_data) VALUES (tbl, 'U', rec ->> key_col, rec);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+for _t, _key in CHANGE_LOGGED_TABLES.items():
+    sa.event.listen(metadata.tables[_t], "after_create", sa.DDL(LOG_ROW_CHANGE_FN))
+    sa.event.listen(metadata.tables[_t], "after_create", sa.DDL(
+        f"CREATE TRIGGER {_t}_log_change AFTER INSERT OR UPDATE OR DELETE ON {_t} "
+        f"FOR EACH ROW EXECUTE FUNCTION log_row_change('{_t}', '{_key}')"
+    ))
+
+# Create tables (sync engine just for schema creation; migrations own every change after that)
 sync_engine = sa.create_engine(SYNC_DATABASE_URL, pool_pre_ping=True)
-metadata.create_all(sync_engine)
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic")
+
+
+def create_schema(engine) -> bool:
+    """
+    Build an empty database from `metadata` and stamp it at the alembic head. Any other
+    database is left alone: on one that predates a migration, create_all would make that
+    migration's tables first and the migration would then fail on them. alembic/env.py
+    imports this module, so that includes every `alembic upgrade`.
+    """
+    from alembic.script import ScriptDirectory
+
+    with engine.begin() as conn:
+        # workers starting together against a new database: one builds, the rest see tables
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('gms_create_schema'))"))
+        if sa.inspect(conn).get_table_names():
+            return False
+        metadata.create_all(conn)
+        head = ScriptDirectory(ALEMBIC_DIR).get_current_head()
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:head)"), {"head": head})
+    return True
+
+
+create_schema(sync_engine)
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+import logging
+from config import settings
+from security import admin_token_valid
+from observability.explain import plan_capture
+from observability.profiling import profiles
+from observability.memory import memory_tracer
+from observability.tracing import TracedRoute
+
+logger = logging.getLogger(__name__)
+
+
+# Gate for everything under /api/admin: a shared token, and hidden entirely when none is set
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)], route_class=TracedRoute)
+
+# Plans captured for slow statements on this worker, newest first
+@router.get("/slow-plans")
+async def slow_plans(fingerprint: Optional[str] = None, limit: int = 20):
+    try:
+        return {
+            "threshold_ms": settings.EXPLAIN_THRESHOLD_MS,
+            "skipped": plan_capture.skipped,
+            "plans": plan_capture.recent(fingerprint=fingerprint, limit=limit),
+        }
+    except Exception as exc:
+        logger.exception("Failed to list slow plans")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to list slow plans", "error": str(exc)},
+        )
+
+# Requests profiled on demand (sent with `X-Profile: 1`), newest first
+@router.get("/profiles")
+async def list_profiles():
+    return {"profiles": profiles.list()}
+
+
+# One profile as folded stacks (flamegraph.pl / speedscope / inferno input)
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile '{profile_id}' not found")
+    return Response(content=profile["folded"] + "\n", media_type="text/plain")
+
+
+# tracemalloc: start (takes the baseline), diff against it, stop
+@router.get("/tracemalloc")
+async def tracemalloc_status():
+    return memory_tracer.status()
+
+
+@router.post("/tracemalloc/start")
+async def tracemalloc_start(frames: Optional[int] = Query(None, ge=1, le=100)):
+    try:
+        return await asyncio.to_thread(memory_tracer.start, frames)
+    except Exception as exc:
+        logger.exception("Failed to start tracemalloc")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to start tracemalloc", "error": str(exc)},
+        )
+
+
+@router.get("/tracemalloc/diff")
+async def tracemalloc_diff(limit: int = Query(20, ge=1, le=200), reset: bool = False):
+    try:
+        result = await asyncio.to_thread(memory_tracer.diff, limit, reset)
+    except Exception as exc:
+        logger.exception("Failed to diff tracemalloc snapshots")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to diff tracemalloc snapshots", "error": str(exc)},
+        )
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not running; POST /api/admin/tracemalloc/start first")
+    return result
+
+
+@router.post("/tracemalloc/stop")
+async def tracemalloc_stop():
+    return memory_tracer.stop()
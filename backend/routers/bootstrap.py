@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, status
+import logging
+from schema.bootstrap import Bootstrap
+from curd.bootstrap import BootstrapCurdOperation, BOOTSTRAP_TABLES
+from cache.response import cached
+from observability.tracing import TracedRoute
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"], route_class=TracedRoute)
+
+# Roles, employee names, projects and dashboard summary in one response.
+# One ETag covers all four, so a reload with nothing changed is a single 304.
+@router.get("", response_model=Bootstrap)
+@cached(*BOOTSTRAP_TABLES)
+async def bootstrap():
+    try:
+        return await BootstrapCurdOperation.load()
+    except HTTPException as he:
+        logger.warning("bootstrap HTTPException: %s", he.detail)
+        raise
+    except Exception as exc:
+        logger.exception("Failed to load bootstrap data")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to load bootstrap data", "error": str(exc)},
+        )
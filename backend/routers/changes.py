@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from curd.changes import ChangesCurdOperation, PAGE_SIZE
+import logging
+from observability.tracing import TracedRoute
+
+router = APIRouter(prefix="/changes", tags=["Changes"], route_class=TracedRoute)
+logger = logging.getLogger(__name__)
+
+# Upserts and tombstones since a cursor; call without `since` to get a starting cursor,
+# and again with the returned cursor while `has_more` is true
+@router.get("")
+async def get_changes(since: Optional[str] = None, limit: int = Query(PAGE_SIZE, ge=1, le=5000)):
+    try:
+        return await ChangesCurdOperation.changes_since(since, limit)
+    except HTTPException as he:
+        logger.warning("get_changes HTTPException (since=%s): %s", since, he.detail)
+        raise
+    except Exception as exc:
+        logger.exception("Failed to read changes (since=%s)", since)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read changes: {exc}",
+        ) from exc
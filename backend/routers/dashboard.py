@@ -1,14 +1,19 @@
+from datetime import date
+from typing import Optional
 from fastapi import APIRouter, HTTPException, status
 from curd.dashboard import DashboardCurdOperation
 import logging
+from cache.response import cached
+from observability.tracing import TracedRoute
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=TracedRoute)
 logger = logging.getLogger(__name__)
 
 @router.get("/summary")
-async def get_dashboard_summary():
+@cached("task_monitors", "task_monitors_archive", "task_monitors_archive_totals", "project_staffing", "projects", "employees")
+async def get_dashboard_summary(date_from: Optional[date] = None, date_to: Optional[date] = None):
     try:
-        data = await DashboardCurdOperation.get_dashboard_summary()
+        data = await DashboardCurdOperation.get_dashboard_summary(date_from=date_from, date_to=date_to)
         return data
     except HTTPException as he:
         # Preserve original FastAPI HTTP errors (e.g., 404/400 you may raise inside the CRUD)
@@ -1,14 +1,19 @@
 from schema.employees import EmployeesList,EmployeesUpdate, EmployeesEntry
 from curd.employees import EmployeesCurdOperation
-from fastapi import APIRouter, HTTPException, status
+from schema.batch import BatchGet
+from curd.fields import requested_fields, sparse_response
+from fastapi import APIRouter, HTTPException, Query, status
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from cache.response import cached
+from observability.tracing import TracedRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/employees", tags=["Employees"])
+router = APIRouter(prefix="/employees", tags=["Employees"], route_class=TracedRoute)
 
 # Get all employees names and ids
 @router.get("/names")
+@cached("employees", "roles")
 async def find_all_employees_name():
     try:
         return await EmployeesCurdOperation.find_all_employees_name()
@@ -24,9 +29,16 @@ async def find_all_employees_name():
 
 # Get all employees
 @router.get("", response_model=List[EmployeesList])
-async def find_all_employees():
+@cached("employees", "roles")
+async def find_all_employees(
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the response fields, e.g. employees_id,first_name,role_name"),
+):
     try:
-        return await EmployeesCurdOperation.find_all_employees()
+        selected = requested_fields(fields, EmployeesList)
+        rows = await EmployeesCurdOperation.find_all_employees(limit=limit, offset=offset, fields=selected)
+        return rows if selected is None else sparse_response(EmployeesList, selected, rows)
     except HTTPException as he:
         logger.warning("find_all_employees HTTPException: %s", he.detail)
         raise
@@ -52,8 +64,25 @@ async def register_employee(employee: EmployeesEntry):
             detail={"message": "Failed to create employee", "error": str(exc)},
         )
 
+# Get several employees by ID (declared before /{employeeId} so "batch" isn't read as an id)
+@router.get("/batch", response_model=BatchGet[EmployeesList])
+@cached("employees", "roles")
+async def find_employees_by_ids(ids: List[str] = Query(..., description="Repeat per id: ?ids=a&ids=b")):
+    try:
+        return await EmployeesCurdOperation.find_employees_by_ids(ids)
+    except HTTPException as he:
+        logger.warning("find_employees_by_ids HTTPException: %s", he.detail)
+        raise
+    except Exception as exc:
+        logger.exception("Failed to fetch employees by ids")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to fetch employees by ids", "error": str(exc)},
+        )
+
 # Get employee by ID
 @router.get("/{employeeId}", response_model=EmployeesList)
+@cached("employees", "roles")
 async def find_employee_by_id(employeeId: str):
     try:
         result = await EmployeesCurdOperation.find_employees_by_id(employeeId)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from jobs.dashboard_feed import dashboard_feed
+from config import settings
+import logging
+from observability.tracing import TracedRoute
+
+router = APIRouter(prefix="/events", tags=["Events"], route_class=TracedRoute)
+logger = logging.getLogger(__name__)
+
+# Server-Sent Events: one "snapshot" of the dashboard summary, then "delta" events
+# (changed and removed project rows) whenever task or staffing writes commit
+@router.get("/dashboard")
+async def dashboard_events(request: Request):
+    try:
+        sub = dashboard_feed.subscribe()
+    except OverflowError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live dashboard connections; poll /api/dashboard/summary instead",
+        )
+
+    async def stream():
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+            while not await request.is_disconnected():
+                frame = await dashboard_feed.next_message(sub, settings.SSE_KEEPALIVE_SECONDS)
+                # comment lines keep proxies from closing an idle stream
+                yield frame if frame is not None else ": keepalive\n\n"
+        except Exception:
+            logger.exception("dashboard event stream failed")
+        finally:
+            dashboard_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
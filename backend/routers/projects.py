@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from schema.projects import TrainerProjectUpdate, ProjectStaffingAdd, ProjectWithStaffingAdd, ProjectsWithTrainer
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Optional
+from schema.projects import TrainerProjectUpdate, ProjectStaffingAdd, ProjectWithStaffingAdd, ProjectsWithTrainer, ProjectWithTrainers
 from curd.projects import ProjectsCurdOperation
+from schema.batch import BatchGet
+from curd.fields import requested_fields, sparse_response
 import logging
+from cache.response import cached
+from observability.tracing import TracedRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/projects", tags=["Project Details"])
+router = APIRouter(prefix="/projects", tags=["Project Details"], route_class=TracedRoute)
 
 # Get projects by Trainer ID
 @router.get("/trainer/{trainer_id}")
+@cached("projects", "project_staffing")
 async def get_projects_by_trainer(trainer_id: str):
     try:
         return await ProjectsCurdOperation.get_projects_for_trainer(trainer_id)
@@ -24,9 +29,14 @@ async def get_projects_by_trainer(trainer_id: str):
 
 # Get all projects
 @router.get("", response_model=List[ProjectsWithTrainer])
-async def find_all_projects():
+@cached("projects", "project_staffing", "employees")
+async def find_all_projects(
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the response fields, e.g. project_id,project_name,employees_id"),
+):
     try:
-        return await ProjectsCurdOperation.find_all_projects_with_trainer()
+        selected = requested_fields(fields, ProjectsWithTrainer)
+        rows = await ProjectsCurdOperation.find_all_projects_with_trainer(fields=selected)
+        return rows if selected is None else sparse_response(ProjectsWithTrainer, selected, rows)
     except HTTPException:
         raise
     except Exception as exc:
@@ -64,8 +74,24 @@ async def assign_trainer_to_project(project: ProjectStaffingAdd):
             detail=f"Failed to assign trainer to project: {exc}",
         ) from exc
 
+# Get several projects by ID, each with its trainers (declared before /{project_Id})
+@router.get("/batch", response_model=BatchGet[ProjectWithTrainers])
+@cached("projects", "project_staffing", "employees")
+async def find_projects_by_ids(ids: List[int] = Query(..., description="Repeat per id: ?ids=101&ids=102")):
+    try:
+        return await ProjectsCurdOperation.find_projects_by_ids(ids)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Failed to fetch projects by ids")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to fetch projects by ids: {exc}",
+        ) from exc
+
 # Get project by ID
 @router.get("/{project_Id}", response_model=ProjectsWithTrainer)
+@cached("projects", "project_staffing", "employees")
 async def find_project_by_id(project_Id: int):
     try:
         return await ProjectsCurdOperation.find_project_by_id(project_Id)
@@ -3,12 +3,15 @@ import logging
 from schema.roles import RolesList, RolesUpdate, RolesEntry
 from curd.roles import RolesCurdOperation
 from typing import List
+from cache.response import cached
+from observability.tracing import TracedRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/roles", tags=["Roles"])
+router = APIRouter(prefix="/roles", tags=["Roles"], route_class=TracedRoute)
 
 # Get all roles
 @router.get("", response_model=List[RolesList])
+@cached("roles")
 async def find_all_roles():
     try:
         return await RolesCurdOperation.find_all_roles()
@@ -1,18 +1,42 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import date
 from schema.tasks_monitor import TaskMonitorBase, TaskMonitorCreate, TaskMonitorUpdate
 from curd.tasks_monitor import TaskMonitorsCurd
+from schema.batch import BatchGet
+from curd.fields import requested_fields, sparse_response
+from cache.response import cached
+from observability.tracing import TracedRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
+router = APIRouter(prefix="/tasks", tags=["Tasks"], route_class=TracedRoute)
 
 # Get all Tasks
 @router.get("", response_model=List[TaskMonitorBase])
-async def find_all_task():
+@cached("task_monitors", "task_monitors_archive", "project_staffing", "employees", "projects")
+async def find_all_task(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    employees_id: Optional[str] = None,
+    project_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of the response fields, e.g. task_id,task_date,task_completed"),
+):
     try:
-        return await TaskMonitorsCurd.find_all_task()
+        selected = requested_fields(fields, TaskMonitorBase)
+        rows = await TaskMonitorsCurd.find_all_task(
+            limit=limit,
+            offset=offset,
+            employees_id=employees_id,
+            project_id=project_id,
+            date_from=date_from,
+            date_to=date_to,
+            fields=selected,
+        )
+        return rows if selected is None else sparse_response(TaskMonitorBase, selected, rows)
     except HTTPException as he:
         logger.warning("find_all_task HTTPException: %s", he.detail)
         raise
@@ -23,6 +47,22 @@ async def find_all_task():
             detail={"message": "Failed to list tasks", "error": str(exc)},
         )
 
+# Get several Tasks by ID (declared before /{task_id} so "batch" isn't read as an id)
+@router.get("/batch", response_model=BatchGet[TaskMonitorBase])
+@cached("task_monitors", "task_monitors_archive", "project_staffing", "employees", "projects")
+async def find_tasks_by_ids(ids: List[int] = Query(..., description="Repeat per id: ?ids=1&ids=2")):
+    try:
+        return await TaskMonitorsCurd.find_tasks_by_ids(ids)
+    except HTTPException as he:
+        logger.warning("find_tasks_by_ids HTTPException: %s", he.detail)
+        raise
+    except Exception as exc:
+        logger.exception("Failed to fetch tasks by ids")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Failed to fetch tasks by ids", "error": str(exc)},
+        )
+
 # Register Task
 @router.post("", response_model=TaskMonitorBase)
 async def register_task(task: TaskMonitorCreate):
@@ -40,6 +80,7 @@ async def register_task(task: TaskMonitorCreate):
 
 # Get Task by ID
 @router.get("/{task_id}", response_model=TaskMonitorBase)
+@cached("task_monitors", "task_monitors_archive", "project_staffing", "employees", "projects")
 async def find_task_by_id(task_id: int):
     try:
         result = await TaskMonitorsCurd.find_task_by_id(task_id)
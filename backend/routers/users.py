@@ -4,8 +4,9 @@ import logging
 
 from schema.users import UserList, UserEntry, UserUpdate, UserLogin
 from curd.users import UserCurdOperation
+from observability.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TracedRoute)
 logger = logging.getLogger(__name__)
 
 # Get all users
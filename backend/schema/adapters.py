@@ -0,0 +1,50 @@
+from __future__ import annotations
+import uuid
+from decimal import Decimal
+from typing import Any, Optional
+
+## Adapters between compact DB column types and the API contract
+#  status flags : boolean in DB      <->  '1' / '0' in the API
+#  hours_logged : smallint hundredths <->  Decimal hours with 2 places
+#  uuid keys    : uuid in DB          <->  str in the API
+
+
+def status_to_db(flag: Optional[str | bool]) -> Optional[bool]:
+    if flag is None or isinstance(flag, bool):
+        return flag
+    return flag == "1"
+
+
+def status_from_db(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return "1" if value else "0"
+
+
+def hours_to_db(hours: Optional[Decimal | float | int]) -> Optional[int]:
+    """Decimal('7.25') -> 725. Exact for the two decimal places the API allows."""
+    if hours is None:
+        return None
+    return int((Decimal(str(hours)) * 100).to_integral_value())
+
+
+def hours_from_db(hundredths: Optional[int]) -> Optional[Decimal]:
+    """725 -> Decimal('7.25')"""
+    if hundredths is None:
+        return None
+    return Decimal(int(hundredths)).scaleb(-2)
+
+
+def uuid_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def is_uuid(value: Any) -> bool:
+    """True if `value` can be bound to a uuid column; lets lookups answer 404 instead of a DB error."""
+    if isinstance(value, uuid.UUID):
+        return True
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,9 @@
+from typing import Generic, List, Optional, TypeVar, Union
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+## Response of the batch-get endpoints
+class BatchGet(BaseModel, Generic[T]):
+    items     : List[Optional[T]]     = Field(..., description="One entry per requested id, in request order; null when not found")
+    not_found : List[Union[int, str]] = Field(..., description="Requested ids with no matching record")
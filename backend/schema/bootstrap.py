@@ -0,0 +1,11 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+from schema.roles import RolesList
+from schema.projects import ProjectsWithTrainer
+
+## Model for the frontend's initial load (GET /api/bootstrap)
+class Bootstrap(BaseModel):
+    roles     : List[RolesList]           = Field(..., description="Same as GET /api/roles")
+    employees : List[Dict[str, Any]]      = Field(..., description="Same as GET /api/employees/names")
+    projects  : List[ProjectsWithTrainer] = Field(..., description="Same as GET /api/projects")
+    dashboard : List[Dict[str, Any]]      = Field(..., description="Same as GET /api/dashboard/summary")
@@ -0,0 +1,10 @@
+from functools import lru_cache
+from typing import FrozenSet, Type
+from pydantic import BaseModel, create_model
+
+## Narrowed copies of response models for `fields=` (sparse fieldsets)
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """`model` restricted to `fields`; each field keeps its type, default and description."""
+    kept = {name: (info.annotation, info) for name, info in model.model_fields.items() if name in fields}
+    return create_model(f"{model.__name__}Fields", **kept)
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from pydantic import BaseModel, Field, constr
 
 StatusFlag   = Literal['0', '1']
@@ -56,3 +56,17 @@ class TrainerProjectUpdate(ProjectsUpdate):
     gms_manager   : Optional[constr(strip_whitespace=True, max_length=150)]     = Field(None, description="GMS Manager")
     t_manager     : Optional[constr(strip_whitespace=True, max_length=150)]     = Field(None, description="Turing Manager")
     pod_lead      : Optional[constr(strip_whitespace=True, max_length=150)]     = Field(None, description="POD Lead")
+
+class ProjectTrainer(BaseModel):
+    staffing_id         : int = Field(..., description="Unique identifier for the trainer project")
+    employees_id        : str = Field(..., description="Unique identifier for the employee")
+    employee_first_name : Optional[str] = Field(None, description="First name of the employee")
+    employee_last_name  : Optional[str] = Field(None, description="Last name of the employee")
+    gms_manager         : Optional[str] = Field(None, description="GMS Manager")
+    t_manager           : Optional[str] = Field(None, description="Turing Manager")
+    pod_lead            : Optional[str] = Field(None, description="POD Lead")
+    staffing_created_at : datetime = Field(..., description="Timestamp when the trainer is added to the project")
+    staffing_updated_at : datetime = Field(..., description="Timestamp when the trainer is last updated to the project")
+
+class ProjectWithTrainers(Projects):
+    trainers : List[ProjectTrainer] = Field(default_factory=list, description="Everyone staffed on the project")
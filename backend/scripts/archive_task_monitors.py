@@ -0,0 +1,20 @@
+# scripts/archive_task_monitors.py
+import argparse
+import asyncio
+from pg_db import database
+from jobs.archive import archive_task_monitors
+
+async def main(horizon_days, batch_size):
+    await database.connect()
+    try:
+        moved = await archive_task_monitors(horizon_days=horizon_days, batch_size=batch_size)
+        print("✅ Archived rows:", moved)
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old task_monitors rows into task_monitors_archive")
+    parser.add_argument("--horizon-days", type=int, default=None, help="defaults to ARCHIVE_HORIZON_DAYS")
+    parser.add_argument("--batch-size", type=int, default=None, help="defaults to ARCHIVE_BATCH_SIZE")
+    args = parser.parse_args()
+    asyncio.run(main(args.horizon_days, args.batch_size))
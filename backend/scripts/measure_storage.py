@@ -0,0 +1,79 @@
+# scripts/measure_storage.py
+# Index sizes and join timings, for comparing a database before and after a type migration:
+#   python -m scripts.measure_storage --out before.json   (alembic upgrade head)   --out after.json
+import argparse
+import asyncio
+import json
+import statistics
+
+import sqlalchemy as sa
+from pg_db import database
+
+TABLES = ["users", "roles", "employees", "projects", "project_staffing", "task_monitors", "task_monitors_archive"]
+
+# Leaf partitions are summed into their parent so task_monitors reports one figure
+INDEX_SIZES_SQL = """
+SELECT COALESCE(root.relname, t.relname) AS table_name,
+       sum(pg_indexes_size(t.oid))  AS index_bytes,
+       sum(pg_relation_size(t.oid)) AS heap_bytes
+FROM pg_class t
+LEFT JOIN pg_inherits inh ON inh.inhrelid = t.oid
+LEFT JOIN pg_class root ON root.oid = inh.inhparent
+WHERE t.relkind = 'r' AND COALESCE(root.relname, t.relname) = ANY(:tables)
+GROUP BY 1
+ORDER BY 1
+"""
+
+JOINS = {
+    "employees_roles": """
+        SELECT e.employees_id, r.role_name FROM employees e LEFT JOIN roles r ON r.role_id = e.role
+    """,
+    "staffing_employees": """
+        SELECT ps.id, e.first_name FROM project_staffing ps JOIN employees e ON e.employees_id = ps.employees_id
+    """,
+    "task_list": """
+        SELECT tm.task_id, e.first_name, p.project_name
+        FROM task_monitors tm
+        JOIN project_staffing ps ON ps.id = tm.project_staffing_id
+        JOIN employees e ON e.employees_id = ps.employees_id
+        JOIN projects p ON p.project_id = ps.project_id
+        ORDER BY tm.task_date DESC, tm.task_id DESC
+        LIMIT 100
+    """,
+}
+
+
+async def execution_ms(sql: str, runs: int) -> float:
+    """Median server-side execution time; excludes network and client decode."""
+    times = []
+    for _ in range(runs):
+        plan = await database.fetch_val(sa.text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        times.append(plan[0]["Execution Time"])
+    return round(statistics.median(times), 3)
+
+
+async def main(out, runs):
+    await database.connect()
+    try:
+        rows = await database.fetch_all(
+            sa.text(INDEX_SIZES_SQL).bindparams(sa.bindparam("tables", TABLES, type_=sa.ARRAY(sa.String)))
+        )
+        report = {
+            "sizes": {r["table_name"]: {"index_bytes": int(r["index_bytes"]), "heap_bytes": int(r["heap_bytes"])} for r in rows},
+            "joins_ms": {name: await execution_ms(sql, runs) for name, sql in JOINS.items()},
+        }
+    finally:
+        await database.disconnect()
+
+    print(json.dumps(report, indent=2))
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report index sizes and join timings")
+    parser.add_argument("--out", default=None, help="also write the report to this JSON file")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.out, args.runs))
@@ -1,15 +1,40 @@
 # scripts/seed.py
+# Synthetic data for local runs, benchmarks and load tests (see seeder/seed_dummy_data.py):
+#   python -m scripts.seed --employees 10000 --projects 800 --staffing 10000 --years 10 --truncate
+# (~10M task rows; --staffing can't exceed --employees * --projects)
+import argparse
 import asyncio
+from datetime import date
 from pg_db import database  # <- your Database(...) instance
-from seeder.seed_dummy_data import seed_dummy_data  # <- import the function you pasted
+from seeder.seed_dummy_data import seed_dummy_data
 
-async def main():
+async def main(args):
     await database.connect()
     try:
-        summary = await seed_dummy_data()
+        summary = await seed_dummy_data(
+            seed=args.seed,
+            roles=args.roles,
+            employees=args.employees,
+            projects=args.projects,
+            staffing=args.staffing,
+            years=args.years,
+            users=args.users,
+            end_date=args.end_date,
+            truncate=args.truncate,
+        )
         print("✅ Seed done:", summary)
     finally:
         await database.disconnect()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--roles", type=int, default=8)
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--staffing", type=int, default=300, help="project/employee assignments")
+    parser.add_argument("--years", type=float, default=1.0, help="years of daily task_monitors rows")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--truncate", action="store_true", help="empty the seeded tables first")
+    asyncio.run(main(parser.parse_args()))
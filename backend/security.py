@@ -0,0 +1,10 @@
+import secrets
+from typing import Optional
+from config import settings
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """True for the configured ADMIN_TOKEN; always False while none is configured."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
@@ -0,0 +1,282 @@
+from __future__ import annotations
+import random
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pg_db import database
+
+
+## Synthetic dataset for benchmarks and load tests
+#
+#  Fills roles, employees, projects, project_staffing, task_monitors and a few users from
+#  a seeded random.Random: the same arguments (and end_date) give the same rows. Each
+#  assignment's daily rows come from their own RNG, so volumes can change without
+#  reshuffling what came before.
+#  Rows are streamed with COPY (asyncpg copy_records_to_table) in one transaction:
+#  - change_log row triggers are skipped (gms.skip_change_log); seeded history is not a
+#    client-visible change
+#  - the task_monitors partitions for the whole range are created first
+#  - ids are explicit; identities and sequences are moved past them afterwards
+#  - ANALYZE at the end, so the planner sees the new volumes
+#  Volume: task rows are at most staffing * years * 250 working days * 0.94 attendance;
+#  hires, leavers and project ends inside the range bring that to roughly 40%, so ~10M
+#  rows is e.g. employees=10000, projects=800, staffing=10000, years=10 (the benchmarks'
+#  "large" scale). staffing can't exceed employees * projects. The tables must be empty
+#  unless truncate=True.
+
+ROLE_NAMES = [
+    "Trainer", "Reviewer", "Pod Lead", "Team Manager", "GMS Manager",
+    "QA Analyst", "Data Annotator", "Project Coordinator",
+]
+ROLE_WEIGHTS = [60, 12, 8, 4, 3, 6, 5, 2]   # most people are trainers
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Bhavna", "Chetan", "Deepa", "Divya", "Farhan",
+    "Gaurav", "Isha", "Karan", "Kavya", "Manish", "Meera", "Neha", "Nikhil", "Pooja", "Priya",
+    "Rahul", "Riya", "Rohan", "Sakshi", "Sanjay", "Shreya", "Sneha", "Tanvi", "Varun", "Vikram",
+]
+LAST_NAMES = [
+    "Agarwal", "Bose", "Chopra", "Das", "Desai", "Gupta", "Iyer", "Joshi", "Kapoor", "Khan",
+    "Kumar", "Mehta", "Menon", "Mishra", "Nair", "Pandey", "Pathak", "Patel", "Rao", "Reddy",
+    "Shah", "Sharma", "Singh", "Verma", "Yadav",
+]
+LOCATIONS = [
+    ("Maharashtra", "Mumbai"), ("Maharashtra", "Pune"), ("Karnataka", "Bengaluru"),
+    ("Telangana", "Hyderabad"), ("Tamil Nadu", "Chennai"), ("Delhi", "New Delhi"),
+    ("West Bengal", "Kolkata"), ("Gujarat", "Ahmedabad"), ("Uttar Pradesh", "Noida"),
+    ("Rajasthan", "Jaipur"),
+]
+DESIGNATIONS = ["Associate", "Senior Associate", "Specialist", "Lead", "Manager"]
+SKILLS = ["Python", "Java", "SQL", "Data Labelling", "Content Review", "Mathematics", "Linguistics", "JavaScript"]
+QUALIFICATIONS = ["B.Tech", "B.Sc", "BCA", "M.Tech", "M.Sc", "MCA", "MBA", "B.A."]
+PROJECT_WORDS = (
+    ["Atlas", "Beacon", "Cobalt", "Delta", "Ember", "Falcon", "Granite", "Harbor", "Indigo", "Juniper"],
+    ["Review", "Annotation", "Evaluation", "Ranking", "Tuning", "Audit", "Labelling", "Curation"],
+)
+
+UTC = timezone.utc
+EVENING = time(18, 0)
+
+ROLE_COLUMNS = ["role_id", "role_name", "created_at", "updated_at"]
+EMPLOYEE_COLUMNS = [
+    "employees_id", "first_name", "last_name", "email", "c_email", "phone", "gender", "designation",
+    "role", "skill", "experience", "qualification", "state", "city", "active_at", "inactive_at",
+    "status", "created_at", "updated_at",
+]
+PROJECT_COLUMNS = ["project_id", "project_name", "active_at", "status", "inactive_at", "created_at", "updated_at"]
+STAFFING_COLUMNS = ["id", "project_id", "employees_id", "gms_manager", "t_manager", "pod_lead", "created_at", "updated_at"]
+TASK_COLUMNS = [
+    "task_id", "project_staffing_id", "task_date", "task_completed", "task_inprogress", "task_reworked",
+    "task_approved", "task_rejected", "task_reviewed", "hours_logged_hundredths", "billable",
+    "description", "created_at", "updated_at",
+]
+USER_COLUMNS = ["id", "username", "password", "first_name", "last_name", "gender", "status", "created_at", "updated_at"]
+SEEDED_TABLES = ["task_monitors", "project_staffing", "projects", "employees", "roles", "users"]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _stamp(d: date) -> datetime:
+    return datetime.combine(d, EVENING, tzinfo=UTC)
+
+
+def _some_day(rng: random.Random, start: date, end: date) -> date:
+    return start + timedelta(days=rng.randrange(max((end - start).days, 1)))
+
+
+def _roles(rng: random.Random, count: int, start: date) -> List[Tuple]:
+    names = ROLE_NAMES[:count] + [f"Role {i}" for i in range(len(ROLE_NAMES) + 1, count + 1)]
+    return [(_uuid(rng), name, _stamp(start), _stamp(start)) for name in names]
+
+
+def _employees(rng: random.Random, count: int, role_ids: List[str], start: date, end: date) -> List[Tuple]:
+    weights = (ROLE_WEIGHTS + [1] * len(role_ids))[:len(role_ids)]
+    rows = []
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        state, city = rng.choice(LOCATIONS)
+        # a third were already on board when the range starts
+        active_at = _some_day(rng, start - timedelta(days=730), start) if rng.random() < 0.33 else _some_day(rng, start, end)
+        inactive_at = _some_day(rng, active_at, end + timedelta(days=1)) if rng.random() < 0.12 else None
+        rows.append((
+            f"EMP{i:06d}", first, last,
+            f"{first}.{last}.{i}@gms.example.com".lower(),
+            f"{first}.{last}.{i}@client.example.com".lower() if rng.random() < 0.6 else None,
+            f"+91{rng.randrange(6_000_000_000, 9_999_999_999)}",
+            rng.choices("MFO", weights=(52, 46, 2))[0],
+            rng.choice(DESIGNATIONS),
+            rng.choices(role_ids, weights=weights)[0],
+            ", ".join(rng.sample(SKILLS, rng.randint(1, 3))),
+            Decimal(str(round(min(rng.lognormvariate(1.2, 0.6), 35.0), 1))),
+            rng.choice(QUALIFICATIONS),
+            state, city, active_at, inactive_at, inactive_at is None,
+            _stamp(active_at), _stamp(inactive_at or active_at),
+        ))
+    return rows
+
+
+def _projects(rng: random.Random, count: int, start: date, end: date) -> List[Tuple]:
+    rows = []
+    for i in range(count):
+        active_at = _some_day(rng, start - timedelta(days=365), end - timedelta(days=30))
+        inactive_at = _some_day(rng, active_at + timedelta(days=30), end + timedelta(days=1)) if rng.random() < 0.15 else None
+        name = f"{rng.choice(PROJECT_WORDS[0])} {rng.choice(PROJECT_WORDS[1])} {i + 1}"
+        rows.append((101 + i, name, active_at, inactive_at is None, inactive_at, _stamp(active_at), _stamp(inactive_at or active_at)))
+    return rows
+
+
+def _team_sizes(rng: random.Random, count: int, weights: List[float], cap: int) -> List[int]:
+    """Split `count` assignments over projects by weight, at most `cap` (every employee) each."""
+    sizes = [0] * len(weights)
+    left = count
+    while left:
+        # draws that land on a full project are redrawn among the others
+        open_ = [i for i, size in enumerate(sizes) if size < cap]
+        for i in rng.choices(open_, weights=[weights[i] for i in open_], k=left):
+            if sizes[i] < cap:
+                sizes[i] += 1
+                left -= 1
+    return sizes
+
+
+def _staffing(rng: random.Random, count: int, projects: List[Tuple], employees: List[Tuple]) -> List[Tuple]:
+    if count > len(projects) * len(employees):
+        raise ValueError(
+            f"{count} staffing rows requested but only {len(projects) * len(employees)} "
+            f"project/employee pairs exist; raise employees or projects"
+        )
+    # a few large projects, a long tail of small ones
+    weights = [rng.paretovariate(1.2) for _ in projects]
+    names = [f"{e[1]} {e[2]}" for e in employees]
+    managers = {p[0]: (rng.choice(names), rng.choice(names), rng.choice(names)) for p in projects}
+    # each team is sampled without replacement, so no pair is drawn twice however dense
+    rows = []
+    for project, size in zip(projects, _team_sizes(rng, count, weights, len(employees))):
+        for employee in rng.sample(employees, size):
+            joined = max(project[2], employee[14])
+            rows.append((len(rows) + 1, project[0], employee[0], *managers[project[0]], _stamp(joined), _stamp(joined)))
+    return rows
+
+
+def _windows(staffing: List[Tuple], projects: List[Tuple], employees: List[Tuple], start: date, end: date):
+    """(staffing_id, first_day, last_day) each assignment has rows for."""
+    project_end = {p[0]: p[4] for p in projects}
+    employee = {e[0]: (e[14], e[15]) for e in employees}
+    for s in staffing:
+        active_at, inactive_at = employee[s[2]]
+        first = max(start, s[6].date(), active_at)
+        last = min(d for d in (end, project_end[s[1]], inactive_at) if d is not None)
+        if first <= last:
+            yield s[0], first, last
+
+
+def _tasks(seed: int, windows, counter: List[int]) -> Iterator[Tuple]:
+    task_id = 0
+    for staffing_id, first, last in windows:
+        rng = random.Random(seed * 1_000_003 + staffing_id)
+        pace = rng.uniform(4.0, 14.0)           # tasks per day for this person on this project
+        quality = rng.uniform(0.75, 0.97)
+        day = first
+        while day <= last:
+            if day.weekday() < 5 and rng.random() >= 0.06:
+                completed = max(0, int(rng.gauss(pace, pace * 0.3)))
+                rejected = int(completed * (1 - quality) * rng.random() * 2)
+                approved = max(completed - rejected - rng.randint(0, 2), 0)
+                task_id += 1
+                stamp = _stamp(day)
+                yield (
+                    task_id, staffing_id, day, completed, rng.randint(0, 3),
+                    int(completed * rng.random() * 0.15), approved, rejected, approved + rejected,
+                    min(max(int(rng.gauss(800, 90)), 50), 1200), rng.random() < 0.9,
+                    None, stamp, stamp,
+                )
+            day += timedelta(days=1)
+    counter[0] = task_id
+
+
+def _users(count: int, start: date) -> List[Tuple]:
+    # login compares passwords as stored, so seeded users sign in with "password"
+    return [
+        (str(uuid.UUID(int=i, version=4)), f"user{i:02d}", "password", "Seed", f"User {i}", "M", True,
+         _stamp(start), _stamp(start))
+        for i in range(1, count + 1)
+    ]
+
+
+async def _setval(raw, table: str, column: str) -> None:
+    await raw.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+        f"COALESCE((SELECT max({column}) FROM {table}), 1), (SELECT count(*) > 0 FROM {table}))"
+    )
+
+
+async def seed_dummy_data(
+    *,
+    seed: int = 42,
+    roles: int = 8,
+    employees: int = 200,
+    projects: int = 40,
+    staffing: int = 300,
+    years: float = 1.0,
+    users: int = 3,
+    end_date: Optional[date] = None,
+    truncate: bool = False,
+) -> Dict[str, Any]:
+    """Generate and COPY a synthetic dataset; returns the row count per table."""
+    rng = random.Random(seed)
+    end = end_date or date.today()
+    start = end - timedelta(days=int(years * 365))
+
+    role_rows = _roles(rng, roles, start)
+    employee_rows = _employees(rng, employees, [r[0] for r in role_rows], start, end)
+    project_rows = _projects(rng, projects, start, end)
+    staffing_rows = _staffing(rng, staffing, project_rows, employee_rows)
+    windows = list(_windows(staffing_rows, project_rows, employee_rows, start, end))
+    task_count = [0]
+
+    async with database.connection() as connection:
+        async with connection.transaction():
+            raw = connection.raw_connection
+            if truncate:
+                # CASCADE also empties the archive tables that point at project_staffing
+                await raw.execute(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE")
+            else:
+                for table in SEEDED_TABLES:
+                    if await raw.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})"):
+                        raise RuntimeError(f"{table} is not empty; seed an empty database or pass truncate=True")
+            await raw.execute("SET LOCAL gms.skip_change_log = 'on'")
+            await raw.execute("SET LOCAL synchronous_commit = off")
+            await raw.fetchval(
+                "SELECT task_monitors_ensure_partitions($1, $2)",
+                start.replace(day=1), (end.replace(day=1) + timedelta(days=32)).replace(day=1),
+            )
+
+            await raw.copy_records_to_table("roles", records=role_rows, columns=ROLE_COLUMNS)
+            await raw.copy_records_to_table("employees", records=employee_rows, columns=EMPLOYEE_COLUMNS)
+            await raw.copy_records_to_table("projects", records=project_rows, columns=PROJECT_COLUMNS)
+            await raw.copy_records_to_table("project_staffing", records=staffing_rows, columns=STAFFING_COLUMNS)
+            await raw.copy_records_to_table("task_monitors", records=_tasks(seed, windows, task_count), columns=TASK_COLUMNS)
+            await raw.copy_records_to_table("users", records=_users(users, start), columns=USER_COLUMNS)
+
+            await _setval(raw, "projects", "project_id")
+            await _setval(raw, "project_staffing", "id")
+            await raw.execute(
+                "SELECT setval('task_monitors_task_id_seq', GREATEST($1::bigint, 1), $1::bigint > 0)", task_count[0]
+            )
+
+        for table in SEEDED_TABLES:
+            await connection.raw_connection.execute(f"ANALYZE {table}")
+
+    return {
+        "seed": seed,
+        "range": [start.isoformat(), end.isoformat()],
+        "roles": len(role_rows),
+        "employees": len(employee_rows),
+        "projects": len(project_rows),
+        "project_staffing": len(staffing_rows),
+        "task_monitors": task_count[0],
+        "users": users,
+    }